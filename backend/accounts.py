@@ -0,0 +1,79 @@
+"""
+Comptes enregistrés pour la synchronisation sans navigateur
+À la connexion, le refresh token du compte est conservé dans ACCOUNTS_FILE
+(si configuré) : sync_cli.py peut ensuite synchroniser les comptes depuis
+cron, sans session Flask.
+
+Le fichier contient des secrets : il est créé avec les droits 0600 et
+réécrit atomiquement (fichier temporaire puis renommage), sous verrou de
+fichier quand plusieurs workers écrivent.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows : un seul processus (waitress), pas de verrou de fichier
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class AccountStore:
+    """Refresh tokens et playlists des comptes, par identifiant de compte"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict]:
+        """Comptes enregistrés (vide si le fichier n'existe pas)"""
+        try:
+            with open(self.path) as f:
+                return json.load(f).get('accounts', {})
+        except FileNotFoundError:
+            return {}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock, open(f'{self.path}.lock', 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _write(self, accounts: Dict[str, Dict]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'accounts': accounts}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def remember(self, account_id: str, refresh_token: str, playlists: Optional[List[str]] = None):
+        """Enregistrement (ou mise à jour du refresh token) d'un compte ; ses playlists sont conservées"""
+        with self._locked():
+            accounts = self.load()
+            account = accounts.setdefault(account_id, {})
+            account['refresh_token'] = refresh_token
+            if playlists is not None:
+                account['playlists'] = playlists
+            account['updated_at'] = datetime.now().isoformat()
+            self._write(accounts)
+        logger.info(f"Compte enregistré pour la synchronisation sans navigateur : {account_id}")
+
+    def forget(self, account_id: str) -> bool:
+        """Suppression d'un compte (False s'il n'était pas enregistré)"""
+        with self._locked():
+            accounts = self.load()
+            if accounts.pop(account_id, None) is None:
+                return False
+            self._write(accounts)
+            return True
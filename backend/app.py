@@ -1,29 +1,184 @@
-from flask import Flask, request, jsonify, session, redirect, url_for
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, request, jsonify, session, redirect, send_file, url_for, stream_with_context
 from flask_cors import CORS
+from werkzeug.local import LocalProxy
+import functools
+import hashlib
 import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
 from datetime import datetime
 import logging
+from typing import List, Optional
 
 from config import Config
-from database import Database
-from youtube_api import YouTubeAPI
+from events import SYNC_PROGRESS
+from facets import DEFAULT_CHANNEL_LIMIT, parse_filters
+import library_io
+import metrics
+from models import parse_playlist_ids
+from planner import parse_category_weights
+from profiling import check_admin_token
+from services import Services
+import sync
+from throttling import Throttled
+import tracing
 
 # Configuration logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
+api = Blueprint('api', __name__)
 
-# Configuration CORS pour le développement
-CORS(app, supports_credentials=True)
+# Accès aux services de l'application courante (initialisés au premier usage)
+services = LocalProxy(lambda: current_app.extensions['services'])
+config = LocalProxy(lambda: services.config)
+# Services de données du compte connecté (ceux du processus sans partitionnement)
+account = LocalProxy(lambda: services.for_account(current_account()))
+change_feed = LocalProxy(lambda: account.change_feed)
+db = LocalProxy(lambda: account.db)
+youtube_api = LocalProxy(lambda: services.youtube_api)
+profiler = LocalProxy(lambda: services.profiler)
+thumbnails = LocalProxy(lambda: services.thumbnails)
 
-# Initialisation des services
-config = Config()
-db = Database()
-youtube_api = YouTubeAPI(config)
+def create_app(app_config: Optional[Config] = None) -> Flask:
+    """
+    Fabrique de l'application Flask
+    
+    Args:
+        app_config: Configuration à utiliser (chargée depuis l'environnement par défaut)
+    """
+    app_config = app_config or Config()
+    
+    app = Flask(__name__)
+    app.secret_key = app_config.FLASK_SECRET_KEY
+    
+    # Configuration CORS pour le développement
+    CORS(app, supports_credentials=True)
+    
+    # Export des traces de synchronisation (fichier local, désactivé par défaut)
+    tracing.configure(app_config.TRACE_FILE, app_config.TRACE_FORMAT)
+    
+    # Métriques additionnées entre les workers (dossier partagé, désactivé par défaut)
+    metrics.configure(app_config.METRICS_DIR)
+    
+    # Services créés paresseusement, par processus
+    app.extensions['services'] = Services(app_config)
+    app.register_blueprint(api)
+    
+    return app
+
+def is_admin_request(token: str = None) -> bool:
+    """Vérification du jeton administrateur (en-tête X-Admin-Token par défaut)"""
+    return check_admin_token(config.ADMIN_TOKEN, token or request.headers.get('X-Admin-Token'))
+
+@api.before_app_request
+def start_request_timer():
+    """Début de la mesure de latence de la requête"""
+    request.start_time = time.perf_counter()
+
+@api.before_app_request
+def start_background_tasks():
+    """Tâches de fond du processus (sauvegardes planifiées), démarrées à la première requête"""
+    if config.BACKUP_INTERVAL_HOURS > 0:
+        services.backups
+
+# Routes servies sans compte connecté, même avec le partitionnement par compte
+ACCOUNT_OPTIONAL_ENDPOINTS = frozenset({
+    'api.index', 'api.login', 'api.auth_callback', 'api.logout', 'api.auth_status',
+    'api.prometheus_metrics', 'api.get_thumbnail', 'api.slow_queries', 'api.admin_backups'
+})
+
+@api.before_app_request
+def require_account():
+    """Avec le partitionnement par compte, les données ne sont servies qu'au compte connecté"""
+    if not services.partitioned or request.endpoint in ACCOUNT_OPTIONAL_ENDPOINTS:
+        return None
+    if current_account() is None:
+        return jsonify({'error': 'Non authentifié'}), 401
+    return None
+
+@api.before_app_request
+def start_profiling():
+    """Profilage de la requête si demandé par un administrateur (X-Profile ou ?profile=)"""
+    token = request.headers.get('X-Profile') or request.args.get('profile')
+    if token and is_admin_request(token):
+        g.profile = profiler.start()
+
+@api.after_app_request
+def finish_profiling(response):
+    """Stockage du profil, et rapport texte à la place de la réponse si ?profile_output=text"""
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    
+    label = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+    path = profiler.finish(profile, label)
+    
+    if request.args.get('profile_output') == 'text':
+        response = Response(profiler.report(profile), mimetype='text/plain')
+    response.headers['X-Profile-File'] = os.path.basename(path)
+    return response
+
+@api.after_app_request
+def record_request_metrics(response):
+    """Enregistrement de la latence par route (motif de la route, pas l'URL brute)"""
+    start_time = getattr(request, 'start_time', None)
+    if start_time is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.HTTP_REQUEST_DURATION.labels(
+            method=request.method, route=route, status=response.status_code
+        ).observe(time.perf_counter() - start_time)
+    return response
+
+@api.route('/admin/slow-queries')
+def slow_queries():
+    """Dernières requêtes SQL lentes avec leur plan d'exécution"""
+    if not is_admin_request():
+        return jsonify({'error': 'Accès refusé'}), 403
+    
+    return jsonify({
+        'threshold_ms': db.slow_query_threshold_ms,
+        'queries': list(db.slow_queries)
+    })
+
+@api.route('/admin/backups', methods=['GET', 'POST'])
+def admin_backups():
+    """Liste des sauvegardes (GET) ou création d'un instantané en arrière-plan (POST)"""
+    if not is_admin_request():
+        return jsonify({'error': 'Accès refusé'}), 403
+    
+    backups = services.backups
+    if request.method == 'POST':
+        threading.Thread(target=backups.snapshot, name='backup-snapshot', daemon=True).start()
+        return jsonify({'message': 'Sauvegarde lancée'}), 202
+    
+    # La restauration reste une opération manuelle : python backup.py restore <instantané>
+    return jsonify({'backups': [
+        {key: value for key, value in snapshot.items() if key != 'path'}
+        for snapshot in backups.list_snapshots()
+    ]})
+
+@api.route('/admin/categorizer/retrain', methods=['POST'])
+def retrain_categorizer():
+    """Réentraînement complet de la catégorisation automatique (en arrière-plan)"""
+    if not is_admin_request():
+        return jsonify({'error': 'Accès refusé'}), 403
+    
+    if not account.categorizer.available:
+        return jsonify({'error': 'Catégorisation automatique indisponible (scikit-learn non installé)'}), 501
+    
+    account.categorizer.schedule_retrain()
+    return jsonify({'message': 'Réentraînement programmé'}), 202
+
+@api.route('/metrics')
+def prometheus_metrics():
+    """Exposition des métriques au format Prometheus"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
 
-@app.route('/')
+@api.route('/')
 def index():
     """Page d'accueil - vérification du statut d'authentification"""
     return jsonify({
@@ -32,7 +187,7 @@ def index():
         'version': '2.0'
     })
 
-@app.route('/auth/login')
+@api.route('/auth/login')
 def login():
     """Initier le processus d'authentification OAuth Google"""
     try:
@@ -42,7 +197,7 @@ def login():
         logger.error(f"Erreur lors de la génération de l'URL d'auth: {e}")
         return jsonify({'error': 'Erreur d\'authentification'}), 500
 
-@app.route('/auth/callback')
+@api.route('/auth/callback')
 def auth_callback():
     """Callback OAuth - récupération du token d'accès"""
     code = request.args.get('code')
@@ -58,6 +213,17 @@ def auth_callback():
         session['refresh_token'] = token_info.get('refresh_token')
         session['token_expires'] = datetime.now().timestamp() + token_info.get('expires_in', 3600)
         
+        # Compte propriétaire des données (ID de chaîne : identique d'une connexion à l'autre)
+        account_id = youtube_api.get_account_id(token_info['access_token'])
+        if account_id is None and services.partitioned:
+            session.clear()
+            return jsonify({'error': 'Compte YouTube introuvable'}), 500
+        session['account_id'] = account_id
+        
+        # Compte disponible pour la synchronisation sans navigateur (sync_cli.py)
+        if account_id and token_info.get('refresh_token') and services.accounts is not None:
+            services.accounts.remember(account_id, token_info['refresh_token'])
+        
         logger.info("Authentification réussie")
         
         # Redirection vers le frontend (à adapter selon votre configuration)
@@ -67,13 +233,13 @@ def auth_callback():
         logger.error(f"Erreur lors de l'échange du code: {e}")
         return jsonify({'error': 'Erreur lors de l\'authentification'}), 500
 
-@app.route('/auth/logout')
+@api.route('/auth/logout')
 def logout():
     """Déconnexion - suppression de la session"""
     session.clear()
     return jsonify({'message': 'Déconnecté avec succès'})
 
-@app.route('/auth/status')
+@api.route('/auth/status')
 def auth_status():
     """Vérification du statut d'authentification"""
     authenticated = 'access_token' in session
@@ -89,7 +255,56 @@ def auth_status():
         'needs_refresh': authenticated and not token_valid
     })
 
-@app.route('/videos/sync')
+def account_key() -> str:
+    """Identifiant stable du compte connecté (empreinte du refresh token, à défaut du token d'accès)"""
+    token = session.get('refresh_token') or session.get('access_token', '')
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+def current_account() -> Optional[str]:
+    """Compte connecté, défini à l'authentification (None si aucun ou hors requête)"""
+    return session.get('account_id') if has_request_context() else None
+
+def session_key() -> str:
+    """
+    Clé de limitation : identifiant de session renvoyé par le client, adresse du client sinon
+    
+    L'identifiant est créé à la première requête limitée ; un client qui ne renvoie
+    pas le cookie en recevrait un nouveau à chaque requête et ne serait jamais limité.
+    """
+    if 'sid' in session:
+        return session['sid']
+    session['sid'] = secrets.token_hex(8)
+    return request.remote_addr or 'unknown'
+
+def too_many_requests(retry_after: int):
+    """Réponse 429 avec l'en-tête Retry-After"""
+    response = jsonify({'error': 'Trop de requêtes, réessayez plus tard', 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def rate_limited(view):
+    """Limitation par session des endpoints coûteux"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        retry_after = services.rate_limiter.acquire((session_key(), request.endpoint))
+        if retry_after:
+            return too_many_requests(retry_after)
+        return view(*args, **kwargs)
+    return wrapper
+
+def run_sync(access_token: str, key: str, playlist_ids: List[str]) -> dict:
+    """
+    Synchronisation effective (exécutée une seule fois par compte, même si plusieurs requêtes l'attendent)
+    
+    L'intervalle minimal est vérifié par le meneur, sous le verrou du compte partagé
+    entre workers : aucune requête ne démarre une synchronisation sans passer par lui.
+    """
+    with services.sync_gate.run(key):
+        return sync.run_sync(account._get_current_object(), access_token, playlist_ids)
+
+@api.route('/videos/sync')
+@rate_limited
 def sync_videos():
     """Synchronisation des vidéos depuis YouTube"""
     if 'access_token' not in session:
@@ -101,28 +316,44 @@ def sync_videos():
             if not youtube_api.refresh_token(session):
                 return jsonify({'error': 'Token expiré, reconnexion nécessaire'}), 401
         
-        # Récupération des vidéos de la playlist "Watch Later"
-        videos = youtube_api.get_watch_later_videos(session['access_token'])
+        try:
+            playlist_ids = parse_playlist_ids(request.args.get('playlists') or config.SYNC_PLAYLISTS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Sauvegarde en base de données
-        saved_count = 0
-        for video in videos:
-            if db.save_video(video):
-                saved_count += 1
+        # Une synchronisation en cours pour ce compte est rejointe, quelles que soient ses playlists
+        key = account_key()
+        access_token = session['access_token']
+        result, shared = services.sync_flight.do(key, lambda: run_sync(access_token, key, playlist_ids))
         
-        logger.info(f"Synchronisation terminée: {saved_count} nouvelles vidéos")
+        return jsonify(dict(result, shared=shared))
         
-        return jsonify({
-            'message': 'Synchronisation réussie',
-            'total_videos': len(videos),
-            'new_videos': saved_count
-        })
+    except Throttled as e:
+        return too_many_requests(e.retry_after)
         
     except Exception as e:
         logger.error(f"Erreur lors de la synchronisation: {e}")
+        change_feed.publish(SYNC_PROGRESS, {'stage': 'failed'})
         return jsonify({'error': 'Erreur lors de la synchronisation'}), 500
 
-@app.route('/videos')
+@api.route('/videos/events')
+def video_events():
+    """Flux Server-Sent Events des changements (reprise via Last-Event-ID)"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID invalide'}), 400
+    
+    stream = change_feed.stream(last_id, heartbeat=config.CHANGE_FEED_HEARTBEAT)
+    return Response(stream_with_context(stream), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Désactive le buffering des proxys nginx
+    })
+
+@api.route('/videos')
+@rate_limited
 def get_videos():
     """Récupération de toutes les vidéos stockées"""
     try:
@@ -130,15 +361,24 @@ def get_videos():
         category = request.args.get('category')
         watched = request.args.get('watched')
         search = request.args.get('search')
+        playlist = request.args.get('playlist')
+        removed = request.args.get('removed') == 'true'
+        collapse = request.args.get('collapse') == 'true'
         
         videos = db.get_videos(
             category=category,
             watched=watched == 'true' if watched else None,
-            search=search
+            search=search,
+            playlist=playlist,
+            removed=removed
         )
         
+        # Doublons (ré-uploads, miroirs) regroupés sous la première vidéo
+        if collapse:
+            videos = account.similarity.collapse(videos)
+        
         return jsonify({
-            'videos': videos,
+            'videos': thumbnails.with_urls(videos),
             'total': len(videos)
         })
         
@@ -146,7 +386,65 @@ def get_videos():
         logger.error(f"Erreur lors de la récupération des vidéos: {e}")
         return jsonify({'error': 'Erreur lors de la récupération'}), 500
 
-@app.route('/videos/<video_id>/watched', methods=['PUT'])
+@api.route('/videos/facets')
+@rate_limited
+def get_video_facets():
+    """Comptes par catégorie, état de visionnage, chaîne et durée pour les filtres demandés"""
+    try:
+        filters = parse_filters(request.args)
+        channel_limit = min(request.args.get('channel_limit', DEFAULT_CHANNEL_LIMIT, type=int), 500)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        return jsonify(account.facets.counts(filters, channel_limit=channel_limit))
+
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des facettes: {e}")
+        return jsonify({'error': 'Erreur lors du calcul des facettes'}), 500
+
+@api.route('/videos/<video_id>/similar')
+def get_similar_videos(video_id):
+    """Vidéos proches : doublons (même durée) et extraits ou versions d'un même contenu"""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        similar = account.similarity.similar(video_id, limit=limit)
+        
+        if similar is None:
+            return jsonify({'error': 'Vidéo non trouvée'}), 404
+        
+        return jsonify({
+            'video_id': video_id,
+            'similar': thumbnails.with_urls(similar),
+            'total': len(similar)
+        })
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche des vidéos similaires: {e}")
+        return jsonify({'error': 'Erreur lors de la récupération'}), 500
+
+@api.route('/videos/changes')
+def get_video_changes():
+    """Changements depuis un numéro de séquence (synchronisation incrémentale des clients)"""
+    try:
+        since = request.args.get('since', 0, type=int)
+        limit = min(request.args.get('limit', 500, type=int), 5000)
+        
+        changes = db.get_changes(since=since, limit=limit)
+        if not changes:
+            return jsonify({'error': 'Erreur lors de la récupération'}), 500
+        
+        metrics.CACHE_REQUESTS.labels(
+            cache='change_log', result='miss' if changes['full_resync'] else 'hit'
+        ).inc()
+        
+        return jsonify(changes)
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des changements: {e}")
+        return jsonify({'error': 'Erreur lors de la récupération'}), 500
+
+@api.route('/videos/<video_id>/watched', methods=['PUT'])
 def update_watched_status(video_id):
     """Mise à jour du statut "vu" d'une vidéo"""
     try:
@@ -164,7 +462,22 @@ def update_watched_status(video_id):
         logger.error(f"Erreur lors de la mise à jour: {e}")
         return jsonify({'error': 'Erreur lors de la mise à jour'}), 500
 
-@app.route('/videos/<video_id>/category', methods=['PUT'])
+@api.route('/videos/<video_id>/progress', methods=['PUT', 'POST'])
+def update_watch_progress(video_id):
+    """Position de lecture envoyée périodiquement par le lecteur (POST pour navigator.sendBeacon)"""
+    data = request.get_json(force=True, silent=True) or {}
+    position = data.get('position')
+    
+    if isinstance(position, bool) or not isinstance(position, (int, float)) or position < 0:
+        return jsonify({'error': 'Position (secondes) requise'}), 400
+    
+    # Écriture différée : les positions sont regroupées puis écrites par lots
+    position = account.progress.record(video_id, int(position))
+    if position is None:
+        return jsonify({'error': 'Vidéo non trouvée'}), 404
+    return jsonify({'message': 'Position enregistrée', 'position': position}), 202
+
+@api.route('/videos/<video_id>/category', methods=['PUT'])
 def update_video_category(video_id):
     """Mise à jour de la catégorie d'une vidéo"""
     try:
@@ -177,6 +490,8 @@ def update_video_category(video_id):
         success = db.update_video_category(video_id, category)
         
         if success:
+            # Choix manuel appris en arrière-plan par la catégorisation automatique
+            account.categorizer.learn(video_id, category)
             return jsonify({'message': 'Catégorie mise à jour'})
         else:
             return jsonify({'error': 'Vidéo non trouvée'}), 404
@@ -185,7 +500,128 @@ def update_video_category(video_id):
         logger.error(f"Erreur lors de la mise à jour: {e}")
         return jsonify({'error': 'Erreur lors de la mise à jour'}), 500
 
-@app.route('/stats')
+@api.route('/videos/<video_id>', methods=['DELETE'])
+def delete_video(video_id):
+    """Suppression d'une vidéo de la bibliothèque"""
+    try:
+        if db.delete_video(video_id):
+            account.similarity.remove(video_id)
+            return jsonify({'message': 'Vidéo supprimée'})
+        else:
+            return jsonify({'error': 'Vidéo non trouvée'}), 404
+            
+    except Exception as e:
+        logger.error(f"Erreur lors de la suppression: {e}")
+        return jsonify({'error': 'Erreur lors de la suppression'}), 500
+
+@api.route('/thumbs/<video_id>')
+def get_thumbnail(video_id):
+    """
+    Miniature servie depuis le cache local (?w= pour une variante réduite)
+    
+    L'URL /thumbs/<id> est revalidée (ETag) : la miniature source peut changer.
+    Avec ?v=<empreinte de l'original> (thumbnail_src des vidéos), le contenu est
+    figé et mis en cache sans limite, variantes ?w= comprises.
+    """
+    try:
+        # Téléchargement seulement pour une vidéo de la bibliothèque du compte
+        result = thumbnails.get_file(video_id, request.args.get('w', type=int), resolve=db.get_video_by_id)
+        if result is None:
+            return jsonify({'error': 'Miniature indisponible'}), 404
+        
+        # Fichier déjà ouvert : une éviction concurrente ne peut plus le faire disparaître
+        file, digest, version = result
+        response = send_file(file, mimetype='image/jpeg', etag=digest, conditional=True)
+        if request.args.get('v') == version:
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération de la miniature {video_id}: {e}")
+        return jsonify({'error': 'Erreur lors de la récupération'}), 500
+
+@api.route('/plan')
+def plan_watch_queue():
+    """Sélection de vidéos non vues tenant dans un budget de temps (?minutes=N&weights=ai:2,dev:1.5)"""
+    try:
+        minutes = request.args.get('minutes', type=int)
+        if not minutes or minutes <= 0 or minutes > config.PLAN_MAX_MINUTES:
+            return jsonify({'error': f'Paramètre minutes requis (entre 1 et {config.PLAN_MAX_MINUTES})'}), 400
+        
+        plan = account.planner.plan(minutes, parse_category_weights(request.args.get('weights')))
+        
+        # Métadonnées complètes des seules vidéos retenues
+        details = {video['id']: video for video in db.get_videos_by_ids([video['id'] for video in plan['videos']])}
+        plan['videos'] = thumbnails.with_urls([
+            dict(details[video['id']], **video) for video in plan['videos'] if video['id'] in details
+        ])
+        
+        return jsonify(plan)
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la planification: {e}")
+        return jsonify({'error': 'Erreur lors de la planification'}), 500
+
+@api.route('/export')
+def export_library():
+    """Export de toute la bibliothèque en flux (?format=ndjson, parquet ou arrow)"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in library_io.FORMATS:
+        return jsonify({'error': f"Format inconnu (formats : {', '.join(library_io.FORMATS)})"}), 400
+    if fmt != 'ndjson' and not library_io.arrow_available():
+        return jsonify({'error': f'Format {fmt} indisponible (pyarrow non installé)'}), 501
+    
+    filename = f"youtube_organizer_{datetime.now():%Y%m%d_%H%M%S}.{fmt}"
+    return Response(stream_with_context(library_io.export_chunks(db, fmt)), mimetype=library_io.FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no'
+    })
+
+@api.route('/import', methods=['POST'])
+def import_library():
+    """Import d'un export (corps de la requête, ?format=ndjson, parquet ou arrow)"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in library_io.FORMATS:
+        return jsonify({'error': f"Format inconnu (formats : {', '.join(library_io.FORMATS)})"}), 400
+    if fmt != 'ndjson' and not library_io.arrow_available():
+        return jsonify({'error': f'Format {fmt} indisponible (pyarrow non installé)'}), 501
+    
+    try:
+        if fmt == 'parquet':
+            # Parquet se lit depuis la fin du fichier : copie temporaire, sur disque au-delà de 16 Mo
+            with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as source:
+                shutil.copyfileobj(request.stream, source)
+                source.seek(0)
+                result = library_io.import_batches(db, library_io.read_batches(source, fmt),
+                                                   after_batch=account.similarity.index_videos)
+        else:
+            result = library_io.import_batches(db, library_io.read_batches(request.stream, fmt),
+                                               after_batch=account.similarity.index_videos)
+        
+        if result['saved_videos'] != result['total_videos']:
+            return jsonify(dict(result, error=f"Import incomplet : {result['saved_videos']} vidéos "
+                                              f"enregistrées sur {result['total_videos']}")), 500
+        return jsonify(dict(result, message='Import réussi'))
+        
+    except (ValueError, KeyError) as e:
+        logger.error(f"Fichier d'import invalide: {e}")
+        return jsonify({'error': "Fichier d'import invalide"}), 400
+    except Exception as e:
+        logger.error(f"Erreur lors de l'import: {e}")
+        return jsonify({'error': "Erreur lors de l'import"}), 500
+
+@api.route('/videos/sync/history')
+def get_sync_history():
+    """Dernières synchronisations et leur temps par étape"""
+    try:
+        limit = min(int(request.args.get('limit', 20)), 200)
+        return jsonify({'history': db.get_sync_history(limit)})
+    except ValueError:
+        return jsonify({'error': 'Paramètre limit invalide'}), 400
+
+@api.route('/stats')
 def get_stats():
     """Statistiques globales"""
     try:
@@ -196,7 +632,19 @@ def get_stats():
         logger.error(f"Erreur lors de la récupération des stats: {e}")
         return jsonify({'error': 'Erreur lors de la récupération des stats'}), 500
 
-@app.route('/categories')
+@api.route('/playlists')
+def get_playlists():
+    """Playlists synchronisées (nombre de vidéos) et playlists synchronisées par défaut"""
+    try:
+        return jsonify({
+            'playlists': db.get_playlists(),
+            'default': parse_playlist_ids(config.SYNC_PLAYLISTS)
+        })
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des playlists: {e}")
+        return jsonify({'error': 'Erreur lors de la récupération'}), 500
+
+@api.route('/categories')
 def get_categories():
     """Liste des catégories utilisées"""
     try:
@@ -207,18 +655,17 @@ def get_categories():
         logger.error(f"Erreur lors de la récupération des catégories: {e}")
         return jsonify({'error': 'Erreur lors de la récupération'}), 500
 
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint non trouvé'}), 404
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def internal_error(error):
     logger.error(f"Erreur interne du serveur: {error}")
     return jsonify({'error': 'Erreur interne du serveur'}), 500
 
 if __name__ == '__main__':
-    # Initialisation de la base de données
-    db.init_db()
+    app = create_app()
     
     # Lancement du serveur de développement
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,12 @@
+"""
+Point d'entrée ASGI (mode asynchrone)
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Un seul processus suffit pour des centaines d'utilisateurs dont les requêtes
+attendent surtout l'API YouTube. Voir DEPLOYMENT.md.
+"""
+
+from asgi_app import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,373 @@
+"""
+Mode de service asynchrone (ASGI)
+Les routes chaudes (/videos, /videos/facets, /videos/sync, /stats, /categories) sont servies par
+Starlette sur une boucle d'événements : l'attente de l'API YouTube ne bloque
+plus de thread, et SQLite est appelé dans un pool de threads dédié et borné.
+Les autres routes (authentification, administration...) sont déléguées à
+l'application Flask, qui partage la même session.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+from a2wsgi import WSGIMiddleware
+from flask.json.tag import TaggedJSONSerializer
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from app import create_app
+from config import Config
+from events import SYNC_PROGRESS
+from facets import DEFAULT_CHANNEL_LIMIT, parse_filters
+from metadata import AsyncDetailBatcher
+import metrics
+from models import parse_playlist_ids
+from services import Services
+from throttling import AsyncSingleFlight, Throttled
+from tracing import TRACER, bind
+from youtube_async import AsyncYouTubeAPI
+
+logger = logging.getLogger(__name__)
+
+# Durée de validité du cookie de session Flask (PERMANENT_SESSION_LIFETIME par défaut)
+SESSION_MAX_AGE = 31 * 24 * 3600
+
+
+class AsyncDatabase:
+    """Accès asynchrone à Database : chaque appel s'exécute dans un pool de threads borné"""
+
+    def __init__(self, db, max_workers: int = 8, executor: Optional[ThreadPoolExecutor] = None):
+        self._db = db
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sqlite')
+
+    def bind(self, db) -> 'AsyncDatabase':
+        """Même pool de threads pour une autre base (celle d'un compte)"""
+        return self if db is self._db else AsyncDatabase(db, executor=self._executor)
+
+    def __getattr__(self, name: str):
+        method = getattr(self._db, name)
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            # bind : les spans SQLite restent rattachés à la trace de la coroutine appelante
+            return await loop.run_in_executor(self._executor, functools.partial(bind(method), *args, **kwargs))
+
+        return call
+
+    async def run(self, func, *args):
+        """Exécution d'une fonction quelconque dans le pool SQLite"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(bind(func), *args))
+
+    def shutdown(self):
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+
+def flask_session_serializer(secret_key: str) -> URLSafeTimedSerializer:
+    """Sérialiseur identique à celui des cookies de session Flask"""
+    return URLSafeTimedSerializer(
+        secret_key,
+        salt='cookie-session',
+        serializer=TaggedJSONSerializer(),
+        signer_kwargs={'key_derivation': 'hmac', 'digest_method': hashlib.sha1}
+    )
+
+
+def read_session(request: Request) -> Dict:
+    """Lecture de la session Flask depuis le cookie (vide si absent ou invalide)"""
+    cookie = request.cookies.get('session')
+    if not cookie:
+        return {}
+    try:
+        return request.app.state.session_serializer.loads(cookie, max_age=SESSION_MAX_AGE)
+    except BadSignature:
+        return {}
+
+
+def account_key(session: Dict) -> str:
+    """Identifiant stable du compte connecté (même calcul que app.account_key)"""
+    token = session.get('refresh_token') or session.get('access_token', '')
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def account_services(request: Request) -> Optional[Services]:
+    """Services de données du compte de la session (None si le partitionnement exige un compte absent)"""
+    services = request.app.state.services
+    account_id = read_session(request).get('account_id')
+    if services.partitioned and account_id is None:
+        return None
+    return services.for_account(account_id)
+
+
+def unauthenticated() -> JSONResponse:
+    return JSONResponse({'error': 'Non authentifié'}, status_code=401)
+
+
+def too_many_requests(retry_after: int) -> JSONResponse:
+    """Réponse 429 avec l'en-tête Retry-After"""
+    return JSONResponse(
+        {'error': 'Trop de requêtes, réessayez plus tard', 'retry_after': retry_after},
+        status_code=429,
+        headers={'Retry-After': str(retry_after)}
+    )
+
+
+def check_rate_limit(request: Request, endpoint: str) -> Optional[JSONResponse]:
+    """
+    Limitation par session (la session Flask fournit l'identifiant 'sid' quand il existe),
+    à défaut par compte connecté, et par adresse pour les clients anonymes sans cookie
+    """
+    session = read_session(request)
+    if session.get('sid'):
+        client = session['sid']
+    elif session.get('refresh_token') or session.get('access_token'):
+        client = account_key(session)
+    else:
+        client = request.client.host if request.client else 'unknown'
+    retry_after = request.app.state.services.rate_limiter.acquire((client, endpoint))
+    return too_many_requests(retry_after) if retry_after else None
+
+
+async def run_sync(state, account: Services, access_token: str, key: str, playlist_ids: List[str]) -> Dict:
+    """
+    Synchronisation effective (exécutée une seule fois par compte, même si plusieurs requêtes l'attendent)
+
+    Tracée comme app.run_sync ; le temps par étape est enregistré dans sync_history.
+    L'intervalle minimal est vérifié sous le verrou du compte, comme dans app.run_sync.
+    """
+    db = state.db.bind(account.db)
+    with state.services.sync_gate.run(key), TRACER.trace('sync', playlists=','.join(playlist_ids)) as trace:
+        try:
+            result = await sync_stages(state, account, db, access_token, playlist_ids)
+        except Exception as e:
+            await db.log_sync(0, 0, str(e), trace.duration_ms, trace.stage_timings())
+            raise
+        await db.log_sync(result['total_videos'], result['new_videos'], None,
+                          trace.duration_ms, trace.stage_timings())
+        trace.set_attribute('videos', result['total_videos'])
+    return result
+
+
+async def sync_stages(state, account: Services, db: AsyncDatabase, access_token: str,
+                      playlist_ids: List[str]) -> Dict:
+    """Étapes de la synchronisation, chacune dans son span"""
+    change_feed = account.change_feed
+    change_feed.publish(SYNC_PROGRESS, {'stage': 'started', 'playlists': playlist_ids})
+
+    with TRACER.span('youtube.fetch'):
+        videos, playlists = await state.youtube_api.get_playlist_videos(access_token, playlist_ids)
+    change_feed.publish(SYNC_PROGRESS, {'stage': 'fetched', 'total': len(videos)})
+
+    # Sauvegarde en base de données, en une seule transaction dans le pool SQLite
+    saved_count = await db.save_videos(videos)
+    with TRACER.span('similarity.index', videos=len(videos)):
+        await db.run(account.similarity.index_videos, videos)
+    reconciliation = await db.save_playlist_contents(playlists, account.config.SYNC_REMOVAL_MAX_FRACTION)
+    await db.run(account.similarity.update_archived, reconciliation['archived_ids'], reconciliation['restored_ids'])
+
+    logger.info(f"Synchronisation terminée: {saved_count} nouvelles vidéos")
+    account.categorizer.categorize(videos)
+    state.services.thumbnails.prefetch(videos)
+    metrics.SYNC_VIDEOS.observe(len(videos))
+    metrics.SYNC_NEW_VIDEOS.inc(saved_count)
+    change_feed.publish(SYNC_PROGRESS, {
+        'stage': 'completed',
+        'total': len(videos),
+        'new_videos': saved_count
+    })
+
+    return {
+        'message': 'Synchronisation réussie',
+        'total_videos': len(videos),
+        'new_videos': saved_count,
+        'removed_videos': reconciliation['archived'],
+        'playlists': {playlist.playlist_id: len(playlist.entries) for playlist in playlists}
+    }
+
+
+async def sync_videos(request: Request) -> JSONResponse:
+    """Synchronisation des vidéos depuis YouTube"""
+    limited = check_rate_limit(request, 'api.sync_videos')
+    if limited:
+        return limited
+
+    session = read_session(request)
+    account = account_services(request)
+    if 'access_token' not in session or account is None:
+        return unauthenticated()
+
+    # Le rafraîchissement du token reste géré par les routes Flask
+    if datetime.now().timestamp() >= session.get('token_expires', 0):
+        return JSONResponse({'error': 'Token expiré, reconnexion nécessaire'}, status_code=401)
+
+    state = request.app.state
+    try:
+        playlist_ids = parse_playlist_ids(
+            request.query_params.get('playlists') or state.services.config.SYNC_PLAYLISTS
+        )
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+
+    try:
+        # Une synchronisation en cours pour ce compte est rejointe, quelles que soient ses playlists
+        key = account_key(session)
+        access_token = session['access_token']
+        result, shared = await state.sync_flight.do(
+            key, lambda: run_sync(state, account, access_token, key, playlist_ids)
+        )
+
+        return JSONResponse(dict(result, shared=shared))
+
+    except Throttled as e:
+        return too_many_requests(e.retry_after)
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la synchronisation: {e}")
+        account.change_feed.publish(SYNC_PROGRESS, {'stage': 'failed'})
+        return JSONResponse({'error': 'Erreur lors de la synchronisation'}, status_code=500)
+
+
+async def get_videos(request: Request) -> JSONResponse:
+    """Récupération de toutes les vidéos stockées"""
+    limited = check_rate_limit(request, 'api.get_videos')
+    if limited:
+        return limited
+
+    account = account_services(request)
+    if account is None:
+        return unauthenticated()
+    db = request.app.state.db.bind(account.db)
+
+    try:
+        category = request.query_params.get('category')
+        watched = request.query_params.get('watched')
+        search = request.query_params.get('search')
+
+        videos = await db.get_videos(
+            category=category,
+            watched=watched == 'true' if watched else None,
+            search=search,
+            playlist=request.query_params.get('playlist'),
+            removed=request.query_params.get('removed') == 'true'
+        )
+
+        # Doublons (ré-uploads, miroirs) regroupés sous la première vidéo
+        if request.query_params.get('collapse') == 'true':
+            videos = await db.run(account.similarity.collapse, videos)
+
+        return JSONResponse({
+            'videos': await db.run(request.app.state.services.thumbnails.with_urls, videos),
+            'total': len(videos)
+        })
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des vidéos: {e}")
+        return JSONResponse({'error': 'Erreur lors de la récupération'}, status_code=500)
+
+
+async def get_video_facets(request: Request) -> JSONResponse:
+    """Comptes par catégorie, état de visionnage, chaîne et durée pour les filtres demandés"""
+    limited = check_rate_limit(request, 'api.get_video_facets')
+    if limited:
+        return limited
+
+    account = account_services(request)
+    if account is None:
+        return unauthenticated()
+
+    try:
+        filters = parse_filters(request.query_params)
+        channel_limit = min(int(request.query_params.get('channel_limit', DEFAULT_CHANNEL_LIMIT)), 500)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+
+    try:
+        facets = await request.app.state.db.run(functools.partial(account.facets.counts, filters, channel_limit=channel_limit))
+        return JSONResponse(facets)
+    except Exception as e:
+        logger.error(f"Erreur lors du calcul des facettes: {e}")
+        return JSONResponse({'error': 'Erreur lors du calcul des facettes'}, status_code=500)
+
+
+async def get_stats(request: Request) -> JSONResponse:
+    """Statistiques globales"""
+    account = account_services(request)
+    if account is None:
+        return unauthenticated()
+    try:
+        return JSONResponse(await request.app.state.db.bind(account.db).get_stats())
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des stats: {e}")
+        return JSONResponse({'error': 'Erreur lors de la récupération des stats'}, status_code=500)
+
+
+async def get_categories(request: Request) -> JSONResponse:
+    """Liste des catégories utilisées"""
+    account = account_services(request)
+    if account is None:
+        return unauthenticated()
+    try:
+        categories = await request.app.state.db.bind(account.db).get_categories()
+        return JSONResponse({'categories': categories})
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des catégories: {e}")
+        return JSONResponse({'error': 'Erreur lors de la récupération'}, status_code=500)
+
+
+def create_asgi_app(app_config: Optional[Config] = None) -> Starlette:
+    """
+    Fabrique de l'application ASGI
+
+    Args:
+        app_config: Configuration à utiliser (chargée depuis l'environnement par défaut)
+    """
+    app_config = app_config or Config()
+    flask_app = create_app(app_config)
+    services: Services = flask_app.extensions['services']
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        app.state.services = services
+        # Pool SQLite du processus, lié à la base du compte de chaque requête (AsyncDatabase.bind)
+        app.state.db = AsyncDatabase(services.db, max_workers=app_config.ASYNC_DB_THREADS)
+        app.state.youtube_api = AsyncYouTubeAPI(
+            app_config.YOUTUBE_API_BASE_URL,
+            max_connections=app_config.ASYNC_MAX_CONNECTIONS,
+            details=AsyncDetailBatcher(services.metadata)
+        )
+        app.state.session_serializer = flask_session_serializer(app_config.FLASK_SECRET_KEY)
+        # Propre à la boucle d'événements ; intervalle minimal et limitation partagés avec Flask
+        app.state.sync_flight = AsyncSingleFlight()
+        if app_config.BACKUP_INTERVAL_HOURS > 0:
+            services.backups  # Démarre les sauvegardes planifiées
+        try:
+            yield
+        finally:
+            await app.state.youtube_api.aclose()
+            services.close()
+            app.state.db.shutdown()
+
+    routes = [
+        Route('/videos', get_videos),
+        Route('/videos/facets', get_video_facets),
+        Route('/videos/sync', sync_videos),
+        Route('/stats', get_stats),
+        Route('/categories', get_categories),
+        # Toutes les autres routes restent servies par Flask (dans un pool de threads)
+        Mount('/', app=WSGIMiddleware(flask_app, workers=app_config.ASYNC_WSGI_THREADS))
+    ]
+
+    return Starlette(routes=routes, lifespan=lifespan)
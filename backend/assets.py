@@ -0,0 +1,169 @@
+"""
+Pipeline des assets du frontend
+La page (shell) est construite une seule fois : le CSS et le JavaScript inline
+sont extraits dans des fichiers nommés par empreinte (cache immuable), puis
+chaque ressource est précompressée en gzip et brotli (si disponible).
+Les réponses portent un ETag fort : une visite répétée coûte un 304, ou rien.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional
+import logging
+
+from flask import Request, Response
+from jinja2 import Template
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # Compression brotli optionnelle
+    brotli = None
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend')
+
+# Fichiers candidats pour la page principale, par ordre de préférence
+SHELL_CANDIDATES = ('index.html', 'front.php')
+
+SHELL_NAME = 'index.html'
+
+INLINE_STYLE = re.compile(r'<style>(.*?)</style>', re.DOTALL)
+INLINE_SCRIPT = re.compile(r'<script>(.*?)</script>', re.DOTALL)
+
+MIME_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8'
+}
+
+
+class Asset:
+    """Ressource construite : contenu brut, variantes compressées et validateur"""
+
+    __slots__ = ('name', 'mimetype', 'variants', 'etag', 'immutable')
+
+    def __init__(self, name: str, content: bytes, immutable: bool):
+        self.name = name
+        self.mimetype = MIME_TYPES.get(os.path.splitext(name)[1], 'application/octet-stream')
+        self.etag = hashlib.sha256(content).hexdigest()[:20]
+        self.immutable = immutable
+
+        # Variantes par encodage (compressées une seule fois, à la construction)
+        self.variants: Dict[str, bytes] = {'identity': content}
+        self.variants['gzip'] = gzip.compress(content, compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(content, quality=11)
+
+
+class AssetPipeline:
+    """Construction et distribution des assets du frontend"""
+
+    def __init__(self, frontend_dir: str = FRONTEND_DIR, url_prefix: str = '/assets', watch: bool = False):
+        """
+        Args:
+            frontend_dir: Dossier contenant la page du frontend
+            url_prefix: Préfixe des URL des assets extraits
+            watch: Reconstruction automatique quand le fichier source change (développement)
+        """
+        self.frontend_dir = frontend_dir
+        self.url_prefix = url_prefix
+        self.watch = watch
+        self._lock = threading.Lock()
+        self._assets: Dict[str, Asset] = {}
+        self._source_mtime: Optional[float] = None
+        self.source_path = self._find_shell()
+        self.build()
+
+    def _find_shell(self) -> str:
+        for candidate in SHELL_CANDIDATES:
+            path = os.path.join(self.frontend_dir, candidate)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"Aucune page de frontend trouvée dans {self.frontend_dir}")
+
+    def build(self):
+        """Construction complète : extraction, empreintes et précompression"""
+        with open(self.source_path, encoding='utf-8') as f:
+            source = f.read()
+        mtime = os.path.getmtime(self.source_path)
+
+        # Rendu du gabarit une seule fois, à la construction
+        html = Template(source).render()
+        assets: Dict[str, Asset] = {}
+
+        def extract(pattern: re.Pattern, extension: str, tag: str, html: str) -> str:
+            blocks = pattern.findall(html)
+            if not blocks:
+                return html
+            content = '\n'.join(blocks).encode('utf-8')
+            name = f"app.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+            assets[name] = Asset(name, content, immutable=True)
+
+            url = f'{self.url_prefix}/{name}'
+            # Le premier bloc est remplacé par la référence, les suivants supprimés
+            html = pattern.sub(lambda m: '\0', html)
+            return html.replace('\0', tag.format(url=url), 1).replace('\0', '')
+
+        html = extract(INLINE_STYLE, '.css', '<link rel="stylesheet" href="{url}">', html)
+        html = extract(INLINE_SCRIPT, '.js', '<script src="{url}" defer></script>', html)
+        assets[SHELL_NAME] = Asset(SHELL_NAME, html.encode('utf-8'), immutable=False)
+
+        with self._lock:
+            self._assets = assets
+            self._source_mtime = mtime
+
+        logger.info(f"Assets construits depuis {self.source_path} : {', '.join(sorted(assets))}")
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.path.getmtime(self.source_path)
+        except OSError:
+            return
+        if mtime != self._source_mtime:
+            self.build()
+
+    def get(self, name: str) -> Optional[Asset]:
+        if self.watch:
+            self._reload_if_changed()
+        return self._assets.get(name)
+
+    def serve(self, name: str, request: Request) -> Response:
+        """
+        Réponse HTTP pour un asset : négociation de l'encodage et validation ETag
+
+        Args:
+            name: Nom de l'asset (SHELL_NAME pour la page principale)
+            request: Requête Flask en cours
+        """
+        asset = self.get(name)
+        if asset is None:
+            return Response('Asset introuvable', status=404, mimetype='text/plain')
+
+        encoding = self._negotiate_encoding(request.headers.get('Accept-Encoding', ''), asset)
+        etag = asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}'
+
+        headers = {
+            'ETag': f'"{etag}"',
+            'Vary': 'Accept-Encoding',
+            # Assets extraits : URL à empreinte, jamais revalidés ; page : revalidée à chaque visite
+            'Cache-Control': 'public, max-age=31536000, immutable' if asset.immutable else 'no-cache'
+        }
+
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(asset.variants[encoding], content_type=asset.mimetype, headers=headers)
+
+    @staticmethod
+    def _negotiate_encoding(accept_encoding: str, asset: Asset) -> str:
+        accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in asset.variants:
+                return encoding
+        return 'identity'
@@ -1,5 +1,5 @@
 # app.py - Flask application principale
-from flask import Flask, request, jsonify, session, redirect, url_for, render_template_string
+from flask import Flask, request, jsonify, session, redirect, url_for
 from flask_cors import CORS
 import os
 import json
@@ -11,6 +11,8 @@ from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 import secrets
 
+from assets import AssetPipeline, SHELL_NAME
+
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', secrets.token_hex(16))
 CORS(app)
@@ -22,6 +24,9 @@ CLIENT_SECRETS_FILE = "client_secret.json"
 # Configuration de la base de données
 DATABASE = 'youtube_organizer.db'
 
+# Page du frontend construite une fois au démarrage (reconstruite à chaque modification en développement)
+assets = AssetPipeline(watch=os.environ.get('FLASK_ENV') == 'development')
+
 def init_db():
     """Initialise la base de données SQLite"""
     conn = sqlite3.connect(DATABASE)
@@ -95,7 +100,12 @@ def get_youtube_service():
 @app.route('/')
 def index():
     """Page d'accueil avec le frontend"""
-    return render_template_string(open('frontend/index.html').read())
+    return assets.serve(SHELL_NAME, request)
+
+@app.route('/assets/<path:name>')
+def frontend_asset(name):
+    """CSS et JavaScript du frontend (noms à empreinte, cache immuable)"""
+    return assets.serve(name, request)
 
 @app.route('/auth')
 def auth():
@@ -0,0 +1,301 @@
+"""
+Sauvegardes à chaud de la base SQLite
+Les instantanés sont copiés avec l'API de sauvegarde incrémentale de SQLite :
+quelques pages à la fois, avec une pause entre deux étapes, sans bloquer les
+écritures de l'application. Une base trop active pour terminer la copie
+(MAX_RESTARTS reprises) n'est pas verrouillée : l'instantané est abandonné et
+retenté au passage suivant de la planification. Chaque copie est vérifiée (PRAGMA integrity_check)
+avant d'être conservée ; les plus anciennes sont supprimées au-delà de la
+rétention.
+
+Avec le partitionnement par compte (ACCOUNT_SHARDS_DIR), la planification
+sauvegarde aussi chaque base de compte, dans BACKUP_DIR/accounts/<compte>/
+(rétention propre à chaque compte).
+
+    python backup.py snapshot
+    python backup.py list
+    python backup.py verify backups/youtube_organizer-20240101-030000.db
+    python backup.py restore backups/youtube_organizer-20240101-030000.db
+    python backup.py --database shards/UCxxx.db --backup-dir backups/accounts/UCxxx list
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows : un seul processus (waitress), pas de verrou de fichier
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = '.db'
+
+# Reprises tolérées d'une copie incrémentale interrompue par des écritures
+MAX_RESTARTS = 3
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+class BackupManager:
+    """Instantanés vérifiés de la base, planifiés ou à la demande"""
+
+    def __init__(self, db_path: str, backup_dir: str = 'backups', retention: int = 7,
+                 pages_per_step: int = 256, step_sleep: float = 0.02, shards_dir: Optional[str] = None):
+        """
+        Args:
+            db_path: Base à sauvegarder
+            backup_dir: Dossier des instantanés
+            retention: Nombre d'instantanés conservés
+            pages_per_step: Pages copiées par étape (une étape = un court verrou en lecture)
+            step_sleep: Pause entre deux étapes en secondes (laisse passer les requêtes)
+            shards_dir: Dossier des bases de comptes, sauvegardées aussi par la planification
+        """
+        self.db_path = db_path
+        self.backup_dir = os.path.abspath(backup_dir)
+        self.retention = retention
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.shards_dir = shards_dir
+        self._shards: Dict[str, 'BackupManager'] = {}
+        self._lock = threading.Lock()
+        self._scheduler: Optional[threading.Thread] = None
+        self.prefix = os.path.splitext(os.path.basename(db_path))[0]
+
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+    def _copy(self, target_path: str):
+        """
+        Copie incrémentale vers target_path
+
+        Une écriture de l'application pendant la copie la fait reprendre au
+        début : après MAX_RESTARTS reprises, la copie est abandonnée.
+
+        Raises:
+            _TooManyRestarts: Base trop active, copie à retenter plus tard
+        """
+        state = {'remaining': None, 'restarts': 0}
+
+        def progress(status: int, remaining: int, total: int):
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > MAX_RESTARTS:
+                    raise _TooManyRestarts()
+            state['remaining'] = remaining
+            # Appelé après chaque étape : la pause se fait hors de tout verrou
+            time.sleep(self.step_sleep)
+
+        source = sqlite3.connect(self.db_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=self.pages_per_step, progress=progress)
+        finally:
+            target.close()
+            source.close()
+
+    def snapshot(self) -> Optional[str]:
+        """
+        Instantané de la base (copie incrémentale, vérifiée, puis renommée atomiquement)
+
+        Returns:
+            str: Chemin de l'instantané, ou None en cas d'échec
+        """
+        with self._lock:
+            name = f"{self.prefix}-{datetime.now():%Y%m%d-%H%M%S}{SNAPSHOT_SUFFIX}"
+            path = os.path.join(self.backup_dir, name)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            start = time.perf_counter()
+
+            try:
+                self._copy(tmp_path)
+
+                if not self.verify(tmp_path):
+                    raise sqlite3.DatabaseError("Vérification d'intégrité de la copie échouée")
+
+                os.replace(tmp_path, path)
+
+            except _TooManyRestarts:
+                # Pas de copie en une étape : elle bloquerait les écritures de l'application
+                logger.warning(f"Base {self.db_path} trop active pour une copie incrémentale : sauvegarde reportée")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return None
+
+            except Exception as e:
+                logger.error(f"Erreur lors de la sauvegarde de {self.db_path}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return None
+
+            logger.info(f"Sauvegarde créée : {path} ({time.perf_counter() - start:.1f} s)")
+            self._prune()
+            return path
+
+    @staticmethod
+    def verify(path: str) -> bool:
+        """Vérification complète de l'intégrité d'un fichier SQLite"""
+        try:
+            conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+            try:
+                result = conn.execute('PRAGMA integrity_check').fetchone()
+            finally:
+                conn.close()
+            return result is not None and result[0] == 'ok'
+        except sqlite3.Error as e:
+            logger.error(f"Instantané illisible {path}: {e}")
+            return False
+
+    def list_snapshots(self) -> List[Dict]:
+        """Instantanés disponibles, du plus récent au plus ancien"""
+        snapshots = []
+        for name in os.listdir(self.backup_dir):
+            if name.startswith(f'{self.prefix}-') and name.endswith(SNAPSHOT_SUFFIX):
+                path = os.path.join(self.backup_dir, name)
+                stat = os.stat(path)
+                snapshots.append({
+                    'name': name,
+                    'path': path,
+                    'size': stat.st_size,
+                    'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                })
+        snapshots.sort(key=lambda snapshot: snapshot['name'], reverse=True)
+        return snapshots
+
+    def _prune(self):
+        for snapshot in self.list_snapshots()[self.retention:]:
+            try:
+                os.remove(snapshot['path'])
+                logger.info(f"Ancienne sauvegarde supprimée : {snapshot['name']}")
+            except OSError as e:
+                logger.warning(f"Impossible de supprimer {snapshot['name']}: {e}")
+
+    def restore(self, snapshot_path: str) -> bool:
+        """
+        Restauration d'un instantané dans la base (copie en une seule étape)
+
+        Les connexions ouvertes voient le contenu restauré à leur prochaine
+        transaction ; aucun fichier n'est remplacé sous l'application.
+        """
+        if not self.verify(snapshot_path):
+            logger.error(f"Restauration annulée : instantané invalide {snapshot_path}")
+            return False
+
+        with self._lock:
+            try:
+                source = sqlite3.connect(f'file:{snapshot_path}?mode=ro', uri=True)
+                target = sqlite3.connect(self.db_path, timeout=30)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                    source.close()
+            except sqlite3.Error as e:
+                logger.error(f"Erreur lors de la restauration de {snapshot_path}: {e}")
+                return False
+
+        logger.info(f"Base restaurée depuis {snapshot_path}")
+        return True
+
+    def start_schedule(self, interval: float):
+        """
+        Instantanés périodiques en arrière-plan (toutes les interval secondes)
+
+        Plusieurs processus peuvent démarrer la planification : un verrou de
+        fichier et l'âge du dernier instantané évitent les copies en double.
+        """
+        if interval <= 0 or (self._scheduler is not None and self._scheduler.is_alive()):
+            return
+
+        self._scheduler = threading.Thread(target=self._run_schedule, args=(interval,), name='backups', daemon=True)
+        self._scheduler.start()
+
+    def shard_managers(self) -> List['BackupManager']:
+        """Sauvegardes des bases de comptes présentes dans shards_dir (une par compte)"""
+        if not self.shards_dir or not os.path.isdir(self.shards_dir):
+            return []
+        for name in sorted(os.listdir(self.shards_dir)):
+            account_id, ext = os.path.splitext(name)
+            if ext == SNAPSHOT_SUFFIX and account_id not in self._shards:
+                self._shards[account_id] = BackupManager(
+                    os.path.join(self.shards_dir, name),
+                    os.path.join(self.backup_dir, 'accounts', account_id),
+                    retention=self.retention,
+                    pages_per_step=self.pages_per_step,
+                    step_sleep=self.step_sleep
+                )
+        return list(self._shards.values())
+
+    def _run_schedule(self, interval: float):
+        while True:
+            for manager in [self] + self.shard_managers():
+                try:
+                    manager._scheduled_snapshot(interval)
+                except Exception as e:
+                    logger.error(f"Erreur de la sauvegarde planifiée de {manager.db_path}: {e}")
+            time.sleep(min(interval, 300))
+
+    def _scheduled_snapshot(self, interval: float):
+        snapshots = self.list_snapshots()
+        if snapshots and time.time() - os.path.getmtime(snapshots[0]['path']) < interval:
+            return
+
+        with open(os.path.join(self.backup_dir, '.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return  # Sauvegarde en cours dans un autre processus
+
+            # Relecture sous verrou : un autre processus vient peut-être de terminer
+            snapshots = self.list_snapshots()
+            if not snapshots or time.time() - os.path.getmtime(snapshots[0]['path']) >= interval:
+                self.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sauvegardes de la base SQLite')
+    parser.add_argument('--database', help='Fichier SQLite (DATABASE_PATH par défaut)')
+    parser.add_argument('--backup-dir', help='Dossier des instantanés (BACKUP_DIR par défaut)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('snapshot', help='Crée un instantané vérifié')
+    subparsers.add_parser('list', help='Liste les instantanés')
+    verify_parser = subparsers.add_parser('verify', help='Vérifie un instantané')
+    verify_parser.add_argument('path')
+    restore_parser = subparsers.add_parser('restore', help='Restaure un instantané dans la base')
+    restore_parser.add_argument('path')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    manager = BackupManager(
+        args.database or os.environ.get('DATABASE_PATH', 'youtube_organizer.db'),
+        args.backup_dir or os.environ.get('BACKUP_DIR', 'backups'),
+        retention=int(os.environ.get('BACKUP_RETENTION', 7))
+    )
+
+    if args.command == 'snapshot':
+        ok = manager.snapshot() is not None
+    elif args.command == 'list':
+        for snapshot in manager.list_snapshots():
+            print(f"{snapshot['name']}  {snapshot['size'] / 1024 / 1024:8.1f} Mo  {snapshot['created_at']}")
+        ok = True
+    elif args.command == 'verify':
+        ok = manager.verify(args.path)
+        print('OK' if ok else 'ÉCHEC')
+    else:
+        ok = manager.restore(args.path)
+
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
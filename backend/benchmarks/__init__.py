@@ -0,0 +1,4 @@
+"""
+Benchmarks de YouTube Organizer
+À lancer depuis le dossier backend : python -m benchmarks.<module>
+"""
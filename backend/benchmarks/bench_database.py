@@ -0,0 +1,236 @@
+"""
+Benchmark de la couche base de données (database.py)
+Génère des jeux de données synthétiques (descriptions et tags réalistes) de
+plusieurs tailles et mesure les opérations de Database : écriture unitaire et
+groupée, lectures filtrées, statistiques, catégories et mises à jour.
+
+Les résultats sont écrits en JSON ; le mode comparaison échoue (code de
+sortie 1) si une médiane dépasse celle de la référence au-delà du seuil.
+
+    python -m benchmarks.bench_database --sizes 1000,10000,100000 --output baseline.json
+    python -m benchmarks.bench_database --compare baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from database import Database  # noqa: E402
+
+CATEGORIES = ['dev', 'electronics', 'ai', 'design', 'business', 'uncategorized']
+
+# Répartition approximative d'une playlist réelle : majorité non catégorisée
+CATEGORY_WEIGHTS = [10, 6, 12, 5, 7, 60]
+
+VOCABULARY = (
+    'python javascript rust tutorial arduino raspberry esp32 circuit soldering oscilloscope '
+    'machine learning neural network transformer llm prompt dataset training inference gpu '
+    'design figma typography color layout interface ux prototype branding illustration '
+    'startup marketing revenue growth productivity habits interview career podcast review '
+    'beginner advanced complete guide explained project build from scratch tips mistakes '
+    'vidéo chaîne abonnez-vous lien description épisode partie semaine nouveau meilleur'
+).split()
+
+LINK_LINES = [
+    'Code source : https://github.com/example/project',
+    'Abonnez-vous : https://youtube.com/@example',
+    'Timestamps :\n00:00 Introduction\n02:15 Démonstration\n10:40 Conclusion',
+    'Sponsor : https://example.com/promo'
+]
+
+# Nombre d'appels mesurés pour les opérations unitaires (écritures, mises à jour)
+UNIT_OPERATIONS = 200
+
+
+def generate_videos(count: int, seed: int = 42) -> List[Dict]:
+    """Jeu de vidéos synthétiques au format de YouTubeAPI.get_watch_later_videos"""
+    rng = random.Random(seed)
+    channels = [(f'UC{rng.getrandbits(64):016x}', f'Chaîne {i}') for i in range(max(10, count // 25))]
+    start = datetime(2020, 1, 1)
+
+    videos = []
+    for i in range(count):
+        channel_id, channel_title = rng.choice(channels)
+        words = rng.choices(VOCABULARY, k=rng.randint(60, 400))
+        description = '\n\n'.join([
+            ' '.join(words),
+            *rng.sample(LINK_LINES, rng.randint(0, len(LINK_LINES)))
+        ])
+        added = start + timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 5))
+        videos.append({
+            'id': f'vid{i:08d}',
+            'title': ' '.join(rng.choices(VOCABULARY, k=rng.randint(4, 12))).capitalize(),
+            'description': description,
+            'channel_title': channel_title,
+            'channel_id': channel_id,
+            'thumbnail_url': f'https://i.ytimg.com/vi/vid{i:08d}/mqdefault.jpg',
+            'duration': f'PT{rng.randint(0, 2)}H{rng.randint(0, 59)}M{rng.randint(0, 59)}S',
+            'published_at': (added - timedelta(days=rng.randint(0, 900))).isoformat() + 'Z',
+            'added_to_playlist_at': added.isoformat() + 'Z',
+            'tags': rng.sample(VOCABULARY, rng.randint(0, 15)),
+            'view_count': int(rng.paretovariate(1.2) * 1000),
+            'like_count': int(rng.paretovariate(1.5) * 50)
+        })
+    return videos
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict:
+    """Médiane et minimum de repeat exécutions (secondes)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(timings), 'min_s': min(timings), 'runs': repeat}
+
+
+def measure_each(func: Callable[[object], object], items: List, repeat: int) -> Dict:
+    """Temps moyen par appel sur une liste d'arguments, répété repeat fois"""
+    result = measure(lambda: [func(item) for item in items], repeat)
+    result['median_s'] /= len(items)
+    result['min_s'] /= len(items)
+    result['ops'] = len(items)
+    return result
+
+
+def run_size(count: int, repeat: int, tmp_dir: str) -> Dict[str, Dict]:
+    """Toutes les mesures pour un jeu de count vidéos"""
+    videos = generate_videos(count)
+    rng = random.Random(count)
+    results: Dict[str, Dict] = {}
+
+    # Écriture groupée : base neuve à chaque exécution
+    def bulk_ingest():
+        path = os.path.join(tmp_dir, f'bulk_{count}.db')
+        if os.path.exists(path):
+            os.remove(path)
+        db = Database(path)
+        db.init_db()
+        db.save_videos(videos)
+
+    results['save_videos_bulk'] = measure(bulk_ingest, repeat)
+
+    db = Database(os.path.join(tmp_dir, f'bulk_{count}.db'))
+
+    # Catégories et statut attribués pour que les filtres aient un sens
+    with db.get_connection() as conn:
+        conn.executemany('UPDATE videos SET category = ?, watched = ? WHERE id = ?', [
+            (rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0], rng.random() < 0.3, video['id'])
+            for video in videos
+        ])
+
+    # Écriture unitaire : nouvelles vidéos, puis mises à jour de vidéos existantes
+    extra = generate_videos(UNIT_OPERATIONS, seed=count + 1)
+    for video in extra:
+        video['id'] = f'new{video["id"]}'
+    results['save_video_insert'] = measure_each(db.save_video, extra, 1)
+    results['save_video_update'] = measure_each(db.save_video, rng.sample(videos, UNIT_OPERATIONS), repeat)
+
+    # Lectures filtrées
+    frequent_word = 'python'
+    queries = {
+        'get_videos_all': {},
+        'get_videos_category': {'category': 'ai'},
+        'get_videos_watched': {'watched': False},
+        'get_videos_search': {'search': frequent_word},
+        'get_videos_search_miss': {'search': 'introuvable-xyz'},
+        'get_videos_combined': {'category': 'dev', 'watched': False, 'search': frequent_word},
+        'get_videos_limit_50': {'limit': 50}
+    }
+    for name, kwargs in queries.items():
+        results[name] = measure(lambda kwargs=kwargs: db.get_videos(**kwargs), repeat)
+
+    results['get_stats'] = measure(db.get_stats, repeat)
+    results['get_categories'] = measure(db.get_categories, repeat)
+
+    # Mises à jour
+    targets = [video['id'] for video in rng.sample(videos, UNIT_OPERATIONS)]
+    results['update_video_watched'] = measure_each(lambda video_id: db.update_video_watched(video_id, True), targets, repeat)
+    results['update_video_category'] = measure_each(
+        lambda video_id: db.update_video_category(video_id, rng.choice(CATEGORIES)), targets, repeat
+    )
+
+    return results
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Liste des régressions (médiane supérieure à la référence de plus de threshold)"""
+    regressions = []
+    for size, benchmarks in report['results'].items():
+        for name, result in benchmarks.items():
+            reference = baseline.get('results', {}).get(size, {}).get(name)
+            if not reference:
+                continue
+            ratio = result['median_s'] / reference['median_s']
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{size:>7s} {name:25s} {reference['median_s'] * 1000:10.3f} ms -> "
+                    f"{result['median_s'] * 1000:10.3f} ms (x{ratio:.2f})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la base de données')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Tailles des jeux de données (séparées par des virgules)')
+    parser.add_argument('--repeat', type=int, default=5, help='Nombre d\'exécutions par mesure')
+    parser.add_argument('--output', help='Fichier JSON de résultats (nouvelle référence)')
+    parser.add_argument('--compare', help='Fichier JSON de référence à comparer')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Régression tolérée (0.25 = +25 %%)')
+    args = parser.parse_args()
+
+    # Les erreurs restent visibles, pas le détail des opérations
+    logging.basicConfig(level=logging.WARNING)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'repeat': args.repeat
+        },
+        'results': {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in sizes:
+            print(f"--- {count} vidéos")
+            results = run_size(count, args.repeat, tmp_dir)
+            report['results'][str(count)] = results
+            for name, result in results.items():
+                unit = 'par appel' if 'ops' in result else ''
+                print(f"{name:25s} médiane {result['median_s'] * 1000:10.3f} ms  (min {result['min_s'] * 1000:.3f}) {unit}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%} :")
+            print('\n'.join(regressions))
+            sys.exit(1)
+        print(f"\nAucune régression au-delà de {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark de l'enregistrement Video face à l'ancien pipeline en dictionnaires
+Mesure, pour des réponses synthétiques de l'API, la construction des vidéos
+(playlistItems + videos.list), la mémoire occupée par la liste obtenue, puis
+la conversion en paramètres SQL et en données d'événement (JSON).
+
+Le pipeline de référence reproduit l'ancien chemin : détails extraits dans un
+dict intermédiaire, vidéo dict (clés thumbnail/channel_name), puis lectures
+.get() par couche (paramètres d'insertion, d'événement).
+
+    python -m benchmarks.bench_models --count 50000 --output models.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.bench_sync import synthetic_fixtures  # noqa: E402
+from models import Video  # noqa: E402
+
+
+def dict_video(item: Dict, video: Dict) -> Dict:
+    """Ancien chemin : parse_video_details puis build_video_data"""
+    detail = {
+        'duration': video['contentDetails'].get('duration', 'PT0S'),
+        'view_count': video['statistics'].get('viewCount', '0'),
+        'like_count': video['statistics'].get('likeCount', '0'),
+        'tags': video['snippet'].get('tags', []),
+        'category_id': video['snippet'].get('categoryId', ''),
+        'default_language': video['snippet'].get('defaultLanguage', ''),
+        'default_audio_language': video['snippet'].get('defaultAudioLanguage', '')
+    }
+    return {
+        'id': item['snippet']['resourceId']['videoId'],
+        'title': item['snippet']['title'],
+        'description': item['snippet']['description'],
+        'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
+        'channel_name': item['snippet']['channelTitle'],
+        'channel_id': item['snippet']['channelId'],
+        'published_at': item['snippet']['publishedAt'],
+        'added_to_playlist_at': item['snippet']['publishedAt'],
+        'duration': detail.get('duration', 'PT0S'),
+        'view_count': int(detail.get('view_count', 0)),
+        'like_count': int(detail.get('like_count', 0)),
+        'tags': detail.get('tags', []),
+        'category_id': detail.get('category_id', ''),
+        'watched': False,
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+
+
+def dict_rows(video_data: Dict) -> tuple:
+    """Ancien chemin : Database._insert_params et Database._event_data"""
+    params = (
+        video_data['id'], video_data.get('title'), video_data.get('description'),
+        video_data.get('channel_title'), video_data.get('channel_id'), video_data.get('thumbnail_url'),
+        video_data.get('duration'), video_data.get('published_at'),
+        video_data.get('added_to_playlist_at', datetime.now().isoformat()),
+        json.dumps(video_data.get('tags', [])), video_data.get('view_count', 0), video_data.get('like_count', 0)
+    )
+    event = {
+        'id': video_data['id'], 'title': video_data.get('title'), 'description': video_data.get('description'),
+        'channel_title': video_data.get('channel_title'), 'channel_id': video_data.get('channel_id'),
+        'thumbnail_url': video_data.get('thumbnail_url'), 'duration': video_data.get('duration'),
+        'published_at': video_data.get('published_at'), 'tags': video_data.get('tags', []),
+        'view_count': video_data.get('view_count', 0), 'like_count': video_data.get('like_count', 0)
+    }
+    return params, event
+
+
+def record_rows(video: Video) -> tuple:
+    return video.insert_params(datetime.now().isoformat()), video.to_dict()
+
+
+def build_all(fixtures: Dict[str, List[Dict]], build: Callable) -> List:
+    details = {video['id']: video for video in fixtures['videos']}
+    return [build(item, details[item['snippet']['resourceId']['videoId']]) for item in fixtures['playlist_items']]
+
+
+def measure(fn: Callable, repeat: int) -> Dict:
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return {'median_s': round(statistics.median(durations), 4), 'min_s': round(min(durations), 4)}
+
+
+def measure_memory(fn: Callable) -> float:
+    """Mémoire allouée (Mo) par le résultat de fn, gardé vivant pendant la mesure"""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()  # noqa: F841
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(current / 1024 / 1024, 2)
+
+
+def run(count: int, repeat: int) -> Dict:
+    fixtures = synthetic_fixtures(count)
+    pipelines = {'dict': (dict_video, dict_rows), 'video': (Video.from_api, record_rows)}
+
+    results = {}
+    for name, (build, rows) in pipelines.items():
+        videos = build_all(fixtures, build)
+        results[name] = {
+            'build': measure(lambda: build_all(fixtures, build), repeat),
+            'rows': measure(lambda: [rows(video) for video in videos], repeat),
+            'memory_mb': measure_memory(lambda: build_all(fixtures, build))
+        }
+        del videos
+
+    for key in ('build', 'rows'):
+        results[f'{key}_speedup'] = round(results['dict'][key]['median_s'] / results['video'][key]['median_s'], 2)
+    results['memory_ratio'] = round(results['dict']['memory_mb'] / results['video']['memory_mb'], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de l\'enregistrement Video')
+    parser.add_argument('--count', type=int, default=50000, help='Nombre de vidéos')
+    parser.add_argument('--repeat', type=int, default=5, help='Répétitions par mesure')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    args = parser.parse_args()
+
+    results = run(args.count, args.repeat)
+    for name in ('dict', 'video'):
+        result = results[name]
+        print(
+            f"{name:6s} | construction {result['build']['median_s']:7.3f} s | "
+            f"lignes + événements {result['rows']['median_s']:7.3f} s | mémoire {result['memory_mb']:8.1f} Mo"
+        )
+    print(
+        f"Gain : construction x{results['build_speedup']}, conversions x{results['rows_speedup']}, "
+        f"mémoire x{results['memory_ratio']}"
+    )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'count': args.count, 'repeat': args.repeat, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
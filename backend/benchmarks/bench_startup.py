@@ -0,0 +1,94 @@
+"""
+Benchmark du démarrage d'un worker
+Mesure, dans des processus neufs, le temps d'import de l'application, de
+création via create_app() et de la première requête (avec et sans accès aux
+services), pour suivre l'effet des imports différés.
+
+    python -m benchmarks.bench_startup --runs 10 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script exécuté dans chaque processus mesuré
+PROBE = r'''
+import json, time
+start = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+app = app_module.create_app()
+created = time.perf_counter()
+client = app.test_client()
+client.get('/')
+first_request = time.perf_counter()
+client.get('/stats')
+first_db_request = time.perf_counter()
+import sys
+print(json.dumps({
+    'import_s': imported - start,
+    'create_app_s': created - imported,
+    'first_request_s': first_request - created,
+    'first_db_request_s': first_db_request - first_request,
+    'total_s': first_db_request - start,
+    'google_client_loaded': 'googleapiclient.discovery' in sys.modules,
+    'pyarrow_loaded': 'pyarrow' in sys.modules
+}))
+'''
+
+
+def run_probe(env: dict) -> dict:
+    """Lance une mesure dans un interpréteur neuf"""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du démarrage de l\'application')
+    parser.add_argument('--runs', type=int, default=10, help='Nombre de processus mesurés')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ)
+        env.setdefault('GOOGLE_CLIENT_ID', 'benchmark')
+        env.setdefault('GOOGLE_CLIENT_SECRET', 'benchmark')
+        env['DATABASE_PATH'] = os.path.join(tmp_dir, 'startup.db')
+
+        samples = [run_probe(env) for _ in range(args.runs)]
+
+    report = {
+        'runs': args.runs,
+        'google_client_loaded': samples[-1]['google_client_loaded'],
+        'pyarrow_loaded': samples[-1]['pyarrow_loaded']
+    }
+    for key in ('import_s', 'create_app_s', 'first_request_s', 'first_db_request_s', 'total_s'):
+        values = [sample[key] for sample in samples]
+        report[key] = {
+            'median': statistics.median(values),
+            'min': min(values),
+            'max': max(values)
+        }
+
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(f"{key:20s} médiane {value['median'] * 1000:8.1f} ms  (min {value['min'] * 1000:.1f}, max {value['max'] * 1000:.1f})")
+    print(f"Client Google chargé au démarrage : {report['google_client_loaded']}")
+    print(f"pyarrow chargé au démarrage : {report['pyarrow_loaded']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""
+Benchmark de bout en bout de la synchronisation
+Rejoue des réponses de l'API YouTube (enregistrées ou synthétiques) à travers
+un transport local avec une latence simulée, puis exécute le chemin complet
+de /videos/sync : pagination de playlistItems, détails par lots (videos.list)
+et persistance en base.
+
+Deux modes sont mesurés :
+- threaded : YouTubeAPI (googleapiclient) et app.run_sync
+- async : AsyncYouTubeAPI (httpx) et asgi_app.run_sync (si les dépendances ASGI sont installées)
+
+Chaque scénario (mode, taille, latence) s'exécute dans un processus neuf pour
+que le pic de mémoire (RSS) lui soit propre.
+
+    python -m benchmarks.bench_sync --sizes 50,500,2000 --latencies 0,20,100 --output sync.json
+    python -m benchmarks.bench_sync --fixtures recorded.json --latencies 50
+
+Format des réponses enregistrées (ressources brutes de l'API) :
+    {"playlist_items": [<playlistItem>, ...], "videos": [<video>, ...]}
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.bench_database import generate_videos  # noqa: E402
+
+MODES = ('threaded', 'async')
+
+
+def synthetic_fixtures(count: int) -> Dict[str, List[Dict]]:
+    """Réponses synthétiques au format de l'API (playlistItems et videos)"""
+    playlist_items, resources = [], []
+    for video in generate_videos(count):
+        playlist_items.append({
+            'kind': 'youtube#playlistItem',
+            'snippet': {
+                'resourceId': {'kind': 'youtube#video', 'videoId': video['id']},
+                'title': video['title'],
+                'description': video['description'],
+                'thumbnails': {'medium': {'url': video['thumbnail_url']}},
+                'channelTitle': video['channel_title'],
+                'channelId': video['channel_id'],
+                'publishedAt': video['added_to_playlist_at']
+            },
+            'contentDetails': {'videoId': video['id'], 'videoPublishedAt': video['published_at']}
+        })
+        resources.append({
+            'kind': 'youtube#video',
+            'id': video['id'],
+            'snippet': {'tags': video['tags'], 'categoryId': '28', 'defaultAudioLanguage': 'fr'},
+            'contentDetails': {'duration': video['duration']},
+            'statistics': {'viewCount': str(video['view_count']), 'likeCount': str(video['like_count'])}
+        })
+    return {'playlist_items': playlist_items, 'videos': resources}
+
+
+class FakeYouTubeServer:
+    """Réponses de l'API servies depuis les fixtures, avec latence et compteur d'appels"""
+
+    def __init__(self, fixtures: Dict[str, List[Dict]], latency: float):
+        self.playlist_items = fixtures['playlist_items']
+        self.videos = {video['id']: video for video in fixtures['videos']}
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+
+    def respond(self, url: str) -> Tuple[int, bytes]:
+        parsed = urlparse(url)
+        resource_name = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        self.calls[resource_name] = self.calls.get(resource_name, 0) + 1
+
+        if resource_name == 'playlistItems':
+            offset = int(params.get('pageToken') or 0)
+            page_size = int(params.get('maxResults', 5))
+            items = self.playlist_items[offset:offset + page_size]
+            body = {'items': items, 'pageInfo': {'totalResults': len(self.playlist_items)}}
+            if offset + page_size < len(self.playlist_items):
+                body['nextPageToken'] = str(offset + page_size)
+        elif resource_name == 'videos':
+            ids = params.get('id', '').split(',')
+            body = {'items': [self.videos[video_id] for video_id in ids if video_id in self.videos]}
+        else:
+            return 404, b'{"error": {"code": 404, "message": "not found"}}'
+
+        return 200, json.dumps(body).encode('utf-8')
+
+    # Interface httplib2 attendue par googleapiclient
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        import httplib2
+        time.sleep(self.latency)
+        status, content = self.respond(uri)
+        return httplib2.Response({'status': status, 'content-type': 'application/json'}), content
+
+    # Transport httpx (mode asynchrone)
+    async def handle_async(self, request):
+        import httpx
+        await asyncio.sleep(self.latency)
+        status, content = self.respond(str(request.url))
+        return httpx.Response(status, content=content, headers={'content-type': 'application/json'})
+
+
+class NullThumbnails:
+    """Préchargement des miniatures désactivé (hors du périmètre mesuré)"""
+
+    def prefetch(self, videos):
+        pass
+
+
+def run_threaded(server: FakeYouTubeServer, count: int, runs: int) -> List[float]:
+    from googleapiclient.discovery import build
+
+    from app import create_app, run_sync
+    from youtube_api import YouTubeAPI
+
+    class PlaylistAPI(YouTubeAPI):
+        """Le jeton est ignoré : le service est déjà construit sur le transport local"""
+
+        def _new_http(self, access_token=None):
+            return None
+
+    app = create_app()
+    services = app.extensions['services']
+    api = PlaylistAPI()
+    api.service = build('youtube', 'v3', http=server, static_discovery=True)
+    services._instances['youtube_api'] = api
+    services._instances['thumbnails'] = NullThumbnails()
+
+    timings = []
+    try:
+        with app.app_context():
+            for run in range(runs):
+                start = time.perf_counter()
+                run_sync('benchmark-token', f'bench-{run}', ['WL'])
+                timings.append(time.perf_counter() - start)
+    finally:
+        # Catégorisation d'arrière-plan arrêtée avant la suppression de la base temporaire
+        services.close()
+    return timings
+
+
+def run_async(server: FakeYouTubeServer, count: int, runs: int) -> List[float]:
+    import httpx
+
+    import asgi_app
+    from app import create_app
+    from youtube_async import AsyncYouTubeAPI
+
+    app = create_app()
+    services = app.extensions['services']
+    services._instances['thumbnails'] = NullThumbnails()
+
+    async def main():
+        state = SimpleNamespace(
+            services=services,
+            db=asgi_app.AsyncDatabase(services.db, max_workers=services.config.ASYNC_DB_THREADS),
+            youtube_api=AsyncYouTubeAPI(transport=httpx.MockTransport(server.handle_async))
+        )
+        timings = []
+        try:
+            for run in range(runs):
+                start = time.perf_counter()
+                result = await asgi_app.run_sync(state, services, 'benchmark-token', f'bench-{run}', ['WL'])
+                timings.append(time.perf_counter() - start)
+                assert result['total_videos'] == count
+        finally:
+            await state.youtube_api.aclose()
+            state.db.shutdown()
+            services.close()
+        return timings
+
+    return asyncio.run(main())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_scenario(mode: str, count: int, latency_ms: float, runs: int, fixtures_path: Optional[str]) -> Dict:
+    """Un scénario complet (exécuté dans un processus dédié)"""
+    import logging
+    logging.disable(logging.INFO)
+
+    if fixtures_path:
+        with open(fixtures_path) as f:
+            fixtures = json.load(f)
+        count = len(fixtures['playlist_items'])
+    else:
+        fixtures = synthetic_fixtures(count)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ.setdefault('GOOGLE_CLIENT_ID', 'benchmark')
+        os.environ.setdefault('GOOGLE_CLIENT_SECRET', 'benchmark')
+        os.environ['DATABASE_PATH'] = os.path.join(tmp_dir, 'sync.db')
+        os.environ['THUMBNAIL_CACHE_DIR'] = os.path.join(tmp_dir, 'thumbnails')
+        os.environ['METADATA_DATABASE_PATH'] = os.path.join(tmp_dir, 'metadata.db')
+
+        server = FakeYouTubeServer(fixtures, latency_ms / 1000)
+        runner = run_threaded if mode == 'threaded' else run_async
+        timings = runner(server, count, runs)
+
+    # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+    median = statistics.median(timings)
+    return {
+        'mode': mode,
+        'videos': count,
+        'latency_ms': latency_ms,
+        'runs': runs,
+        'p50_s': median,
+        'p99_s': percentile(timings, 0.99),
+        'first_sync_s': timings[0],
+        'videos_per_s': count / median if median else None,
+        'api_calls_per_sync': sum(server.calls.values()) / runs,
+        'api_calls_by_resource': {name: calls / runs for name, calls in server.calls.items()},
+        'peak_rss_mb': round(peak_rss_mb, 1)
+    }
+
+
+def available_modes(requested: List[str]) -> List[str]:
+    modes = []
+    for mode in requested:
+        if mode == 'async':
+            try:
+                import a2wsgi, httpx, starlette  # noqa: F401
+            except ImportError:
+                print("Mode async ignoré : dépendances ASGI non installées (voir requirements.py)")
+                continue
+        modes.append(mode)
+    return modes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de bout en bout de la synchronisation')
+    parser.add_argument('--sizes', default='50,500,2000', help='Tailles de playlist (séparées par des virgules)')
+    parser.add_argument('--latencies', default='0,20,100', help='Latences simulées par appel, en ms')
+    parser.add_argument('--modes', default=','.join(MODES), help='Modes mesurés (threaded, async)')
+    parser.add_argument('--runs', type=int, default=5, help='Synchronisations par scénario')
+    parser.add_argument('--fixtures', help='Réponses enregistrées (JSON) à la place des données synthétiques')
+    parser.add_argument('--output', help='Fichier JSON de résultats')
+    args = parser.parse_args()
+
+    sizes = [0] if args.fixtures else [int(size) for size in args.sizes.split(',')]
+    latencies = [float(latency) for latency in args.latencies.split(',')]
+    modes = available_modes(args.modes.split(','))
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for mode in modes:
+        for count in sizes:
+            for latency_ms in latencies:
+                with context.Pool(1) as pool:
+                    result = pool.apply(run_scenario, (mode, count, latency_ms, args.runs, args.fixtures))
+                results.append(result)
+                print(
+                    f"{mode:8s} {result['videos']:6d} vidéos {latency_ms:6.0f} ms | "
+                    f"p50 {result['p50_s']:7.3f} s  p99 {result['p99_s']:7.3f} s | "
+                    f"{result['videos_per_s']:8.0f} vidéos/s | "
+                    f"{result['api_calls_per_sync']:5.0f} appels | RSS {result['peak_rss_mb']:6.1f} Mo"
+                )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'runs': args.runs, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Catégorisation automatique des vidéos
+Un modèle linéaire apprend des catégories attribuées manuellement (titre,
+tags, chaîne et début de la description) et propose une catégorie, avec sa
+confiance, pour les vidéos encore non catégorisées.
+
+- Les textes sont vectorisés par hachage (sans vocabulaire à construire) et
+  les vidéos sont évaluées par lots, en une opération matricielle.
+- Chaque catégorie choisie par l'utilisateur est apprise de façon
+  incrémentale en arrière-plan ; un réentraînement complet n'a lieu qu'à
+  l'apparition d'une nouvelle catégorie.
+- Après un apprentissage incrémental, seules les vidéos proches des vidéos
+  apprises (même chaîne, mot du titre en commun) sont réévaluées ; toute la
+  bibliothèque l'est après FULL_RESCORE_EVERY choix. Une suggestion inchangée
+  (même catégorie, confiance à CONFIDENCE_TOLERANCE près) n'est pas réécrite.
+- Les vidéos synchronisées sont évaluées par le même thread d'arrière-plan :
+  la synchronisation n'attend pas les suggestions.
+
+Nécessite scikit-learn et numpy (optionnels) : sans eux, aucune suggestion.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from similarity import normalize_words
+
+try:
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+except ImportError:  # Catégorisation automatique optionnelle
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Longueur de description prise en compte (le début est le plus informatif)
+DESCRIPTION_CHARS = 1000
+
+# Délai de regroupement des catégories apprises avant traitement (secondes)
+LEARN_DEBOUNCE = 2.0
+
+# Choix appris de façon incrémentale entre deux réévaluations complètes
+FULL_RESCORE_EVERY = 50
+
+# Mots des titres appris utilisés pour trouver les vidéos à réévaluer
+MAX_RELATED_WORDS = 50
+MIN_WORD_LENGTH = 3
+
+# Écart de confiance en deçà duquel une suggestion de même catégorie n'est pas réécrite
+CONFIDENCE_TOLERANCE = 0.05
+
+_MISSING = object()
+
+
+def video_document(video: Dict) -> str:
+    """Texte représentant une vidéo (titre doublé pour peser davantage, chaîne en jeton dédié)"""
+    tags = video.get('tags') or []
+    title = video.get('title') or ''
+    return ' '.join([
+        title,
+        title,
+        ' '.join(tag.replace(' ', '_') for tag in tags),
+        f"chaine_{video.get('channel_id') or ''}",
+        (video.get('description') or '')[:DESCRIPTION_CHARS]
+    ])
+
+
+class AutoCategorizer:
+    """Suggestion de catégories à partir des choix manuels de l'utilisateur"""
+
+    def __init__(self, db, min_labels: int = 20, min_confidence: float = 0.5,
+                 batch_size: int = 2000):
+        """
+        Args:
+            db: Base de données (Database)
+            min_labels: Nombre minimal de vidéos classées avant toute suggestion
+            min_confidence: Confiance minimale d'une suggestion enregistrée
+            batch_size: Taille des lots évalués en une opération
+        """
+        self.db = db
+        self.min_labels = min_labels
+        self.min_confidence = min_confidence
+        self.batch_size = batch_size
+
+        self.model = None
+        self._lock = threading.Lock()
+        self._pending: Dict[str, str] = {}
+        self._to_suggest: Dict[str, Dict] = {}
+        self._retrain_requested = False
+        self._partial_updates = 0
+        self._stopped = False
+        self._wakeup = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+        if np is not None:
+            self.vectorizer = HashingVectorizer(
+                n_features=2 ** 18,
+                ngram_range=(1, 2),
+                strip_accents='unicode',
+                alternate_sign=False
+            )
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def _new_model(self):
+        return SGDClassifier(loss='log_loss', alpha=1e-5, max_iter=20, tol=None, random_state=0)
+
+    def _vectorize(self, videos: List[Dict]):
+        return self.vectorizer.transform([video_document(video) for video in videos])
+
+    def retrain(self) -> bool:
+        """Entraînement complet sur toutes les vidéos classées manuellement"""
+        if not self.available:
+            return False
+
+        videos = self.db.get_categorized_videos()
+        labels = [video['category'] for video in videos]
+        if len(videos) < self.min_labels or len(set(labels)) < 2:
+            logger.info(f"Catégorisation automatique : {len(videos)} vidéos classées, apprentissage différé")
+            return False
+
+        model = self._new_model()
+        model.fit(self._vectorize(videos), labels)
+        with self._lock:
+            self.model = model
+
+        logger.info(f"Catégorisation automatique entraînée sur {len(videos)} vidéos ({len(model.classes_)} catégories)")
+        return True
+
+    def suggest(self, videos: Iterable[Dict]) -> int:
+        """
+        Évaluation par lots et enregistrement des suggestions
+
+        Args:
+            videos: Vidéos à évaluer (les vidéos déjà catégorisées sont ignorées en base)
+
+        Returns:
+            int: Nombre de suggestions enregistrées
+        """
+        model = self.model
+        if model is None:
+            return 0
+
+        videos = list(videos)
+        saved = 0
+        for start in range(0, len(videos), self.batch_size):
+            batch = videos[start:start + self.batch_size]
+            features = self._vectorize(batch)
+            with self._lock:  # Pas d'évaluation pendant un apprentissage incrémental
+                probabilities = model.predict_proba(features)
+            best = probabilities.argmax(axis=1)
+            confidences = probabilities[np.arange(len(batch)), best]
+
+            suggestions = []
+            for video, index, confidence in zip(batch, best, confidences):
+                if confidence >= self.min_confidence:
+                    suggestion = (str(model.classes_[index]), round(float(confidence), 3))
+                else:
+                    suggestion = (None, None)
+                if not self._changed(video, *suggestion):
+                    continue
+                suggestions.append((video['id'],) + suggestion)
+            if suggestions:
+                saved += self.db.save_category_suggestions(suggestions)
+
+        return saved
+
+    @staticmethod
+    def _changed(video: Dict, category: Optional[str], confidence: Optional[float]) -> bool:
+        """Suggestion différente de celle déjà enregistrée (inconnue pour une vidéo synchronisée)"""
+        previous = video.get('suggestion_confidence', _MISSING)
+        if previous is _MISSING:
+            return True
+        if category != video.get('suggested_category'):
+            return True
+        return category is not None and abs(confidence - previous) >= CONFIDENCE_TOLERANCE
+
+    def categorize(self, videos: Iterable[Dict]):
+        """Suggestions pour des vidéos synchronisées (évaluées en arrière-plan)"""
+        if not self.available:
+            return
+
+        with self._wakeup:
+            if self.model is None:
+                # Sans modèle : l'entraînement réévalue toutes les vidéos non catégorisées
+                self._retrain_requested = True
+            else:
+                self._to_suggest.update((video['id'], video) for video in videos)
+            self._ensure_worker()
+            self._wakeup.notify()
+
+    def suggest_uncategorized(self) -> int:
+        """Évaluation de toutes les vidéos non catégorisées"""
+        return self.suggest(self.db.get_uncategorized_videos())
+
+    def learn(self, video_id: str, category: str):
+        """Prise en compte d'une catégorie choisie par l'utilisateur (traitée en arrière-plan)"""
+        if not self.available:
+            return
+
+        with self._wakeup:
+            self._pending[video_id] = category
+            self._ensure_worker()
+            self._wakeup.notify()
+
+    def schedule_retrain(self):
+        """Réentraînement complet et réévaluation en arrière-plan"""
+        if not self.available:
+            return
+
+        with self._wakeup:
+            self._retrain_requested = True
+            self._ensure_worker()
+            self._wakeup.notify()
+
+    def stop(self):
+        """
+        Arrêt du thread d'arrière-plan (compte évincé du cache, arrêt du processus)
+
+        Les choix en attente ne sont pas perdus : ils sont en base et seront
+        appris au prochain entraînement complet.
+        """
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify_all()
+            worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+
+    def _ensure_worker(self):
+        if self._stopped:
+            return
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='categorizer', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                self._wakeup.wait_for(
+                    lambda: self._stopped or self._pending or self._retrain_requested or self._to_suggest
+                )
+                # Regroupement des choix successifs de l'utilisateur (interrompu par stop)
+                if self._wakeup.wait_for(lambda: self._stopped, timeout=LEARN_DEBOUNCE):
+                    return
+                pending, self._pending = self._pending, {}
+                to_suggest, self._to_suggest = self._to_suggest, {}
+                full_retrain, self._retrain_requested = self._retrain_requested, False
+
+            try:
+                self._process(pending, full_retrain, list(to_suggest.values()))
+            except Exception as e:
+                logger.error(f"Erreur lors de l'apprentissage de la catégorisation: {e}")
+
+    def _process(self, pending: Dict[str, str], full_retrain: bool, to_suggest: List[Dict]):
+        model = self.model
+
+        # Vidéos synchronisées seulement : inutile de réévaluer toute la base
+        if model is not None and not pending and not full_retrain:
+            self.suggest(to_suggest)
+            return
+
+        # Catégorie inconnue du modèle : entraînement complet nécessaire
+        if model is None or full_retrain or not set(pending.values()) <= set(model.classes_):
+            if not self.retrain():
+                return
+        elif pending:
+            videos = [video for video in map(self.db.get_video_by_id, pending) if video]
+            if videos:
+                features = self._vectorize(videos)
+                with self._lock:
+                    model.partial_fit(features, [video['category'] for video in videos])
+
+            self._partial_updates += len(pending)
+            if self._partial_updates < FULL_RESCORE_EVERY:
+                self.suggest(self._related_uncategorized(videos))
+                return
+
+        self._partial_updates = 0
+        self.suggest_uncategorized()
+
+    def _related_uncategorized(self, videos: List[Dict]) -> List[Dict]:
+        """Vidéos non catégorisées dont la suggestion dépend surtout des vidéos apprises"""
+        channel_ids = sorted({video['channel_id'] for video in videos if video.get('channel_id')})
+        words = []
+        for video in videos:
+            for word in normalize_words(video.get('title')):
+                if len(word) >= MIN_WORD_LENGTH and word not in words:
+                    words.append(word)
+        return self.db.get_uncategorized_related(channel_ids, words[:MAX_RELATED_WORDS])
@@ -30,9 +30,90 @@ class Config:
         self.YOUTUBE_API_BASE_URL = 'https://www.googleapis.com/youtube/v3'
         self.MAX_VIDEOS_PER_REQUEST = 50  # Limite YouTube API
         
+        # Mode ASGI : pool de connexions HTTP/2 vers Google et threads dédiés à SQLite / Flask
+        self.ASYNC_MAX_CONNECTIONS = int(os.environ.get('ASYNC_MAX_CONNECTIONS', 100))
+        self.ASYNC_DB_THREADS = int(os.environ.get('ASYNC_DB_THREADS', 8))
+        self.ASYNC_WSGI_THREADS = int(os.environ.get('ASYNC_WSGI_THREADS', 16))
+        
         # Configuration base de données
         self.DATABASE_PATH = os.environ.get('DATABASE_PATH', 'youtube_organizer.db')
         
+        # Partitionnement par compte : un fichier SQLite par compte dans ce dossier (vide = base unique)
+        # et nombre maximal de comptes ouverts simultanément par processus
+        self.ACCOUNT_SHARDS_DIR = os.environ.get('ACCOUNT_SHARDS_DIR', '')
+        self.ACCOUNT_MAX_OPEN = int(os.environ.get('ACCOUNT_MAX_OPEN', 64))
+        
+        # Métadonnées des vidéos (videos.list) partagées entre comptes : fichier et durée de réutilisation (0 = désactivées)
+        self.METADATA_DATABASE_PATH = os.environ.get('METADATA_DATABASE_PATH', 'video_metadata.db')
+        self.METADATA_MAX_AGE_HOURS = float(os.environ.get('METADATA_MAX_AGE_HOURS', 24))
+        
+        # Flux de changements (SSE) : événements de progression conservés en mémoire, maintien
+        # de la connexion et intervalle de relecture du journal (écritures des autres processus)
+        self.CHANGE_FEED_MAX_EVENTS = int(os.environ.get('CHANGE_FEED_MAX_EVENTS', 1000))
+        self.CHANGE_FEED_HEARTBEAT = float(os.environ.get('CHANGE_FEED_HEARTBEAT', 15))
+        self.CHANGE_FEED_POLL_INTERVAL = float(os.environ.get('CHANGE_FEED_POLL_INTERVAL', 1))
+        
+        # Journal des changements : nombre d'entrées conservées pour /videos/changes
+        self.CHANGE_LOG_RETENTION = int(os.environ.get('CHANGE_LOG_RETENTION', 10000))
+        
+        # Cache local des miniatures
+        self.THUMBNAIL_CACHE_DIR = os.environ.get('THUMBNAIL_CACHE_DIR', 'thumbnails')
+        self.THUMBNAIL_CACHE_MAX_MB = int(os.environ.get('THUMBNAIL_CACHE_MAX_MB', 500))
+        self.THUMBNAIL_PREFETCH_CONCURRENCY = int(os.environ.get('THUMBNAIL_PREFETCH_CONCURRENCY', 8))
+        
+        # Catégorisation automatique : vidéos classées requises et confiance minimale des suggestions
+        self.CATEGORIZER_MIN_LABELS = int(os.environ.get('CATEGORIZER_MIN_LABELS', 20))
+        self.CATEGORIZER_MIN_CONFIDENCE = float(os.environ.get('CATEGORIZER_MIN_CONFIDENCE', 0.5))
+        
+        # Planification du visionnage : poids des catégories ('ai:1.5,dev:1.2') et budget maximal
+        self.PLAN_CATEGORY_WEIGHTS = os.environ.get('PLAN_CATEGORY_WEIGHTS', '')
+        self.PLAN_MAX_MINUTES = int(os.environ.get('PLAN_MAX_MINUTES', 24 * 60))
+        
+        # Synchronisation : intervalle minimal par compte (secondes)
+        self.SYNC_MIN_INTERVAL = float(os.environ.get('SYNC_MIN_INTERVAL', 60))
+        
+        # Playlists synchronisées par défaut (IDs séparés par des virgules, WL = « À regarder plus tard »)
+        self.SYNC_PLAYLISTS = os.environ.get('SYNC_PLAYLISTS', 'WL')
+        
+        # Retraits détectés à la synchronisation : part maximale d'une playlist archivée en une fois
+        self.SYNC_REMOVAL_MAX_FRACTION = float(os.environ.get('SYNC_REMOVAL_MAX_FRACTION', 0.5))
+        
+        # Synchronisation sans navigateur (sync_cli.py) : comptes enregistrés à la connexion (vide = aucun),
+        # processus en parallèle et plafond global de quota par exécution (unités de l'API)
+        self.ACCOUNTS_FILE = os.environ.get('ACCOUNTS_FILE', '')
+        self.SYNC_CLI_WORKERS = int(os.environ.get('SYNC_CLI_WORKERS', 4))
+        self.SYNC_QUOTA_CAP = int(os.environ.get('SYNC_QUOTA_CAP', 10000))
+        
+        # Limitation par session des endpoints coûteux (requêtes par fenêtre en secondes)
+        self.RATE_LIMIT_REQUESTS = int(os.environ.get('RATE_LIMIT_REQUESTS', 30))
+        self.RATE_LIMIT_WINDOW = float(os.environ.get('RATE_LIMIT_WINDOW', 60))
+        
+        # Progression de lecture : intervalle d'écriture groupée (secondes) et part de la durée marquant « vue »
+        self.PROGRESS_FLUSH_INTERVAL = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', 5))
+        self.WATCHED_THRESHOLD = float(os.environ.get('WATCHED_THRESHOLD', 0.9))
+        
+        # Sauvegardes : dossier, intervalle des instantanés planifiés (0 = désactivés) et rétention
+        self.BACKUP_DIR = os.environ.get('BACKUP_DIR', 'backups')
+        self.BACKUP_INTERVAL_HOURS = float(os.environ.get('BACKUP_INTERVAL_HOURS', 0))
+        self.BACKUP_RETENTION = int(os.environ.get('BACKUP_RETENTION', 7))
+        self.BACKUP_PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', 256))
+        self.BACKUP_STEP_SLEEP_MS = float(os.environ.get('BACKUP_STEP_SLEEP_MS', 20))
+        
+        # Administration : jeton requis pour le profilage et les diagnostics (vide = désactivé)
+        self.ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+        self.PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+        
+        # Journal des requêtes lentes (seuil en millisecondes, vide = désactivé)
+        slow_query_threshold = os.environ.get('SLOW_QUERY_THRESHOLD_MS', '')
+        self.SLOW_QUERY_THRESHOLD_MS = float(slow_query_threshold) if slow_query_threshold else None
+        
+        # Traces des synchronisations : fichier d'export (vide = désactivé) et format ('otlp' ou 'jsonl')
+        self.TRACE_FILE = os.environ.get('TRACE_FILE', '')
+        self.TRACE_FORMAT = os.environ.get('TRACE_FORMAT', 'otlp')
+        
+        # Métriques agrégées entre workers : dossier partagé (vide = métriques propres au processus)
+        self.METRICS_DIR = os.environ.get('METRICS_DIR', '')
+        
         # Configuration Flask
         self.FLASK_SECRET_KEY = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
         self.FLASK_ENV = os.environ.get('FLASK_ENV', 'development')
@@ -1,23 +1,133 @@
 import sqlite3
 import json
+import time
+from collections import deque
 from datetime import datetime
-from typing import List, Dict, Optional, Union
+from typing import Iterable, Iterator, List, Dict, Optional, Union
 import logging
 
+from events import ChangeFeed, VIDEO_INSERTED, VIDEO_UPDATED, VIDEO_REMOVED
+from facets import duration_bucket
+from metrics import DB_QUERY_DURATION, timed
+from models import PlaylistContents, Video
+from planner import parse_iso_duration
+from tracing import current_span, traced
+
 logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(f'{__name__}.slow_queries')
+
+# Retraits toujours acceptés lors d'une synchronisation, quel que soit le seuil (petites playlists)
+REMOVAL_ALWAYS_ALLOWED = 20
+
+class SlowQueryConnection(sqlite3.Connection):
+    """Connexion SQLite journalisant les requêtes lentes avec leur plan d'exécution"""
+    
+    slow_query_threshold_ms: float = 100.0
+    slow_query_log: Optional[deque] = None
+    
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        # Pour un SELECT, la mesure couvre la préparation et le calcul de la première ligne
+        start = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if elapsed_ms >= self.slow_query_threshold_ms:
+            self._record_slow_query(sql, parameters, elapsed_ms)
+        
+        return cursor
+    
+    def executemany(self, sql: str, seq_of_parameters) -> sqlite3.Cursor:
+        # Lot mesuré en entier (écritures groupées) ; plan obtenu avec les paramètres de la première ligne
+        parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        cursor = super().executemany(sql, parameters)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if parameters and elapsed_ms >= self.slow_query_threshold_ms:
+            self._record_slow_query(sql, parameters[0], elapsed_ms, rows=len(parameters))
+        
+        return cursor
+    
+    def _record_slow_query(self, sql: str, parameters, elapsed_ms: float, rows: Optional[int] = None):
+        """Enregistrement d'une requête lente et de son plan (EXPLAIN QUERY PLAN)"""
+        try:
+            plan = [row[-1] for row in super().execute(f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()]
+        except sqlite3.Error:
+            plan = []
+        
+        query = ' '.join(sql.split())
+        entry = {
+            'query': query,
+            'duration_ms': round(elapsed_ms, 2),
+            'plan': plan,
+            'logged_at': datetime.now().isoformat()
+        }
+        if rows is not None:
+            entry['rows'] = rows
+        
+        batch = f", {rows} lignes" if rows is not None else ''
+        slow_query_logger.warning(f"Requête lente ({elapsed_ms:.1f} ms{batch}): {query} | plan: {' ; '.join(plan)}")
+        if self.slow_query_log is not None:
+            self.slow_query_log.append(entry)
 
 class Database:
     """Gestionnaire de base de données SQLite pour YouTube Organizer"""
     
-    def __init__(self, db_path: str = 'youtube_organizer.db'):
+    def __init__(self, db_path: str = 'youtube_organizer.db', change_feed: Optional[ChangeFeed] = None,
+                 change_log_retention: int = 10000, slow_query_threshold_ms: Optional[float] = None):
         self.db_path = db_path
+        self.change_feed = change_feed
+        self.change_log_retention = change_log_retention
+        
+        # Journal des requêtes lentes (désactivé si aucun seuil n'est fourni)
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.slow_queries = deque(maxlen=200)
+    
+    def _notify_changes(self):
+        """Réveil des flux SSE du processus après le commit (les autres relisent le journal périodiquement)"""
+        if self.change_feed is not None:
+            self.change_feed.notify()
     
     def get_connection(self) -> sqlite3.Connection:
         """Création d'une connexion à la base de données"""
-        conn = sqlite3.connect(self.db_path)
+        if self.slow_query_threshold_ms is not None:
+            conn = sqlite3.connect(self.db_path, factory=SlowQueryConnection)
+            conn.slow_query_threshold_ms = self.slow_query_threshold_ms
+            conn.slow_query_log = self.slow_queries
+        else:
+            conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row  # Pour accéder aux colonnes par nom
         return conn
     
+    def _log_change(self, conn: sqlite3.Connection, video_id: str, operation: str):
+        """Ajout d'une entrée au journal des changements (dans la transaction en cours)"""
+        cursor = conn.execute('''
+            INSERT INTO video_changes (video_id, operation) VALUES (?, ?)
+        ''', (video_id, operation))
+        
+        # Purge périodique des entrées hors de la fenêtre de rétention
+        seq = cursor.lastrowid
+        if seq % 500 == 0:
+            conn.execute('DELETE FROM video_changes WHERE seq <= ?', (seq - self.change_log_retention,))
+    
+    @staticmethod
+    def _row_to_video(row: sqlite3.Row) -> Dict:
+        """Conversion d'une ligne en dictionnaire (tags JSON décodés)"""
+        video = dict(row)
+        try:
+            video['tags'] = json.loads(video['tags']) if video['tags'] else []
+        except json.JSONDecodeError:
+            video['tags'] = []
+        return video
+    
+    @staticmethod
+    def _add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, definition: str):
+        """Migration simple : ajout d'une colonne absente d'une table existante"""
+        columns = {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}
+        if column not in columns:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    @timed(DB_QUERY_DURATION, method='init_db')
     def init_db(self):
         """Initialisation de la base de données avec création des tables"""
         with self.get_connection() as conn:
@@ -67,10 +177,52 @@ class Database:
                 )
             ''')
             
+            # Journal des changements (numéro de séquence croissant, suppressions incluses)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS video_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    video_id TEXT NOT NULL,
+                    operation TEXT NOT NULL,  -- insert, update, delete
+                    changed_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Appartenance des vidéos aux playlists synchronisées (position dans la playlist)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS video_playlists (
+                    playlist_id TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    position INTEGER,
+                    added_at TEXT,
+                    PRIMARY KEY (playlist_id, video_id)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Suggestions de la catégorisation automatique (colonnes ajoutées aux bases existantes)
+            self._add_column_if_missing(conn, 'videos', 'suggested_category', 'TEXT')
+            self._add_column_if_missing(conn, 'videos', 'suggestion_confidence', 'REAL')
+            
+            # Vidéos retirées de toutes les playlists (archivées, pas supprimées)
+            self._add_column_if_missing(conn, 'videos', 'removed_at', 'TEXT')
+            
+            # Durée et temps par étape des synchronisations (résumé de la trace, JSON)
+            self._add_column_if_missing(conn, 'sync_history', 'duration_ms', 'REAL')
+            self._add_column_if_missing(conn, 'sync_history', 'stage_timings', 'TEXT')
+            
+            # Bases antérieures aux playlists multiples : toutes les vidéos venaient de « À regarder plus tard »
+            conn.execute('''
+                INSERT INTO video_playlists (playlist_id, video_id, added_at)
+                SELECT 'WL', id, added_to_playlist_at FROM videos
+                WHERE NOT EXISTS (SELECT 1 FROM video_playlists)
+            ''')
+            
             # Index pour améliorer les performances
             conn.execute('CREATE INDEX IF NOT EXISTS idx_videos_category ON videos(category)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_videos_watched ON videos(watched)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_videos_added_date ON videos(added_to_playlist_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_videos_updated_at ON videos(updated_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_video_changes_video ON video_changes(video_id, seq)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_video_playlists_video ON video_playlists(video_id)')
             
             # Insertion des catégories par défaut
             default_categories = [
@@ -91,67 +243,252 @@ class Database:
             conn.commit()
             logger.info("Base de données initialisée avec succès")
     
-    def save_video(self, video_data: Dict) -> bool:
+    INSERT_VIDEO_SQL = '''
+        INSERT INTO videos (
+            id, title, description, channel_title, channel_id,
+            thumbnail_url, duration, published_at, added_to_playlist_at,
+            tags, view_count, like_count
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    UPDATE_VIDEO_SQL = '''
+        UPDATE videos SET
+            title = ?, description = ?, channel_title = ?, channel_id = ?,
+            thumbnail_url = ?, duration = ?, published_at = ?,
+            tags = ?, view_count = ?, like_count = ?, updated_at = ?
+        WHERE id = ?
+    '''
+    
+    @timed(DB_QUERY_DURATION, method='save_video')
+    @traced('db.save_video')
+    def save_video(self, video: Union[Video, Dict]) -> bool:
         """Sauvegarde d'une vidéo (mise à jour si elle existe déjà)"""
         try:
+            video = Video.coerce(video)
             with self.get_connection() as conn:
                 # Vérification si la vidéo existe déjà
-                existing = conn.execute('SELECT id FROM videos WHERE id = ?', (video_data['id'],)).fetchone()
+                existing = conn.execute(
+                    'SELECT id, duration, tags, view_count, like_count FROM videos WHERE id = ?', (video.id,)
+                ).fetchone()
                 
                 if existing:
+                    if not video.has_details:
+                        video.keep_details(existing)
                     # Mise à jour des données existantes
-                    conn.execute('''
-                        UPDATE videos SET
-                            title = ?, description = ?, channel_title = ?, channel_id = ?,
-                            thumbnail_url = ?, duration = ?, published_at = ?,
-                            tags = ?, view_count = ?, like_count = ?, updated_at = ?
-                        WHERE id = ?
-                    ''', (
-                        video_data.get('title'),
-                        video_data.get('description'),
-                        video_data.get('channel_title'),
-                        video_data.get('channel_id'),
-                        video_data.get('thumbnail_url'),
-                        video_data.get('duration'),
-                        video_data.get('published_at'),
-                        json.dumps(video_data.get('tags', [])),
-                        video_data.get('view_count', 0),
-                        video_data.get('like_count', 0),
-                        datetime.now().isoformat(),
-                        video_data['id']
-                    ))
-                    return False  # Pas une nouvelle vidéo
+                    conn.execute(self.UPDATE_VIDEO_SQL, video.update_params(datetime.now().isoformat()))
+                    self._log_change(conn, video.id, 'update')
+                    is_new = False  # Pas une nouvelle vidéo
                 else:
                     # Insertion d'une nouvelle vidéo
-                    conn.execute('''
-                        INSERT INTO videos (
-                            id, title, description, channel_title, channel_id,
-                            thumbnail_url, duration, published_at, added_to_playlist_at,
-                            tags, view_count, like_count
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        video_data['id'],
-                        video_data.get('title'),
-                        video_data.get('description'),
-                        video_data.get('channel_title'),
-                        video_data.get('channel_id'),
-                        video_data.get('thumbnail_url'),
-                        video_data.get('duration'),
-                        video_data.get('published_at'),
-                        video_data.get('added_to_playlist_at', datetime.now().isoformat()),
-                        json.dumps(video_data.get('tags', [])),
-                        video_data.get('view_count', 0),
-                        video_data.get('like_count', 0)
-                    ))
-                    return True  # Nouvelle vidéo
+                    conn.execute(self.INSERT_VIDEO_SQL, video.insert_params(datetime.now().isoformat()))
+                    self._log_change(conn, video.id, 'insert')
+                    is_new = True  # Nouvelle vidéo
+            
+            self._notify_changes()
+            return is_new
                     
         except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde de la vidéo {video_data.get('id')}: {e}")
+            logger.error(f"Erreur lors de la sauvegarde de la vidéo {video.get('id')}: {e}")
             return False
     
+    @timed(DB_QUERY_DURATION, method='save_videos')
+    @traced('db.save_videos')
+    def save_videos(self, videos: Iterable[Union[Video, Dict]]) -> int:
+        """
+        Sauvegarde groupée de vidéos, en une seule transaction
+        
+        Même effet qu'un appel à save_video par vidéo, sans le coût d'une
+        connexion et d'un commit par ligne.
+        
+        Returns:
+            int: Nombre de nouvelles vidéos
+        """
+        videos = [Video.coerce(video) for video in videos]
+        if not videos:
+            return 0
+        
+        try:
+            updated_at = datetime.now().isoformat()
+            with self.get_connection() as conn:
+                # IDs déjà présents, par lots (limite du nombre de paramètres SQLite), avec
+                # les détails à conserver pour les vidéos sans réponse videos.list
+                ids = [video.id for video in videos]
+                known = {}
+                for i in range(0, len(ids), 500):
+                    batch = ids[i:i + 500]
+                    placeholders = ','.join('?' * len(batch))
+                    known.update((row['id'], row) for row in conn.execute(
+                        f'SELECT id, duration, tags, view_count, like_count FROM videos WHERE id IN ({placeholders})', batch
+                    ))
+                
+                inserts, updates, operations = [], [], []
+                for video in videos:
+                    if video.id in known:
+                        if not video.has_details and known[video.id] is not None:
+                            video.keep_details(known[video.id])
+                        updates.append(video.update_params(updated_at))
+                        operations.append((video, 'update'))
+                    else:
+                        inserts.append(video.insert_params(updated_at))
+                        operations.append((video, 'insert'))
+                        known[video.id] = None  # Doublon éventuel dans le lot : mise à jour
+                
+                # Insertions d'abord : un doublon du lot met à jour la ligne insérée
+                conn.executemany(self.INSERT_VIDEO_SQL, inserts)
+                conn.executemany(self.UPDATE_VIDEO_SQL, updates)
+                for video, operation in operations:
+                    self._log_change(conn, video.id, operation)
+            
+            current_span().set_attribute('videos', len(videos))
+            current_span().set_attribute('new_videos', len(inserts))
+            if operations:
+                self._notify_changes()
+            return len(inserts)
+                    
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde groupée de {len(videos)} vidéos: {e}")
+            return 0
+    
+    @timed(DB_QUERY_DURATION, method='save_playlist_contents')
+    @traced('db.save_playlist_contents')
+    def save_playlist_contents(self, playlists: Iterable[PlaylistContents],
+                               max_removal_fraction: float = 0.5) -> Dict:
+        """
+        Enregistrement de l'appartenance des vidéos aux playlists et détection
+        des retraits, en une seule transaction
+        
+        Les IDs lus sont chargés dans une table temporaire : les vidéos retirées
+        d'une playlist sont obtenues par une seule anti-jointure. Une vidéo qui
+        n'appartient plus à aucune playlist est archivée (removed_at), jamais
+        supprimée, et redevient active si elle réapparaît.
+        
+        Chaque appartenance ajoutée ou retirée est journalisée (mise à jour de la
+        vidéo) : les caches par version des données (facettes par playlist...)
+        voient les changements de contenu d'une playlist.
+        
+        Garde-fous contre les retraits massifs : seules les playlists lues
+        jusqu'au bout sont réconciliées, jamais sur une lecture vide, et pas
+        au-delà de max_removal_fraction des vidéos de la playlist (hors petits
+        volumes, REMOVAL_ALWAYS_ALLOWED).
+        
+        Returns:
+            Dict: Nombre d'appartenances enregistrées, de vidéos archivées et de playlists non
+            réconciliées, IDs des vidéos archivées et des vidéos redevenues actives
+        """
+        now = datetime.now().isoformat()
+        saved, skipped, changed = 0, [], set()
+        try:
+            with self.get_connection() as conn:
+                conn.execute('CREATE TEMP TABLE IF NOT EXISTS fetched_ids (video_id TEXT PRIMARY KEY) WITHOUT ROWID')
+                conn.execute('CREATE TEMP TABLE IF NOT EXISTS removed_ids (video_id TEXT PRIMARY KEY) WITHOUT ROWID')
+                
+                for playlist in playlists:
+                    conn.execute('DELETE FROM temp.fetched_ids')
+                    conn.executemany('INSERT OR IGNORE INTO temp.fetched_ids (video_id) VALUES (?)',
+                                     [(video_id,) for video_id in playlist.video_ids])
+                    
+                    if playlist.complete:
+                        # Anti-jointure : appartenances connues absentes de la lecture
+                        missing = '''
+                            SELECT vp.video_id FROM video_playlists vp
+                            WHERE vp.playlist_id = ?
+                              AND NOT EXISTS (SELECT 1 FROM temp.fetched_ids f WHERE f.video_id = vp.video_id)
+                        '''
+                        removed = conn.execute(f'SELECT COUNT(*) FROM ({missing})', (playlist.playlist_id,)).fetchone()[0]
+                        known = conn.execute('SELECT COUNT(*) FROM video_playlists WHERE playlist_id = ?',
+                                             (playlist.playlist_id,)).fetchone()[0]
+                        
+                        allowed = max(REMOVAL_ALWAYS_ALLOWED, int(known * max_removal_fraction))
+                        if removed and (not playlist.entries or removed > allowed):
+                            logger.warning(
+                                f"Playlist {playlist.playlist_id} : {removed} retraits sur {known} vidéos, "
+                                f"réconciliation ignorée (lecture vide ou au-delà du seuil)"
+                            )
+                            skipped.append(playlist.playlist_id)
+                        elif removed:
+                            changed.update(row[0] for row in conn.execute(missing, (playlist.playlist_id,)))
+                            conn.execute(f'INSERT OR IGNORE INTO temp.removed_ids (video_id) {missing}',
+                                         (playlist.playlist_id,))
+                            conn.execute('''
+                                DELETE FROM video_playlists
+                                WHERE playlist_id = ? AND video_id IN (SELECT video_id FROM temp.removed_ids)
+                            ''', (playlist.playlist_id,))
+                    
+                    # Appartenances nouvelles (les autres ne font que changer de position)
+                    changed.update(row[0] for row in conn.execute('''
+                        SELECT f.video_id FROM temp.fetched_ids f
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM video_playlists vp WHERE vp.playlist_id = ? AND vp.video_id = f.video_id
+                        )
+                    ''', (playlist.playlist_id,)))
+                    
+                    conn.executemany('''
+                        INSERT OR REPLACE INTO video_playlists (playlist_id, video_id, position, added_at)
+                        VALUES (?, ?, ?, ?)
+                    ''', [
+                        (playlist.playlist_id, video_id, position, added_at)
+                        for position, (video_id, added_at) in enumerate(playlist.entries)
+                    ])
+                    saved += len(playlist.entries)
+                
+                # Une fois toutes les playlists enregistrées : archivage des vidéos retirées
+                # qui n'appartiennent plus à aucune playlist, retour des vidéos réapparues
+                archived = [row[0] for row in conn.execute('''
+                    SELECT v.id FROM temp.removed_ids r
+                    JOIN videos v ON v.id = r.video_id
+                    WHERE v.removed_at IS NULL
+                      AND NOT EXISTS (SELECT 1 FROM video_playlists vp WHERE vp.video_id = r.video_id)
+                ''')]
+                restored = [row[0] for row in conn.execute('''
+                    SELECT id FROM videos
+                    WHERE removed_at IS NOT NULL
+                      AND EXISTS (SELECT 1 FROM video_playlists vp WHERE vp.video_id = videos.id)
+                ''')]
+                conn.executemany('UPDATE videos SET removed_at = ?, updated_at = ? WHERE id = ?',
+                                 [(now, now, video_id) for video_id in archived])
+                conn.executemany('UPDATE videos SET removed_at = NULL, updated_at = ? WHERE id = ?',
+                                 [(now, video_id) for video_id in restored])
+                
+                changed.update(archived)
+                changed.update(restored)
+                for video_id in sorted(changed):
+                    self._log_change(conn, video_id, 'update')
+                conn.execute('DROP TABLE temp.fetched_ids')
+                conn.execute('DROP TABLE temp.removed_ids')
+            
+            if changed:
+                self._notify_changes()
+            if archived:
+                logger.info(f"{len(archived)} vidéos retirées des playlists archivées")
+            return {'memberships': saved, 'archived': len(archived), 'skipped_playlists': skipped,
+                    'archived_ids': archived, 'restored_ids': restored}
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement du contenu des playlists: {e}")
+            return {'memberships': 0, 'archived': 0, 'skipped_playlists': [], 'archived_ids': [], 'restored_ids': []}
+    
+    @timed(DB_QUERY_DURATION, method='get_playlists')
+    def get_playlists(self) -> List[Dict]:
+        """Playlists synchronisées et leur nombre de vidéos"""
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT playlist_id, COUNT(*) as count
+                    FROM video_playlists
+                    GROUP BY playlist_id
+                    ORDER BY playlist_id
+                ''').fetchall()
+                return [dict(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des playlists: {e}")
+            return []
+    
+    @timed(DB_QUERY_DURATION, method='get_videos')
     def get_videos(self, category: Optional[str] = None, watched: Optional[bool] = None, 
-                   search: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
-        """Récupération des vidéos avec filtres optionnels"""
+                   search: Optional[str] = None, limit: Optional[int] = None,
+                   playlist: Optional[str] = None, removed: bool = False) -> List[Dict]:
+        """Récupération des vidéos avec filtres optionnels (archivées si removed, actives sinon)"""
         try:
             query = '''
                 SELECT v.*, c.name as category_name, c.color as category_color
@@ -161,6 +498,8 @@ class Database:
             '''
             params = []
             
+            query += ' AND v.removed_at IS NOT NULL' if removed else ' AND v.removed_at IS NULL'
+            
             if category and category != 'all':
                 query += ' AND v.category = ?'
                 params.append(category)
@@ -169,6 +508,10 @@ class Database:
                 query += ' AND v.watched = ?'
                 params.append(watched)
             
+            if playlist:
+                query += ' AND v.id IN (SELECT video_id FROM video_playlists WHERE playlist_id = ?)'
+                params.append(playlist)
+            
             if search:
                 query += ' AND (v.title LIKE ? OR v.description LIKE ? OR v.channel_title LIKE ?)'
                 search_term = f'%{search}%'
@@ -183,23 +526,147 @@ class Database:
             with self.get_connection() as conn:
                 rows = conn.execute(query, params).fetchall()
                 
-                videos = []
-                for row in rows:
-                    video = dict(row)
-                    # Conversion des tags JSON
-                    try:
-                        video['tags'] = json.loads(video['tags']) if video['tags'] else []
-                    except json.JSONDecodeError:
-                        video['tags'] = []
-                    
-                    videos.append(video)
-                
-                return videos
+                # Conversion des tags JSON
+                return [self._row_to_video(row) for row in rows]
                 
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des vidéos: {e}")
             return []
     
+    @timed(DB_QUERY_DURATION, method='get_facet_groups')
+    def get_facet_groups(self, search: Optional[str] = None, playlist: Optional[str] = None,
+                         removed: bool = False) -> Optional[List[Dict]]:
+        """
+        Nombre de vidéos par combinaison (catégorie, vue, chaîne, tranche de durée), en une requête
+        
+        Seuls les filtres de recherche, de playlist et d'archivage sont appliqués :
+        les filtres par facette sont appliqués sur ces groupes (facets.count_facets).
+        
+        Returns:
+            List[Dict]: Groupes, ou None en cas d'échec (à ne pas confondre avec une bibliothèque vide)
+        """
+        try:
+            query = '''
+                SELECT v.category, v.watched, v.channel_id, MAX(v.channel_title) as channel_title,
+                       duration_bucket(v.duration) as duration_bucket, COUNT(*) as count
+                FROM videos v
+                WHERE 1=1
+            '''
+            params = []
+            
+            query += ' AND v.removed_at IS NOT NULL' if removed else ' AND v.removed_at IS NULL'
+            
+            if playlist:
+                query += ' AND v.id IN (SELECT video_id FROM video_playlists WHERE playlist_id = ?)'
+                params.append(playlist)
+            
+            if search:
+                query += ' AND (v.title LIKE ? OR v.description LIKE ? OR v.channel_title LIKE ?)'
+                search_term = f'%{search}%'
+                params.extend([search_term, search_term, search_term])
+            
+            query += ' GROUP BY v.category, v.watched, v.channel_id, duration_bucket'
+            
+            with self.get_connection() as conn:
+                conn.create_function('duration_bucket', 1, duration_bucket)
+                rows = conn.execute(query, params).fetchall()
+                return [dict(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Erreur lors du calcul des comptes par facette: {e}")
+            return None
+    
+    def iter_videos(self, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Parcours de toutes les vidéos par blocs (pagination par rowid), avec
+        leurs appartenances aux playlists (clé playlists)
+        
+        La mémoire utilisée ne dépend que de chunk_size, pas de la taille de la bibliothèque.
+        Chaque bloc est lu par une lecture courte : aucun verrou n'est gardé entre
+        deux blocs, un téléchargement lent (/export) ne bloque pas les écritures.
+        """
+        last_rowid = 0
+        while True:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    'SELECT rowid AS _rowid, * FROM videos WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (last_rowid, chunk_size)
+                ).fetchall()
+                if not rows:
+                    break
+                memberships = {}
+                ids = [row['id'] for row in rows]
+                for i in range(0, len(ids), 500):
+                    batch = ids[i:i + 500]
+                    placeholders = ','.join('?' * len(batch))
+                    for membership in conn.execute(f'''
+                        SELECT video_id, playlist_id, position, added_at FROM video_playlists
+                        WHERE video_id IN ({placeholders}) ORDER BY playlist_id
+                    ''', batch):
+                        memberships.setdefault(membership['video_id'], []).append({
+                            'playlist_id': membership['playlist_id'],
+                            'position': membership['position'],
+                            'added_at': membership['added_at']
+                        })
+            last_rowid = rows[-1]['_rowid']
+            videos = [self._row_to_video(row) for row in rows]
+            for video in videos:
+                del video['_rowid']
+                video['playlists'] = memberships.get(video['id'], [])
+            yield videos
+    
+    @timed(DB_QUERY_DURATION, method='restore_user_state')
+    def restore_user_state(self, videos: List[Dict]) -> int:
+        """
+        Restauration de l'état propre à l'utilisateur (catégorie, statut vu, temps de visionnage,
+        archivage) et des appartenances aux playlists pour des vidéos déjà enregistrées,
+        en une seule transaction
+        
+        Les appartenances d'une vidéo sont remplacées par celles de l'export
+        (clé playlists) ; sans cette clé (export antérieur), elles sont conservées.
+        
+        Returns:
+            int: Nombre de vidéos restaurées (présentes en base)
+        """
+        try:
+            updated_at = datetime.now().isoformat()
+            with self.get_connection() as conn:
+                cursor = conn.executemany('''
+                    UPDATE videos SET category = ?, watched = ?, watch_time = ?, removed_at = ?, updated_at = ?
+                    WHERE id = ?
+                ''', [(
+                    video.get('category') or 'uncategorized',
+                    bool(video.get('watched')),
+                    video.get('watch_time') or 0,
+                    video.get('removed_at'),
+                    updated_at,
+                    video['id']
+                ) for video in videos])
+                restored = cursor.rowcount
+                
+                with_playlists = [video for video in videos if video.get('playlists') is not None]
+                conn.executemany('DELETE FROM video_playlists WHERE video_id = ?',
+                                 [(video['id'],) for video in with_playlists])
+                conn.executemany('''
+                    INSERT OR REPLACE INTO video_playlists (playlist_id, video_id, position, added_at)
+                    SELECT ?, id, ?, ? FROM videos WHERE id = ?
+                ''', [
+                    (membership['playlist_id'], membership.get('position'), membership.get('added_at'), video['id'])
+                    for video in with_playlists for membership in video['playlists']
+                ])
+                
+                for video in videos:
+                    self._log_change(conn, video['id'], 'update')
+            
+            if videos:
+                self._notify_changes()
+            return restored
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la restauration de l'état de {len(videos)} vidéos: {e}")
+            return 0
+    
+    @timed(DB_QUERY_DURATION, method='get_video_by_id')
     def get_video_by_id(self, video_id: str) -> Optional[Dict]:
         """Récupération d'une vidéo par son ID"""
         try:
@@ -212,12 +679,7 @@ class Database:
                 ''', (video_id,)).fetchone()
                 
                 if row:
-                    video = dict(row)
-                    try:
-                        video['tags'] = json.loads(video['tags']) if video['tags'] else []
-                    except json.JSONDecodeError:
-                        video['tags'] = []
-                    return video
+                    return self._row_to_video(row)
                 
                 return None
                 
@@ -225,6 +687,41 @@ class Database:
             logger.error(f"Erreur lors de la récupération de la vidéo {video_id}: {e}")
             return None
     
+    @timed(DB_QUERY_DURATION, method='get_video_duration')
+    def get_video_duration(self, video_id: str) -> Optional[int]:
+        """Durée d'une vidéo en secondes (0 si inconnue), ou None si la vidéo n'existe pas"""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute('SELECT duration FROM videos WHERE id = ?', (video_id,)).fetchone()
+                return parse_iso_duration(row['duration']) if row else None
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de la durée de la vidéo {video_id}: {e}")
+            return None
+    
+    @timed(DB_QUERY_DURATION, method='get_videos_by_ids')
+    def get_videos_by_ids(self, video_ids: List[str]) -> List[Dict]:
+        """Récupération de plusieurs vidéos par leurs IDs (ordre non garanti)"""
+        try:
+            videos = []
+            with self.get_connection() as conn:
+                for i in range(0, len(video_ids), 500):
+                    batch = video_ids[i:i + 500]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = conn.execute(f'''
+                        SELECT v.*, c.name as category_name, c.color as category_color
+                        FROM videos v
+                        LEFT JOIN categories c ON v.category = c.name
+                        WHERE v.id IN ({placeholders})
+                    ''', batch).fetchall()
+                    videos.extend(self._row_to_video(row) for row in rows)
+            return videos
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de {len(video_ids)} vidéos: {e}")
+            return []
+    
+    @timed(DB_QUERY_DURATION, method='update_video_watched')
     def update_video_watched(self, video_id: str, watched: bool) -> bool:
         """Mise à jour du statut "vu" d'une vidéo"""
         try:
@@ -233,28 +730,324 @@ class Database:
                     UPDATE videos SET watched = ?, updated_at = ?
                     WHERE id = ?
                 ''', (watched, datetime.now().isoformat(), video_id))
-                
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+                if updated:
+                    self._log_change(conn, video_id, 'update')
+            
+            if updated:
+                self._notify_changes()
+            return updated
                 
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du statut watched pour {video_id}: {e}")
             return False
     
+    @timed(DB_QUERY_DURATION, method='save_watch_progress')
+    @traced('db.save_watch_progress')
+    def save_watch_progress(self, positions: Dict[str, int], watched_threshold: float) -> int:
+        """
+        Enregistrement groupé des positions de lecture, en une seule transaction
+        
+        Une vidéo dont la position atteint watched_threshold de sa durée est
+        marquée vue (jamais l'inverse : revoir une vidéo ne la remet pas à voir).
+        Seul ce passage à "vue" est journalisé : une simple position de reprise
+        n'ajoute pas d'entrée au journal des changements à chaque lot.
+        
+        Args:
+            positions: Dernière position connue (secondes) par ID de vidéo
+            watched_threshold: Part de la durée (0 à 1) au-delà de laquelle la vidéo est vue
+        
+        Returns:
+            int: Nombre de vidéos mises à jour
+        
+        Raises:
+            sqlite3.Error: En cas d'échec (les positions restent à enregistrer par l'appelant)
+        """
+        if not positions:
+            return 0
+        
+        updated_at = datetime.now().isoformat()
+        newly_watched = []
+        with self.get_connection() as conn:
+            ids = list(positions)
+            current = {}
+            for i in range(0, len(ids), 500):
+                batch = ids[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                current.update((row['id'], row) for row in conn.execute(
+                    f'SELECT id, duration, watched FROM videos WHERE id IN ({placeholders})', batch
+                ))
+            
+            params = []
+            for video_id, position in positions.items():
+                row = current.get(video_id)
+                if row is None:
+                    continue
+                duration = parse_iso_duration(row['duration'])
+                if duration > 0:
+                    position = min(position, duration)
+                watched = bool(row['watched']) or (duration > 0 and position >= duration * watched_threshold)
+                if watched and not row['watched']:
+                    newly_watched.append(video_id)
+                params.append((position, watched, updated_at, video_id))
+            
+            conn.executemany('UPDATE videos SET watch_time = ?, watched = ?, updated_at = ? WHERE id = ?', params)
+            for video_id in newly_watched:
+                self._log_change(conn, video_id, 'update')
+        
+        if newly_watched:
+            self._notify_changes()
+        return len(params)
+    
+    @timed(DB_QUERY_DURATION, method='update_video_category')
     def update_video_category(self, video_id: str, category: str) -> bool:
         """Mise à jour de la catégorie d'une vidéo"""
         try:
             with self.get_connection() as conn:
+                # Catégorie choisie : la suggestion éventuelle n'a plus lieu d'être
                 cursor = conn.execute('''
-                    UPDATE videos SET category = ?, updated_at = ?
+                    UPDATE videos SET category = ?, suggested_category = NULL,
+                        suggestion_confidence = NULL, updated_at = ?
                     WHERE id = ?
                 ''', (category, datetime.now().isoformat(), video_id))
-                
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+                if updated:
+                    self._log_change(conn, video_id, 'update')
+            
+            if updated:
+                self._notify_changes()
+            return updated
                 
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour de la catégorie pour {video_id}: {e}")
             return False
     
+    @timed(DB_QUERY_DURATION, method='delete_video')
+    def delete_video(self, video_id: str) -> bool:
+        """Suppression d'une vidéo"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute('DELETE FROM videos WHERE id = ?', (video_id,))
+                deleted = cursor.rowcount > 0
+                conn.execute('DELETE FROM video_playlists WHERE video_id = ?', (video_id,))
+                if deleted:
+                    self._log_change(conn, video_id, 'delete')  # Tombstone
+            
+            if deleted:
+                self._notify_changes()
+            return deleted
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la suppression de la vidéo {video_id}: {e}")
+            return False
+    
+    @staticmethod
+    def _read_changes(conn: sqlite3.Connection, since: int, limit: int):
+        """
+        Dernière entrée du journal de chaque vidéo modifiée après le numéro de séquence since
+        
+        Returns:
+            tuple: (lignes, limit + 1 au plus, ou None si le curseur n'est plus couvert
+            par le journal ; dernier numéro de séquence)
+        """
+        bounds = conn.execute('''
+            SELECT MIN(seq) AS oldest_seq,
+                   (SELECT seq FROM sqlite_sequence WHERE name = 'video_changes') AS last_seq
+            FROM video_changes
+        ''').fetchone()
+        last_seq = bounds['last_seq'] or 0
+        oldest_seq = bounds['oldest_seq'] or last_seq + 1
+        
+        # Curseur antérieur à la purge du journal, ou postérieur au dernier numéro
+        # (base restaurée ou remplacée depuis) : les changements manquants sont perdus
+        if since < oldest_seq - 1 or since > last_seq:
+            return None, last_seq
+        
+        # La colonne operation suit la ligne de MAX(seq) (colonne nue de SQLite)
+        rows = conn.execute('''
+            SELECT ch.seq AS change_seq, ch.video_id AS change_video_id, ch.operation AS change_operation,
+                   v.*, c.name as category_name, c.color as category_color
+            FROM (
+                SELECT video_id, MAX(seq) AS seq, operation
+                FROM video_changes
+                WHERE seq > ?
+                GROUP BY video_id
+            ) ch
+            LEFT JOIN videos v ON v.id = ch.video_id
+            LEFT JOIN categories c ON v.category = c.name
+            ORDER BY ch.seq
+            LIMIT ?
+        ''', (since, limit + 1)).fetchall()
+        return rows, last_seq
+    
+    def _change_to_video(self, row: sqlite3.Row) -> Dict:
+        video = self._row_to_video(row)
+        del video['change_seq'], video['change_video_id'], video['change_operation']
+        return video
+    
+    @timed(DB_QUERY_DURATION, method='get_changes')
+    def get_changes(self, since: int = 0, limit: int = 500) -> Dict:
+        """
+        Récupération des changements survenus après le numéro de séquence since
+        
+        Chaque vidéo modifiée n'apparaît qu'une fois (dernier état connu) ;
+        les vidéos supprimées sont renvoyées sous forme de tombstone.
+        """
+        try:
+            with self.get_connection() as conn:
+                rows, last_seq = self._read_changes(conn, since, limit)
+                
+                # Curseur hors du journal conservé (ou inconnu) : resynchronisation complète
+                if rows is None:
+                    return {
+                        'full_resync': True,
+                        'changes': [],
+                        'next_since': last_seq,
+                        'has_more': False
+                    }
+                
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+                
+                changes = []
+                for row in rows:
+                    if row['id'] is None:
+                        changes.append({'id': row['change_video_id'], 'deleted': True})
+                    else:
+                        video = self._change_to_video(row)
+                        video['deleted'] = False
+                        changes.append(video)
+                
+                return {
+                    'full_resync': False,
+                    'changes': changes,
+                    'next_since': rows[-1]['change_seq'] if has_more else last_seq,
+                    'has_more': has_more
+                }
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des changements depuis {since}: {e}")
+            return {}
+    
+    @timed(DB_QUERY_DURATION, method='get_change_events')
+    def get_change_events(self, since: int, limit: int = 500) -> Optional[Dict]:
+        """
+        Événements SSE des changements survenus après le numéro de séquence since
+        
+        Le journal est commun à tous les écrivains (workers, sync_cli.py,
+        restauration) : l'identifiant d'un événement est son numéro de séquence.
+        Une vidéo archivée est signalée comme retirée ; le statut "vu" et la
+        catégorie arrivent avec l'état complet de la vidéo (mise à jour).
+        
+        Returns:
+            Dict: Événements ('id', 'type', 'data'), indicateur 'reset' (curseur hors
+            du journal conservé), dernier numéro de séquence et 'has_more' ;
+            None en cas d'erreur
+        """
+        try:
+            with self.get_connection() as conn:
+                rows, last_seq = self._read_changes(conn, since, limit)
+            
+            if rows is None:
+                return {'reset': True, 'events': [], 'last_seq': last_seq, 'has_more': False}
+            
+            has_more = len(rows) > limit
+            events = []
+            for row in rows[:limit]:
+                if row['id'] is None:
+                    event_type, data = VIDEO_REMOVED, {'id': row['change_video_id']}
+                elif row['removed_at']:
+                    event_type, data = VIDEO_REMOVED, {'id': row['id'], 'archived': True}
+                else:
+                    event_type = VIDEO_INSERTED if row['change_operation'] == 'insert' else VIDEO_UPDATED
+                    data = self._change_to_video(row)
+                events.append({'id': row['change_seq'], 'type': event_type, 'data': data})
+            
+            return {'reset': False, 'events': events, 'last_seq': last_seq, 'has_more': has_more}
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture du journal des changements depuis {since}: {e}")
+            return None
+    
+    @timed(DB_QUERY_DURATION, method='get_categorized_videos')
+    def get_categorized_videos(self) -> List[Dict]:
+        """Vidéos classées manuellement (données d'apprentissage de la catégorisation)"""
+        return self._get_videos_for_categorizer("category != 'uncategorized'")
+    
+    @timed(DB_QUERY_DURATION, method='get_uncategorized_videos')
+    def get_uncategorized_videos(self) -> List[Dict]:
+        """Vidéos sans catégorie (à soumettre à la catégorisation)"""
+        return self._get_videos_for_categorizer("category = 'uncategorized'")
+    
+    @timed(DB_QUERY_DURATION, method='get_uncategorized_related')
+    def get_uncategorized_related(self, channel_ids: List[str], words: List[str]) -> List[Dict]:
+        """
+        Vidéos sans catégorie d'une des chaînes ou dont le titre contient un des mots
+        (suggestions susceptibles de changer après l'apprentissage de vidéos proches)
+        """
+        conditions, params = [], []
+        if channel_ids:
+            conditions.append(f"channel_id IN ({','.join('?' * len(channel_ids))})")
+            params.extend(channel_ids)
+        for word in words:
+            conditions.append('title LIKE ?')
+            params.append(f'%{word}%')
+        if not conditions:
+            return []
+        return self._get_videos_for_categorizer(f"category = 'uncategorized' AND ({' OR '.join(conditions)})", params)
+    
+    def _get_videos_for_categorizer(self, condition: str, params: Iterable = ()) -> List[Dict]:
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(f'''
+                    SELECT id, title, description, channel_id, channel_title, tags, category,
+                           suggested_category, suggestion_confidence
+                    FROM videos
+                    WHERE {condition}
+                ''', list(params)).fetchall()
+                return [self._row_to_video(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des vidéos à catégoriser: {e}")
+            return []
+    
+    @timed(DB_QUERY_DURATION, method='save_category_suggestions')
+    def save_category_suggestions(self, suggestions: List[tuple]) -> int:
+        """
+        Enregistrement des suggestions de catégorie (vidéos encore non catégorisées uniquement)
+        
+        Args:
+            suggestions: Tuples (video_id, catégorie suggérée ou None, confiance ou None)
+        
+        Seules les suggestions modifiées sont écrites et journalisées : une
+        réévaluation qui ne change rien n'allonge pas le journal des changements.
+        
+        Returns:
+            int: Nombre de vidéos mises à jour
+        """
+        try:
+            updated_at = datetime.now().isoformat()
+            updated = 0
+            with self.get_connection() as conn:
+                for video_id, category, confidence in suggestions:
+                    cursor = conn.execute('''
+                        UPDATE videos SET suggested_category = ?, suggestion_confidence = ?, updated_at = ?
+                        WHERE id = ? AND category = 'uncategorized'
+                            AND (suggested_category IS NOT ? OR suggestion_confidence IS NOT ?)
+                    ''', (category, confidence, updated_at, video_id, category, confidence))
+                    if cursor.rowcount > 0:
+                        self._log_change(conn, video_id, 'update')
+                        updated += 1
+            
+            if updated:
+                self._notify_changes()
+            return updated
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement des suggestions de catégorie: {e}")
+            return 0
+    
+    @timed(DB_QUERY_DURATION, method='get_categories')
     def get_categories(self) -> List[Dict]:
         """Récupération de toutes les catégories"""
         try:
@@ -273,19 +1066,51 @@ class Database:
             logger.error(f"Erreur lors de la récupération des catégories: {e}")
             return []
     
+    @timed(DB_QUERY_DURATION, method='get_data_version')
+    def get_data_version(self) -> int:
+        """Version des données : dernier numéro de séquence du journal des changements"""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'video_changes'").fetchone()
+                return row['seq'] if row else 0
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture de la version des données: {e}")
+            return -1
+    
+    @timed(DB_QUERY_DURATION, method='get_plan_candidates')
+    def get_plan_candidates(self) -> List[Dict]:
+        """Champs utiles à la planification, pour toutes les vidéos actives (vues comprises)"""
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT id, duration, added_to_playlist_at, category, channel_id, watched
+                    FROM videos
+                    WHERE removed_at IS NULL
+                ''').fetchall()
+                return [dict(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des vidéos à planifier: {e}")
+            return []
+    
+    @timed(DB_QUERY_DURATION, method='get_stats')
     def get_stats(self) -> Dict:
         """Récupération des statistiques globales"""
         try:
             with self.get_connection() as conn:
                 # Statistiques générales
-                total_videos = conn.execute('SELECT COUNT(*) as count FROM videos').fetchone()['count']
-                watched_videos = conn.execute('SELECT COUNT(*) as count FROM videos WHERE watched = 1').fetchone()['count']
+                total_videos = conn.execute('SELECT COUNT(*) as count FROM videos WHERE removed_at IS NULL').fetchone()['count']
+                watched_videos = conn.execute(
+                    'SELECT COUNT(*) as count FROM videos WHERE watched = 1 AND removed_at IS NULL'
+                ).fetchone()['count']
                 unwatched_videos = total_videos - watched_videos
                 
                 # Statistiques par catégorie
                 categories_stats = conn.execute('''
                     SELECT category, COUNT(*) as count
                     FROM videos
+                    WHERE removed_at IS NULL
                     GROUP BY category
                     ORDER BY count DESC
                 ''').fetchall()
@@ -294,7 +1119,7 @@ class Database:
                 recent_videos = conn.execute('''
                     SELECT COUNT(*) as count
                     FROM videos
-                    WHERE added_to_playlist_at >= date('now', '-7 days')
+                    WHERE added_to_playlist_at >= date('now', '-7 days') AND removed_at IS NULL
                 ''').fetchone()['count']
                 
                 return {
@@ -310,18 +1135,49 @@ class Database:
             logger.error(f"Erreur lors de la récupération des statistiques: {e}")
             return {}
     
-    def log_sync(self, videos_fetched: int, new_videos: int, errors: str = None):
-        """Enregistrement d'une synchronisation dans l'historique"""
+    @timed(DB_QUERY_DURATION, method='log_sync')
+    @traced('db.log_sync')
+    def log_sync(self, videos_fetched: int, new_videos: int, errors: str = None,
+                 duration_ms: Optional[float] = None, stage_timings: Optional[Dict] = None):
+        """
+        Enregistrement d'une synchronisation dans l'historique
+        
+        Args:
+            duration_ms: Durée totale de la synchronisation
+            stage_timings: Nombre et durée cumulée des spans de la trace, par étape
+        """
         try:
             with self.get_connection() as conn:
                 conn.execute('''
-                    INSERT INTO sync_history (videos_fetched, new_videos, errors)
-                    VALUES (?, ?, ?)
-                ''', (videos_fetched, new_videos, errors))
+                    INSERT INTO sync_history (videos_fetched, new_videos, errors, duration_ms, stage_timings)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (videos_fetched, new_videos, errors, duration_ms,
+                      json.dumps(stage_timings) if stage_timings is not None else None))
                 
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement de la synchronisation: {e}")
     
+    @timed(DB_QUERY_DURATION, method='get_sync_history')
+    def get_sync_history(self, limit: int = 20) -> List[Dict]:
+        """Dernières synchronisations, avec leur temps par étape"""
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT * FROM sync_history ORDER BY id DESC LIMIT ?
+                ''', (limit,)).fetchall()
+            
+            history = []
+            for row in rows:
+                entry = dict(row)
+                entry['stage_timings'] = json.loads(entry['stage_timings']) if entry['stage_timings'] else None
+                history.append(entry)
+            return history
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de l'historique des synchronisations: {e}")
+            return []
+    
+    @timed(DB_QUERY_DURATION, method='cleanup_old_data')
     def cleanup_old_data(self, days: int = 30):
         """Nettoyage des anciennes données (optionnel)"""
         try:
@@ -0,0 +1,167 @@
+"""
+Flux de changements - Diffusion des modifications de la base aux clients (SSE)
+Les événements sont lus dans le journal video_changes, commun à tous les
+processus : la reprise d'une connexion via l'en-tête Last-Event-ID fonctionne
+quel que soit le worker qui la sert
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Types d'événements émis
+VIDEO_INSERTED = 'video.inserted'
+VIDEO_UPDATED = 'video.updated'
+VIDEO_REMOVED = 'video.removed'
+SYNC_PROGRESS = 'sync.progress'
+
+# Événement envoyé quand le client doit tout recharger (curseur trop ancien)
+RESET = 'reset'
+
+
+class ChangeFeed:
+    """
+    Flux SSE d'un compte, alimenté par le journal des changements de sa base.
+
+    Chaque abonné relit les entrées postérieures à son curseur (numéro de
+    séquence du journal) : aussitôt après une écriture du processus, et toutes
+    les poll_interval secondes pour celles des autres écrivains (autres
+    workers, sync_cli.py, restauration d'une sauvegarde). Un 'reset' n'est
+    envoyé que si le curseur est sorti du journal conservé.
+
+    Les événements de progression des synchronisations ne sont pas journalisés :
+    ils restent propres au processus qui synchronise et sont envoyés sans
+    identifiant (le curseur du client n'avance pas).
+    """
+
+    def __init__(self, database: Callable, max_events: int = 1000,
+                 poll_interval: float = 1.0, batch_size: int = 500):
+        """
+        Args:
+            database: Accès à la base du compte (résolu à la première connexion)
+            max_events: Nombre d'événements de progression conservés en mémoire
+            poll_interval: Intervalle en secondes entre deux relectures du journal
+            batch_size: Nombre maximal d'événements lus par relecture
+        """
+        self._database = database
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._notices = deque(maxlen=max_events)
+        self._last_notice = 0
+        self._generation = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def notify(self):
+        """Signale une écriture du processus : les abonnés relisent le journal sans attendre"""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def publish(self, event_type: str, data: Dict) -> int:
+        """
+        Publie un événement non journalisé (progression) et réveille les abonnés
+
+        Args:
+            event_type: Type de l'événement (voir constantes du module)
+            data: Contenu de l'événement (sérialisable en JSON)
+
+        Returns:
+            int: Numéro de l'événement dans le processus
+        """
+        with self._condition:
+            self._last_notice += 1
+            self._notices.append((self._last_notice, event_type, data))
+            self._generation += 1
+            self._condition.notify_all()
+            return self._last_notice
+
+    def _notices_since(self, notice_id: int) -> List[Tuple[int, str, Dict]]:
+        with self._condition:
+            return [notice for notice in self._notices if notice[0] > notice_id]
+
+    def close(self):
+        """
+        Fin des flux SSE ouverts (compte évincé du cache) : les clients se
+        reconnectent au flux qui remplace celui-ci, depuis leur dernier événement
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def stream(self, last_id: Optional[int] = None, heartbeat: float = 15.0) -> Iterator[str]:
+        """
+        Générateur de messages au format Server-Sent Events
+
+        Args:
+            last_id: Dernier événement reçu par le client (None pour une nouvelle connexion)
+            heartbeat: Intervalle en secondes entre deux commentaires de maintien
+
+        Yields:
+            str: Messages SSE prêts à être envoyés
+        """
+        db = self._database()
+        resuming = last_id is not None
+        cursor = last_id if resuming else max(db.get_data_version(), 0)
+        with self._condition:
+            last_notice = self._last_notice
+        last_sent = time.monotonic()
+
+        while not self._closed:
+            with self._condition:
+                generation = self._generation
+
+            changes = db.get_change_events(cursor, self.batch_size)
+            if changes is not None:
+                if resuming:
+                    # Reprise depuis le journal : hit si les événements manquants sont encore conservés
+                    CACHE_REQUESTS.labels(cache='change_feed', result='miss' if changes['reset'] else 'hit').inc()
+                    resuming = False
+
+                if changes['reset']:
+                    # Reprise impossible : on repart du dernier changement journalisé
+                    cursor = changes['last_seq']
+                    yield format_sse(RESET, {'last_id': cursor}, event_id=cursor)
+                    last_sent = time.monotonic()
+
+                for event in changes['events']:
+                    cursor = event['id']
+                    yield format_sse(event['type'], event['data'], event_id=event['id'])
+                    last_sent = time.monotonic()
+                if not changes['has_more']:
+                    cursor = max(cursor, changes['last_seq'])
+
+            for notice_id, event_type, data in self._notices_since(last_notice):
+                last_notice = notice_id
+                yield format_sse(event_type, data)
+                last_sent = time.monotonic()
+
+            if changes is not None and changes['has_more']:
+                continue
+
+            idle = time.monotonic() - last_sent
+            if idle >= heartbeat:
+                yield ': keep-alive\n\n'
+                last_sent = time.monotonic()
+                idle = 0
+
+            with self._condition:
+                self._condition.wait_for(lambda: self._generation != generation or self._closed,
+                                         timeout=min(self.poll_interval, heartbeat - idle))
+
+
+def format_sse(event_type: str, data: Dict, event_id: Optional[int] = None) -> str:
+    """Formate un événement selon le protocole text/event-stream"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data, default=str)}')
+    return '\n'.join(lines) + '\n\n'
@@ -0,0 +1,155 @@
+"""
+Comptes par facette pour les filtres de la bibliothèque (catégorie, vue, chaîne, durée)
+Une seule requête regroupe les vidéos correspondant à la recherche par
+combinaison (catégorie, vue, chaîne, tranche de durée) ; toutes les facettes
+sont ensuite calculées en un passage sur ces groupes.
+
+Le compte d'une facette applique les filtres des autres facettes mais pas
+le sien : avec category=dev, la facette catégorie montre aussi combien de
+vidéos auraient les autres catégories. Les résultats sont mis en cache pour
+la version courante des données (journal des changements).
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Mapping, Optional
+import logging
+
+from planner import parse_iso_duration
+
+logger = logging.getLogger(__name__)
+
+# Tranches de durée (borne supérieure exclue, en secondes), comme les filtres de recherche YouTube
+DURATION_BUCKETS = (('short', 4 * 60), ('medium', 20 * 60), ('long', None))
+UNKNOWN_DURATION = 'unknown'
+
+FACETS = ('category', 'watched', 'channel', 'duration')
+
+# Chaînes renvoyées par défaut (les plus représentées)
+DEFAULT_CHANNEL_LIMIT = 50
+
+# Combinaisons de filtres gardées en cache pour une version des données
+MAX_CACHED_FILTERS = 128
+
+
+def duration_bucket(duration: Optional[str]) -> str:
+    """Tranche d'une durée ISO 8601 (fonction SQL duration_bucket)"""
+    seconds = parse_iso_duration(duration)
+    if seconds <= 0:
+        return UNKNOWN_DURATION
+    for name, limit in DURATION_BUCKETS:
+        if limit is None or seconds < limit:
+            return name
+    return UNKNOWN_DURATION
+
+
+def parse_filters(args: Mapping[str, str]) -> Dict:
+    """
+    Filtres de la requête (mêmes paramètres que /videos, plus channel et duration)
+
+    Raises:
+        ValueError: Valeur de watched ou de duration invalide
+    """
+    watched = args.get('watched')
+    if watched not in (None, '', 'true', 'false'):
+        raise ValueError("watched doit valoir true ou false")
+
+    duration = args.get('duration') or None
+    if duration is not None and duration not in [name for name, _ in DURATION_BUCKETS] + [UNKNOWN_DURATION]:
+        raise ValueError(f"Tranche de durée inconnue : {duration}")
+
+    category = args.get('category') or None
+    return {
+        'category': None if category == 'all' else category,
+        'watched': watched == 'true' if watched else None,
+        'channel': args.get('channel') or None,
+        'duration': duration,
+        'search': args.get('search') or None,
+        'playlist': args.get('playlist') or None,
+        'removed': args.get('removed') == 'true'
+    }
+
+
+def count_facets(groups: List[Dict], filters: Dict, channel_limit: int = DEFAULT_CHANNEL_LIMIT) -> Dict:
+    """Comptes de toutes les facettes en un passage sur les groupes de Database.get_facet_groups"""
+    counts = {facet: Counter() for facet in FACETS}
+    channel_titles = {}
+    total = 0
+
+    for group in groups:
+        values = {
+            'category': group['category'],
+            'watched': bool(group['watched']),
+            'channel': group['channel_id'],
+            'duration': group['duration_bucket']
+        }
+        mismatched = [facet for facet in FACETS if filters.get(facet) is not None and values[facet] != filters[facet]]
+        if not mismatched:
+            total += group['count']
+        for facet in FACETS:
+            # Filtres des autres facettes seulement : les choix alternatifs restent comptés
+            if not mismatched or mismatched == [facet]:
+                counts[facet][values[facet]] += group['count']
+        channel_titles[group['channel_id']] = group['channel_title']
+
+    duration_names = [name for name, _ in DURATION_BUCKETS] + [UNKNOWN_DURATION]
+    return {
+        'total': total,
+        'facets': {
+            'category': [{'value': value, 'count': count} for value, count in counts['category'].most_common()],
+            'watched': [{'value': value, 'count': counts['watched'][value]} for value in (False, True)],
+            'channel': [
+                {'value': value, 'label': channel_titles.get(value), 'count': count}
+                for value, count in counts['channel'].most_common(channel_limit)
+            ],
+            'duration': [{'value': name, 'count': counts['duration'][name]} for name in duration_names]
+        }
+    }
+
+
+class FacetCounter:
+    """Comptes par facette, en cache par version des données"""
+
+    def __init__(self, db, max_cached: int = MAX_CACHED_FILTERS):
+        """
+        Args:
+            db: Base de données (Database)
+            max_cached: Combinaisons de filtres gardées pour la version courante
+        """
+        self.db = db
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._cache: 'OrderedDict[tuple, Dict]' = OrderedDict()
+
+    def counts(self, filters: Dict, channel_limit: int = DEFAULT_CHANNEL_LIMIT) -> Dict:
+        """
+        Comptes pour des filtres (parse_filters) ; recalculés seulement si les données ont changé
+
+        Raises:
+            RuntimeError: Lecture des groupes en échec
+        """
+        version = self.db.get_data_version()
+        key = (channel_limit,) + tuple(sorted(filters.items()))
+
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._cache.clear()
+            elif key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        groups = self.db.get_facet_groups(filters['search'], filters['playlist'], filters['removed'])
+        if groups is None:
+            # Échec de la requête : rien n'est mis en cache, la route répond par une erreur
+            raise RuntimeError("Comptes par facette indisponibles")
+        result = dict(count_facets(groups, filters, channel_limit), data_version=version)
+
+        with self._lock:
+            # Version lue en erreur (-1) ou changée pendant le calcul : résultat non conservé
+            if version >= 0 and version == self._version:
+                self._cache[key] = result
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        return result
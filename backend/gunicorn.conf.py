@@ -0,0 +1,53 @@
+"""
+Configuration gunicorn pour la production
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Les valeurs se surchargent par variables d'environnement (voir DEPLOYMENT.md).
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5000)}"
+
+# L'application est importée une seule fois dans le maître puis partagée par
+# fork (copy-on-write) : les workers démarrent sans recharger Flask. Les services
+# (base, client YouTube) sont créés paresseusement dans chaque worker.
+preload_app = True
+
+# Workers à threads : les requêtes passent l'essentiel de leur temps à attendre
+# l'API YouTube ou SQLite, et chaque flux SSE occupe un thread
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() + 1, 4)))
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+# Une synchronisation complète peut durer plusieurs dizaines de secondes
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recyclage périodique des workers (fuites mémoire éventuelles des dépendances)
+max_requests = 2000
+max_requests_jitter = 200
+
+# Fichiers de heartbeat en mémoire (évite les blocages sur disque lent)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Métriques Prometheus additionnées entre workers : un dossier propre à ce maître,
+# défini avant le chargement de l'application (preload_app)
+os.environ.setdefault('METRICS_DIR', os.path.join(
+    worker_tmp_dir or tempfile.gettempdir(), f'youtube_organizer_metrics_{os.getpid()}'
+))
+
+
+def on_starting(server):
+    """Purge des métriques d'un maître précédent ayant réutilisé le même dossier"""
+    import metrics
+    metrics.clear_directory(os.environ['METRICS_DIR'])
+
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
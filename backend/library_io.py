@@ -0,0 +1,259 @@
+"""
+Export et import de la bibliothèque en flux
+Les vidéos sont lues par blocs depuis un curseur SQLite et écrites au fur et
+à mesure (NDJSON, Parquet ou flux Arrow IPC) ; l'import relit un fichier par
+blocs et les enregistre en grandes transactions (Database.save_videos).
+La mémoire utilisée est constante, quelle que soit la taille de la bibliothèque.
+
+Chaque vidéo emporte son état d'archivage (removed_at) et ses appartenances
+aux playlists (colonne playlists) : un export réimporté dans une base vide
+restitue la même bibliothèque.
+
+    python library_io.py export --format parquet --output bibliotheque.parquet
+    python library_io.py import bibliotheque.ndjson
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import sys
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Nombre de vidéos par bloc lu (export) ou enregistré (import)
+EXPORT_CHUNK_SIZE = 1000
+IMPORT_BATCH_SIZE = 5000
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+# Colonnes exportées (table videos puis appartenances aux playlists), dans l'ordre
+COLUMNS = (
+    'id', 'title', 'description', 'channel_title', 'channel_id', 'thumbnail_url', 'duration',
+    'published_at', 'added_to_playlist_at', 'category', 'watched', 'watch_time', 'tags',
+    'view_count', 'like_count', 'created_at', 'updated_at', 'suggested_category', 'suggestion_confidence',
+    'removed_at', 'playlists'
+)
+
+
+def arrow_available() -> bool:
+    """pyarrow installé (formats parquet et arrow), sans l'importer"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _arrow(fmt: str):
+    """
+    Import différé de pyarrow : son chargement (~100 ms) ne pèse pas sur le
+    démarrage de l'application, seulement sur le premier export colonnes
+
+    Raises:
+        RuntimeError: pyarrow n'est pas installé
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet as pq
+    except ImportError:  # Formats colonnes optionnels
+        raise RuntimeError(f"Format {fmt} indisponible : pyarrow n'est pas installé")
+    return pa, pq
+
+
+def arrow_schema():
+    pa, _ = _arrow('arrow')
+    string_columns = {
+        'id', 'title', 'description', 'channel_title', 'channel_id', 'thumbnail_url', 'duration',
+        'published_at', 'added_to_playlist_at', 'category', 'created_at', 'updated_at', 'suggested_category',
+        'removed_at'
+    }
+    fields = []
+    for column in COLUMNS:
+        if column in string_columns:
+            fields.append(pa.field(column, pa.string()))
+        elif column == 'watched':
+            fields.append(pa.field(column, pa.bool_()))
+        elif column == 'tags':
+            fields.append(pa.field(column, pa.list_(pa.string())))
+        elif column == 'suggestion_confidence':
+            fields.append(pa.field(column, pa.float64()))
+        elif column == 'playlists':
+            fields.append(pa.field(column, pa.list_(pa.struct([
+                pa.field('playlist_id', pa.string()),
+                pa.field('position', pa.int64()),
+                pa.field('added_at', pa.string())
+            ]))))
+        else:
+            fields.append(pa.field(column, pa.int64()))
+    return pa.schema(fields)
+
+
+def _record(video: Dict) -> Dict:
+    record = {column: video.get(column) for column in COLUMNS}
+    record['watched'] = bool(record['watched'])
+    record['playlists'] = record['playlists'] or []
+    return record
+
+
+class _StreamSink(io.RawIOBase):
+    """Fichier en écriture seule dont le contenu est récupéré bloc par bloc"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        data, self._buffer = bytes(self._buffer), bytearray()
+        return data
+
+
+def export_chunks(db, fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Export de toutes les vidéos, produit par morceaux d'octets (réponse HTTP ou fichier)
+
+    Args:
+        db: Base de données (Database)
+        fmt: ndjson, parquet ou arrow
+        chunk_size: Vidéos par bloc (un groupe de lignes Parquet ou un lot Arrow par bloc)
+    """
+    if fmt == 'ndjson':
+        for chunk in db.iter_videos(chunk_size):
+            yield ''.join(json.dumps(_record(video), ensure_ascii=False) + '\n' for video in chunk).encode('utf-8')
+        return
+
+    pa, pq = _arrow(fmt)
+    schema = arrow_schema()
+    sink = _StreamSink()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        write = writer.write_table
+    elif fmt == 'arrow':
+        writer = pa.ipc.new_stream(sink, schema)
+        write = writer.write_table
+    else:
+        raise ValueError(f"Format inconnu : {fmt}")
+
+    for chunk in db.iter_videos(chunk_size):
+        write(pa.Table.from_pylist([_record(video) for video in chunk], schema=schema))
+        yield sink.take()
+
+    writer.close()
+    yield sink.take()
+
+
+def read_batches(source: IO[bytes], fmt: str, batch_size: int = IMPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Lecture d'un export par lots de vidéos (fichier binaire ou flux de requête)"""
+    if fmt == 'ndjson':
+        batch = []
+        for line in source:
+            line = line.strip()
+            if not line:
+                continue
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    pa, pq = _arrow(fmt)
+    if fmt == 'parquet':
+        # Parquet exige un accès aléatoire (pied de fichier) : source doit être un fichier
+        for record_batch in pq.ParquetFile(source).iter_batches(batch_size=batch_size):
+            yield record_batch.to_pylist()
+    elif fmt == 'arrow':
+        for record_batch in pa.ipc.open_stream(source):
+            for start in range(0, record_batch.num_rows, batch_size):
+                yield record_batch.slice(start, batch_size).to_pylist()
+    else:
+        raise ValueError(f"Format inconnu : {fmt}")
+
+
+def import_batches(db, batches: Iterable[List[Dict]],
+                   after_batch: Optional[Callable[[List[Dict]], object]] = None) -> Dict:
+    """
+    Enregistrement des lots lus : métadonnées par le chemin d'ingestion, puis
+    état de l'utilisateur (catégorie, statut vu) restauré tel qu'exporté
+
+    Args:
+        db: Base de données (Database)
+        batches: Lots de vidéos (read_batches)
+        after_batch: Traitement appelé après chaque lot enregistré (indexation...)
+
+    Returns:
+        Dict: Nombre de vidéos lues, de vidéos enregistrées et de nouvelles vidéos
+        (saved_videos < total_videos : une partie de l'import a échoué)
+    """
+    total, saved, new_videos = 0, 0, 0
+    for batch in batches:
+        batch = [video for video in batch if video.get('id')]
+        new_videos += db.save_videos(batch)
+        saved += db.restore_user_state(batch)
+        if after_batch is not None:
+            after_batch(batch)
+        total += len(batch)
+
+    if saved != total:
+        logger.error(f"Import incomplet : {saved} vidéos enregistrées sur {total} lues")
+    else:
+        logger.info(f"Import terminé : {total} vidéos, dont {new_videos} nouvelles")
+    return {'total_videos': total, 'saved_videos': saved, 'new_videos': new_videos}
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return {'jsonl': 'ndjson', 'ndjson': 'ndjson', 'parquet': 'parquet', 'arrow': 'arrow', 'arrows': 'arrow'}.get(extension, 'ndjson')
+
+
+def main():
+    from database import Database
+
+    parser = argparse.ArgumentParser(description='Export et import de la bibliothèque')
+    parser.add_argument('--database', help='Fichier SQLite (DATABASE_PATH par défaut)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Export de toutes les vidéos')
+    export_parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    export_parser.add_argument('--output', help='Fichier de sortie (sortie standard par défaut)')
+
+    import_parser = subparsers.add_parser('import', help='Import d\'un export')
+    import_parser.add_argument('path', help='Fichier à importer')
+    import_parser.add_argument('--format', choices=FORMATS, help='Format (déduit de l\'extension par défaut)')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = Database(args.database or os.environ.get('DATABASE_PATH', 'youtube_organizer.db'))
+    db.init_db()
+
+    if args.command == 'export':
+        output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        try:
+            for data in export_chunks(db, args.format):
+                output.write(data)
+        finally:
+            if args.output:
+                output.close()
+    else:
+        fmt = args.format or detect_format(args.path)
+        with open(args.path, 'rb') as source:
+            result = import_batches(db, read_batches(source, fmt))
+        print(json.dumps(result))
+        if result['saved_videos'] != result['total_videos']:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
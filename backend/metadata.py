@@ -0,0 +1,321 @@
+"""
+Métadonnées des vidéos partagées entre comptes
+Les réponses videos.list (durée, tags, statistiques) ne dépendent pas de
+l'utilisateur : elles sont gardées dans une base SQLite commune à tous les
+comptes et réutilisées tant qu'elles ont moins de METADATA_MAX_AGE_HOURS.
+Une vidéo présente dans la playlist de plusieurs utilisateurs n'est demandée
+qu'une fois par période de rafraîchissement.
+
+Les demandes de détails concurrentes (synchronisations de plusieurs comptes)
+passent par une file commune : chaque vidéo manquante n'est demandée qu'une
+fois, même si plusieurs comptes l'attendent. Un lot n'est envoyé qu'avec le
+jeton (et le quota) d'un compte qui a demandé toutes ses vidéos ; en cas
+d'échec, ses vidéos sont remises en file pour les autres comptes qui les
+attendent, avec leur propre jeton.
+
+L'état propre à l'utilisateur (vue, catégorie, date d'ajout, position) reste
+dans la base du compte. La base du compte garde aussi sa copie des
+métadonnées (titre, durée, tags, statistiques) : filtres, recherche, facettes,
+planification et export sont des requêtes SQL sur ce seul fichier, sans
+jointure entre bases. La base partagée n'est qu'un cache des réponses
+videos.list (avec expiration), pas la référence des données affichées.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Limite de videos.list
+BATCH_SIZE = 50
+
+# Variables par requête SQL (limite historique de SQLite : 999)
+SQL_CHUNK = 500
+
+
+class MetadataStore:
+    """Réponses videos.list par ID de vidéo, communes à tous les comptes"""
+
+    def __init__(self, db_path: str = 'video_metadata.db', max_age: float = 24 * 3600):
+        """
+        Args:
+            db_path: Fichier SQLite partagé
+            max_age: Âge maximal d'une réponse réutilisée (secondes)
+        """
+        self.db_path = db_path
+        self.max_age = max_age
+
+    def get_connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_db(self):
+        """Création de la table (idempotente)"""
+        with self.get_connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS video_metadata (
+                    id TEXT PRIMARY KEY,
+                    resource TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+
+    def get_many(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Réponses encore fraîches des vidéos demandées (les autres sont absentes)"""
+        resources = {}
+        min_fetched_at = time.time() - self.max_age
+        try:
+            with self.get_connection() as conn:
+                for start in range(0, len(video_ids), SQL_CHUNK):
+                    chunk = video_ids[start:start + SQL_CHUNK]
+                    rows = conn.execute(f'''
+                        SELECT id, resource FROM video_metadata
+                        WHERE id IN ({','.join('?' * len(chunk))}) AND fetched_at >= ?
+                    ''', (*chunk, min_fetched_at))
+                    for video_id, resource in rows:
+                        resources[video_id] = json.loads(resource)
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lors de la lecture des métadonnées partagées: {e}")
+        return resources
+
+    def put_many(self, resources: Iterable[Dict]):
+        """Enregistrement (ou rafraîchissement) de réponses videos.list"""
+        now = time.time()
+        rows = [(resource['id'], json.dumps(resource), now) for resource in resources]
+        if not rows:
+            return
+        try:
+            with self.get_connection() as conn:
+                conn.executemany('''
+                    INSERT INTO video_metadata (id, resource, fetched_at) VALUES (?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET resource = excluded.resource, fetched_at = excluded.fetched_at
+                ''', rows)
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lors de l'écriture des métadonnées partagées: {e}")
+
+
+class _DetailQueue:
+    """
+    File commune des IDs en attente de détails (état partagé des deux files)
+
+    Chaque ID a une future unique et l'ensemble des appelants (owners) qui
+    l'attendent ; un appelant ne vide de la file que les IDs qu'il a demandés.
+    Les méthodes ne prennent aucun verrou : la sous-classe s'en charge.
+    """
+
+    def __init__(self, store: Optional[MetadataStore] = None, batch_size: int = BATCH_SIZE):
+        """
+        Args:
+            store: Métadonnées partagées (aucune réutilisation si absent)
+            batch_size: IDs par appel de videos.list
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self._futures: Dict[str, Any] = {}
+        self._owners: Dict[str, Set[object]] = {}
+        self._queue: 'OrderedDict[str, None]' = OrderedDict()
+
+    def _register(self, owner: object, video_ids: Iterable[str], new_future: Callable[[], Any]) -> Dict[str, Any]:
+        """Futures des IDs demandés (une seule par ID, même demandée par plusieurs appelants)"""
+        pending = {}
+        for video_id in video_ids:
+            future = self._futures.get(video_id)
+            if future is None:
+                future = self._futures[video_id] = new_future()
+                self._owners[video_id] = set()
+                self._queue[video_id] = None
+            self._owners[video_id].add(owner)
+            pending[video_id] = future
+        return pending
+
+    def _take(self, owner: object) -> List[str]:
+        """Prochain lot d'IDs en file demandés par l'appelant"""
+        batch = list(islice((video_id for video_id in self._queue if owner in self._owners[video_id]), self.batch_size))
+        for video_id in batch:
+            del self._queue[video_id]
+        return batch
+
+    def _complete(self, batch: List[str]) -> List[tuple]:
+        """(ID, future) d'un lot terminé"""
+        for video_id in batch:
+            del self._owners[video_id]
+        return [(video_id, self._futures.pop(video_id)) for video_id in batch]
+
+    def _fail(self, owner: object, batch: List[str]) -> List[Any]:
+        """
+        Lot en échec avec le jeton de l'appelant : les IDs attendus par d'autres
+        comptes sont remis en file pour eux, les futures des autres sont renvoyées
+        """
+        failed = []
+        for video_id in batch:
+            owners = self._owners[video_id]
+            owners.discard(owner)
+            if owners:
+                self._queue[video_id] = None
+            else:
+                del self._owners[video_id]
+                failed.append(self._futures.pop(video_id))
+        return failed
+
+    def _release(self, owner: object, video_ids: Iterable[str]) -> List[Any]:
+        """Départ d'un appelant interrompu : futures des IDs en file que plus personne n'attend"""
+        abandoned = []
+        for video_id in video_ids:
+            owners = self._owners.get(video_id)
+            if owners is None or owner not in owners:
+                continue
+            owners.discard(owner)
+            if not owners and video_id in self._queue:
+                del self._queue[video_id]
+                del self._owners[video_id]
+                abandoned.append(self._futures.pop(video_id))
+        return abandoned
+
+
+class DetailBatcher(_DetailQueue):
+    """File commune des demandes de détails (threads)"""
+
+    def __init__(self, store: Optional[MetadataStore] = None, batch_size: int = BATCH_SIZE):
+        super().__init__(store, batch_size)
+        self._condition = threading.Condition()
+
+    def fetch(self, video_ids: List[str],
+              fetch_batch: Callable[[List[str]], Dict[str, Dict]]) -> Dict[str, Dict]:
+        """
+        Détails des vidéos (réponses videos.list par ID ; vidéos indisponibles absentes)
+
+        Args:
+            video_ids: IDs demandés
+            fetch_batch: Appel de videos.list pour au plus batch_size IDs (jeton et connexion de l'appelant)
+
+        Raises:
+            Exception: Erreur de l'appel videos.list d'un lot qu'aucun autre compte n'attendait
+        """
+        details = self.store.get_many(video_ids) if self.store else {}
+        owner = object()
+        with self._condition:
+            pending = self._register(owner, (video_id for video_id in video_ids if video_id not in details), Future)
+
+        try:
+            # Lots de l'appelant envoyés par lui ; attente des IDs en cours chez les autres
+            while True:
+                with self._condition:
+                    batch = self._take(owner)
+                    if not batch:
+                        if all(future.done() for future in pending.values()):
+                            break
+                        self._condition.wait()
+                        continue
+                self._run_batch(owner, batch, fetch_batch)
+        finally:
+            with self._condition:
+                abandoned = self._release(owner, pending)
+            for future in abandoned:
+                future.cancel()
+
+        for video_id, future in pending.items():
+            resource = future.result()
+            if resource is not None:
+                details[video_id] = resource
+        return details
+
+    def _run_batch(self, owner: object, batch: List[str], fetch_batch: Callable[[List[str]], Dict[str, Dict]]):
+        try:
+            resources = fetch_batch(batch)
+        except Exception as e:
+            with self._condition:
+                for future in self._fail(owner, batch):
+                    future.set_exception(e)
+                self._condition.notify_all()
+            return
+
+        if self.store:
+            self.store.put_many(resources.values())
+        with self._condition:
+            for video_id, future in self._complete(batch):
+                future.set_result(resources.get(video_id))
+            self._condition.notify_all()
+
+
+class AsyncDetailBatcher(_DetailQueue):
+    """File commune des demandes de détails (coroutines, même boucle d'événements : pas de verrou)"""
+
+    def __init__(self, store: Optional[MetadataStore] = None, batch_size: int = BATCH_SIZE):
+        super().__init__(store, batch_size)
+        self._tasks = set()  # Références fortes : la boucle ne garde les tâches que faiblement
+        self._wakeup: Optional[asyncio.Future] = None  # Résolue quand des IDs sont remis en file
+
+    async def fetch(self, video_ids: List[str],
+                    fetch_batch: Callable[[List[str]], Awaitable[Dict[str, Dict]]]) -> Dict[str, Dict]:
+        """
+        Détails des vidéos ; les lots de l'appelant sont envoyés en parallèle
+
+        Raises:
+            Exception: Erreur de l'appel videos.list d'un lot qu'aucun autre compte n'attendait
+        """
+        loop = asyncio.get_running_loop()
+        details = await loop.run_in_executor(None, self.store.get_many, video_ids) if self.store else {}
+        owner = object()
+        pending = self._register(owner, (video_id for video_id in video_ids if video_id not in details),
+                                 loop.create_future)
+
+        try:
+            while True:
+                batch = self._take(owner)
+                while batch:
+                    task = asyncio.ensure_future(self._run_batch(owner, batch, fetch_batch))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                    batch = self._take(owner)
+
+                waiting = [future for future in pending.values() if not future.done()]
+                if not waiting:
+                    break
+                if self._wakeup is None or self._wakeup.done():
+                    self._wakeup = loop.create_future()
+                # asyncio.wait n'annule pas les futures : l'annulation d'une synchronisation
+                # n'annule pas les lots attendus par les autres
+                await asyncio.wait(waiting + [self._wakeup], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for future in self._release(owner, pending):
+                future.cancel()
+
+        for video_id, future in pending.items():
+            resource = future.result()
+            if resource is not None:
+                details[video_id] = resource
+        return details
+
+    def _wake(self):
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    async def _run_batch(self, owner: object, batch: List[str],
+                         fetch_batch: Callable[[List[str]], Awaitable[Dict[str, Dict]]]):
+        try:
+            resources = await fetch_batch(batch)
+        except asyncio.CancelledError:
+            for future in self._fail(owner, batch):
+                future.cancel()
+            self._wake()
+            raise
+        except Exception as e:
+            for future in self._fail(owner, batch):
+                future.set_exception(e)
+                # Exception récupérée ici pour éviter l'avertissement si aucun appelant n'attend
+                future.exception()
+            self._wake()
+            return
+
+        for video_id, future in self._complete(batch):
+            future.set_result(resources.get(video_id))
+        if self.store and resources:
+            await asyncio.get_running_loop().run_in_executor(None, self.store.put_many, list(resources.values()))
@@ -0,0 +1,371 @@
+"""
+Métriques Prometheus - Compteurs et histogrammes légers exposés sur /metrics
+Implémentation minimale du format texte Prometheus (sans dépendance externe)
+
+Avec plusieurs workers (gunicorn), chaque processus écrit périodiquement ses
+valeurs dans un fichier d'un dossier partagé (METRICS_DIR) ; /metrics additionne
+les fichiers de tous les processus, y compris ceux des workers recyclés, pour que
+les compteurs restent monotones quel que soit le worker interrogé.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bornes par défaut des histogrammes de latence (en secondes)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Type de contenu attendu par Prometheus
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Intervalle d'écriture des valeurs du processus dans le dossier partagé (secondes)
+FLUSH_INTERVAL = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+class _Metric:
+    """Base commune : une métrique nommée, déclinée par combinaison de labels"""
+
+    metric_type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional['Registry'] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, **labels):
+        """Retourne (en le créant si besoin) l'enfant associé aux valeurs de labels"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ''
+        escaped = (f'{name}="{_escape(value)}"' for name, value in pairs)
+        return '{' + ','.join(escaped) + '}'
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List[float]]:
+        """Valeurs courantes du processus, par combinaison de labels"""
+        return {key: child.values() for key, child in list(self._children.items())}
+
+    def reset(self):
+        """Remise à zéro des valeurs (processus fils après un fork)"""
+        self._lock = threading.Lock()
+        for child in self._children.values():
+            child.reset()
+
+    def collect(self, values: Optional[Dict[Tuple[str, ...], List[float]]] = None) -> List[str]:
+        """Lignes au format texte (valeurs du processus par défaut, ou valeurs agrégées)"""
+        if values is None:
+            values = self.snapshot()
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        for key, child_values in sorted(values.items()):
+            lines.extend(self._collect_values(key, child_values))
+        return lines
+
+    def _collect_values(self, key, values: List[float]) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+        REGISTRY.dirty = True
+
+    def values(self) -> List[float]:
+        return [self.value]
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+
+class Counter(_Metric):
+    """Compteur monotone"""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional['Registry'] = None):
+        super().__init__(f'{name}_total', documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Incrément d'un compteur sans labels"""
+        self.labels().inc(amount)
+
+    def _collect_values(self, key, values: List[float]) -> List[str]:
+        return [f'{self.name}{self._format_labels(key)} {values[0]}']
+
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # Dernière case : +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+        REGISTRY.dirty = True
+
+    def values(self) -> List[float]:
+        """Effectifs par case suivis de la somme"""
+        with self._lock:
+            return self.counts + [self.sum]
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.upper_bounds) + 1)
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Histogramme à bornes fixes (distribution des latences)"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, registry: Optional['Registry'] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        """Observation pour un histogramme sans labels"""
+        self.labels().observe(value)
+
+    def _collect_values(self, key, values: List[float]) -> List[str]:
+        counts, total_sum = values[:-1], values[-1]
+
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{self.name}_bucket{self._format_labels(key, {"le": le})} {cumulative}')
+        lines.append(f'{self.name}_sum{self._format_labels(key)} {total_sum}')
+        lines.append(f'{self.name}_count{self._format_labels(key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Ensemble des métriques exposées"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self.directory: Optional[str] = None
+        self._file: Optional[str] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        # Positionné à chaque mesure : le fichier n'est réécrit que si les valeurs ont changé
+        self.dirty = False
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Export au format texte Prometheus"""
+        merged = self._aggregate() if self.directory else None
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect(merged.get(metric.name, {}) if merged is not None else None))
+        return '\n'.join(lines) + '\n'
+
+    # === Mode multiprocessus ===
+
+    def enable_multiprocess(self, directory: str):
+        """Partage des valeurs entre processus via des fichiers dans directory"""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._start_flusher()
+        atexit.register(self.flush)
+
+    def _start_flusher(self):
+        # Un fichier par vie de processus : un PID réutilisé n'écrase pas les
+        # valeurs d'un ancien worker, qui restent comptées
+        self._pid = os.getpid()
+        self._file = os.path.join(self.directory, f'{self._pid}-{secrets.token_hex(4)}.json')
+        self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+    def _after_fork(self):
+        # Le fils hérite des valeurs du parent, déjà comptées dans le fichier de celui-ci
+        for metric in self._metrics:
+            metric.reset()
+        self.dirty = False
+        if self.directory:
+            self._start_flusher()
+
+    def _flush_loop(self):
+        pid = self._pid
+        while self._pid == pid:
+            time.sleep(FLUSH_INTERVAL)
+            if self._pid == pid and self.dirty:
+                self.flush()
+
+    def _snapshot(self) -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def flush(self):
+        """Écriture atomique des valeurs du processus dans son fichier"""
+        if not self.directory:
+            return
+        self.dirty = False
+        data = {
+            name: [[list(key), values] for key, values in children.items()]
+            for name, children in self._snapshot().items()
+        }
+        tmp_path = f'{self._file}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._file)
+        except OSError as e:
+            logger.error(f"Erreur lors de l'écriture des métriques : {e}")
+
+    def _aggregate(self) -> Dict[str, Dict[Tuple[str, ...], List[float]]]:
+        """Somme des valeurs de ce processus et des fichiers des autres"""
+        merged = self._snapshot()
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            logger.error(f"Erreur lors de la lecture des métriques partagées : {e}")
+            return merged
+
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not name.endswith('.json') or path == self._file:
+                continue
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # Fichier supprimé ou en cours de remplacement
+            for metric_name, children in data.items():
+                target = merged.get(metric_name)
+                if target is None:
+                    continue  # Métrique retirée depuis
+                for key, values in children:
+                    key = tuple(key)
+                    current = target.get(key)
+                    if current is None:
+                        target[key] = list(values)
+                    elif len(current) == len(values):  # Bornes d'histogramme identiques
+                        target[key] = [a + b for a, b in zip(current, values)]
+        return merged
+
+
+def configure(directory: Optional[str]):
+    """Dossier partagé entre processus (vide = métriques propres au processus)"""
+    if directory:
+        REGISTRY.enable_multiprocess(directory)
+
+
+def clear_directory(directory: str):
+    """Suppression des fichiers d'une exécution précédente (au démarrage du maître)"""
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith(('.json', '.tmp')):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def timed(histogram: Histogram, **labels) -> Callable:
+    """Décorateur mesurant la durée d'exécution d'une fonction dans un histogramme"""
+    def decorator(func: Callable) -> Callable:
+        child = histogram.labels(**labels)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+    return decorator
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY._after_fork)
+
+# === Métriques de l'application ===
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Durée de traitement des requêtes HTTP par route',
+    ('method', 'route', 'status')
+)
+
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Durée des opérations SQLite par méthode de Database',
+    ('method',)
+)
+
+YOUTUBE_API_CALLS = Counter(
+    'youtube_api_calls', 'Appels à l\'API YouTube par méthode et code de retour',
+    ('method', 'status')
+)
+
+YOUTUBE_API_DURATION = Histogram(
+    'youtube_api_duration_seconds', 'Latence des appels à l\'API YouTube par méthode',
+    ('method',)
+)
+
+SYNC_VIDEOS = Histogram(
+    'sync_videos_per_run', 'Nombre de vidéos récupérées par synchronisation',
+    buckets=(0, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+
+SYNC_NEW_VIDEOS = Counter('sync_new_videos', 'Nouvelles vidéos enregistrées par les synchronisations')
+
+CACHE_REQUESTS = Counter(
+    'cache_requests', 'Accès aux caches (hit ou miss)',
+    ('cache', 'result')
+)
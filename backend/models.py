@@ -0,0 +1,221 @@
+"""
+Enregistrement Video : format unique d'une vidéo entre l'API YouTube et la base
+Toutes les conversions passent par cette classe :
+
+    réponse de l'API  -> Video.from_api
+    export / import   -> Video.from_dict
+    ligne SQL         -> Video.insert_params / Video.update_params
+    JSON (événements) -> Video.to_dict
+
+PlaylistContents décrit l'appartenance des vidéos à une playlist synchronisée.
+
+La classe utilise __slots__ (pas de dictionnaire par instance) : une vidéo
+occupe environ deux fois moins de mémoire qu'un dict équivalent.
+Compatible Python 3.8 (pas de dataclass(slots=True)).
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Champs enregistrés dans la table videos, dans l'ordre des colonnes
+FIELDS = (
+    'id', 'title', 'description', 'channel_title', 'channel_id', 'thumbnail_url',
+    'duration', 'published_at', 'added_to_playlist_at', 'tags', 'view_count', 'like_count'
+)
+
+# Anciennes clés produites par la synchronisation (avant l'enregistrement Video)
+LEGACY_KEYS = {'thumbnail': 'thumbnail_url', 'channel_name': 'channel_title'}
+
+# Nombre maximal de playlists par synchronisation
+MAX_SYNC_PLAYLISTS = 20
+
+PLAYLIST_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{2,64}')
+
+
+def parse_playlist_ids(value: Optional[str]) -> List[str]:
+    """
+    IDs de playlists séparés par des virgules (doublons retirés, ordre conservé)
+
+    Raises:
+        ValueError: ID invalide ou trop de playlists
+    """
+    playlist_ids = list(dict.fromkeys(part.strip() for part in (value or '').split(',') if part.strip()))
+    for playlist_id in playlist_ids:
+        if not PLAYLIST_ID_PATTERN.fullmatch(playlist_id):
+            raise ValueError(f"ID de playlist invalide : {playlist_id}")
+    if len(playlist_ids) > MAX_SYNC_PLAYLISTS:
+        raise ValueError(f"Au plus {MAX_SYNC_PLAYLISTS} playlists par synchronisation")
+    return playlist_ids
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Video:
+    """
+    Métadonnées d'une vidéo de la playlist (hors état propre à l'utilisateur)
+
+    has_details vaut False si videos.list n'a rien renvoyé pour la vidéo
+    (indisponible) : durée, tags et statistiques sont alors des valeurs par
+    défaut, que la base remplace par celles déjà enregistrées (keep_details).
+    """
+
+    __slots__ = FIELDS + ('has_details',)
+
+    def __init__(self, id: str, title: str = '', description: str = '', channel_title: str = '',
+                 channel_id: str = '', thumbnail_url: str = '', duration: str = 'PT0S',
+                 published_at: Optional[str] = None, added_to_playlist_at: Optional[str] = None,
+                 tags: Iterable[str] = (), view_count: int = 0, like_count: int = 0,
+                 has_details: bool = True):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.channel_title = channel_title
+        self.channel_id = channel_id
+        self.thumbnail_url = thumbnail_url
+        self.duration = duration
+        self.published_at = published_at
+        self.added_to_playlist_at = added_to_playlist_at
+        self.tags: Tuple[str, ...] = tuple(tags)
+        self.view_count = view_count
+        self.like_count = like_count
+        self.has_details = has_details
+
+    @classmethod
+    def from_api(cls, item: Dict, details: Dict) -> 'Video':
+        """Élément de playlistItems.list et réponse videos.list correspondante"""
+        snippet = item['snippet']
+        detail_snippet = details.get('snippet', {})
+        statistics = details.get('statistics', {})
+        return cls(
+            id=snippet['resourceId']['videoId'],
+            title=snippet['title'],
+            description=snippet['description'],
+            channel_title=snippet['channelTitle'],
+            channel_id=snippet['channelId'],
+            thumbnail_url=snippet['thumbnails'].get('medium', {}).get('url', ''),
+            duration=details.get('contentDetails', {}).get('duration', 'PT0S'),
+            published_at=snippet['publishedAt'],
+            added_to_playlist_at=snippet['publishedAt'],
+            tags=detail_snippet.get('tags', ()),
+            view_count=_to_int(statistics.get('viewCount')),
+            like_count=_to_int(statistics.get('likeCount')),
+            has_details=bool(details)
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Video':
+        """Dictionnaire (export, import, ancien format de synchronisation) ; clés inconnues ignorées"""
+        values = {LEGACY_KEYS.get(key, key): value for key, value in data.items()}
+        tags = values.get('tags') or ()
+        if isinstance(tags, str):
+            tags = json.loads(tags or '[]')
+        return cls(
+            id=values['id'],
+            title=values.get('title') or '',
+            description=values.get('description') or '',
+            channel_title=values.get('channel_title') or '',
+            channel_id=values.get('channel_id') or '',
+            thumbnail_url=values.get('thumbnail_url') or '',
+            duration=values.get('duration') or 'PT0S',
+            published_at=values.get('published_at'),
+            added_to_playlist_at=values.get('added_to_playlist_at'),
+            tags=tags,
+            view_count=_to_int(values.get('view_count')),
+            like_count=_to_int(values.get('like_count'))
+        )
+
+    @classmethod
+    def coerce(cls, video: Union['Video', Dict]) -> 'Video':
+        return video if isinstance(video, cls) else cls.from_dict(video)
+
+    def keep_details(self, row: Any):
+        """Durée, tags et statistiques repris d'une ligne enregistrée (vidéo sans réponse videos.list)"""
+        self.duration = row['duration'] or 'PT0S'
+        self.tags = tuple(json.loads(row['tags'] or '[]'))
+        self.view_count = _to_int(row['view_count'])
+        self.like_count = _to_int(row['like_count'])
+        self.has_details = True
+
+    def insert_params(self, added_at: str) -> tuple:
+        """Paramètres de Database.INSERT_VIDEO_SQL (added_at si la date d'ajout est inconnue)"""
+        return (
+            self.id, self.title, self.description, self.channel_title, self.channel_id,
+            self.thumbnail_url, self.duration, self.published_at,
+            self.added_to_playlist_at or added_at,
+            json.dumps(self.tags), self.view_count, self.like_count
+        )
+
+    def update_params(self, updated_at: str) -> tuple:
+        """Paramètres de Database.UPDATE_VIDEO_SQL"""
+        return (
+            self.title, self.description, self.channel_title, self.channel_id,
+            self.thumbnail_url, self.duration, self.published_at,
+            json.dumps(self.tags), self.view_count, self.like_count, updated_at, self.id
+        )
+
+    def to_dict(self) -> Dict:
+        """Représentation JSON (mêmes clés que les colonnes de la table videos)"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'channel_title': self.channel_title,
+            'channel_id': self.channel_id,
+            'thumbnail_url': self.thumbnail_url,
+            'duration': self.duration,
+            'published_at': self.published_at,
+            'added_to_playlist_at': self.added_to_playlist_at,
+            'tags': list(self.tags),
+            'view_count': self.view_count,
+            'like_count': self.like_count
+        }
+
+    # Lecture façon dictionnaire : les traitements qui reçoivent aussi des lignes
+    # de la base (indexation, catégorisation, miniatures) lisent video['id'] ou video.get(...)
+    def __getitem__(self, key: str) -> Any:
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in FIELDS else default
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Video):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'Video(id={self.id!r}, title={self.title!r})'
+
+
+class PlaylistContents:
+    """Vidéos d'une playlist lors d'une synchronisation, dans l'ordre de la playlist"""
+
+    __slots__ = ('playlist_id', 'entries', 'complete')
+
+    def __init__(self, playlist_id: str, entries: List[Tuple[str, Optional[str]]], complete: bool):
+        """
+        Args:
+            playlist_id: ID de la playlist
+            entries: (ID de vidéo, date d'ajout à la playlist) par position
+            complete: Toutes les pages ont été lues (sinon les absents ne sont pas des retraits)
+        """
+        self.playlist_id = playlist_id
+        self.entries = entries
+        self.complete = complete
+
+    @property
+    def video_ids(self) -> List[str]:
+        return [video_id for video_id, _ in self.entries]
+
+    def __repr__(self) -> str:
+        return f'PlaylistContents({self.playlist_id!r}, {len(self.entries)} vidéos, complete={self.complete})'
@@ -0,0 +1,71 @@
+"""
+Profilage à la demande - Exécution d'une requête sous cProfile
+Réservé aux administrateurs : activé par l'en-tête X-Profile ou le paramètre
+?profile=<jeton>, uniquement si ADMIN_TOKEN est configuré
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import time
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def check_admin_token(expected: Optional[str], candidate: Optional[str]) -> bool:
+    """Vérification d'un jeton administrateur en temps constant (refus si non configuré)"""
+    if not expected or not candidate:
+        return False
+    return hmac.compare_digest(candidate.encode(), expected.encode())
+
+
+class RequestProfiler:
+    """Profileur cProfile déclenché pour une seule requête"""
+
+    def __init__(self, output_dir: str = 'profiles', top_functions: int = 40):
+        """
+        Args:
+            output_dir: Dossier de stockage des fichiers .prof
+            top_functions: Nombre de fonctions listées dans le rapport texte
+        """
+        self.output_dir = output_dir
+        self.top_functions = top_functions
+
+    def start(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile: cProfile.Profile, label: str) -> str:
+        """
+        Arrête le profilage et stocke le résultat
+
+        Args:
+            profile: Profileur démarré par start()
+            label: Libellé de la requête (méthode et route)
+
+        Returns:
+            str: Chemin du fichier .prof (lisible avec pstats ou snakeviz)
+        """
+        profile.disable()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = re.sub(r'[^A-Za-z0-9_-]+', '_', label).strip('_')
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{os.getpid()}.prof"
+        path = os.path.join(self.output_dir, filename)
+        profile.dump_stats(path)
+
+        logger.info(f"Profil enregistré : {path}")
+        return path
+
+    def report(self, profile: cProfile.Profile, sort_by: str = 'cumulative') -> str:
+        """Rapport texte des fonctions les plus coûteuses"""
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.strip_dirs().sort_stats(sort_by).print_stats(self.top_functions)
+        return stream.getvalue()
@@ -0,0 +1,118 @@
+"""
+Progression de lecture (positions de reprise)
+Le lecteur envoie sa position toutes les quelques secondes : les positions
+sont gardées en mémoire (la dernière par vidéo) puis écrites en base par
+lots, en une transaction toutes les PROGRESS_FLUSH_INTERVAL secondes, au lieu
+d'un commit par signal.
+
+Seules les vidéos de la bibliothèque sont acceptées et la position est
+bornée à la durée de la vidéo (une lecture en base par vidéo et par lot).
+
+Le tampon est vidé à l'arrêt du processus (atexit, arrêt gracieux de
+gunicorn ou fin du lifespan ASGI) ; en cas d'échec d'écriture, les positions
+sont conservées pour le lot suivant.
+"""
+
+import atexit
+import threading
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    """Positions de lecture regroupées par vidéo et écrites périodiquement"""
+
+    def __init__(self, db, flush_interval: float = 5.0, watched_threshold: float = 0.9):
+        """
+        Args:
+            db: Base de données (Database)
+            flush_interval: Intervalle entre deux écritures groupées (secondes)
+            watched_threshold: Part de la durée au-delà de laquelle une vidéo est marquée vue
+        """
+        self.db = db
+        self.flush_interval = flush_interval
+        self.watched_threshold = watched_threshold
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._positions: Dict[str, int] = {}
+        self._durations: Dict[str, int] = {}
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def start(self):
+        """Démarre l'écriture périodique et le vidage à l'arrêt du processus"""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        self._flusher = threading.Thread(target=self._run, name='progress-flush', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def record(self, video_id: str, position: int) -> Optional[int]:
+        """
+        Position courante d'une vidéo (remplace la précédente, même en arrière)
+
+        Returns:
+            int: Position retenue (bornée à la durée), ou None si la vidéo est inconnue
+        """
+        with self._lock:
+            duration = self._durations.get(video_id)
+        if duration is None:
+            duration = self.db.get_video_duration(video_id)
+            if duration is None:
+                return None
+
+        if duration > 0:
+            position = min(position, duration)
+        with self._lock:
+            self._durations[video_id] = duration
+            self._positions[video_id] = position
+        # Tampon fermé (compte évincé du cache) : écriture immédiate
+        if self._stopped.is_set():
+            self.flush()
+        return position
+
+    def pending(self, video_id: str) -> Optional[int]:
+        """Position reçue mais pas encore écrite en base"""
+        with self._lock:
+            return self._positions.get(video_id)
+
+    def flush(self) -> int:
+        """
+        Écriture des positions en attente, en une transaction
+
+        Returns:
+            int: Nombre de vidéos mises à jour
+        """
+        with self._flush_lock:
+            with self._lock:
+                positions, self._positions = self._positions, {}
+                # Durées relues au lot suivant : le cache reste borné aux vidéos en lecture
+                self._durations = {}
+            if not positions:
+                return 0
+
+            try:
+                return self.db.save_watch_progress(positions, self.watched_threshold)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'écriture de {len(positions)} positions de lecture: {e}")
+                # Remises en attente, sauf si une position plus récente est arrivée entre-temps
+                with self._lock:
+                    for video_id, position in positions.items():
+                        self._positions.setdefault(video_id, position)
+                return 0
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Arrêt de l'écriture périodique et dernier vidage"""
+        self._stopped.set()
+        # Tampon d'un compte évincé : plus de référence gardée jusqu'à la fin du processus
+        atexit.unregister(self.close)
+        written = self.flush()
+        if written:
+            logger.info(f"Positions de lecture écrites à l'arrêt : {written}")
@@ -22,7 +22,7 @@ requests==2.31.0
 # === Développement et debugging ===
 python-dateutil==2.8.2
 
-# === Machine Learning (pour Version 3) ===
+# === Machine Learning : catégorisation automatique (optionnel) ===
 # scikit-learn==1.3.2
 # pandas==2.1.4
 # numpy==1.25.2
@@ -31,6 +31,21 @@ python-dateutil==2.8.2
 # gunicorn==21.2.0
 # waitress==2.1.2
 
+# === Optionnel : précompression brotli des assets du frontend ===
+# Brotli==1.1.0
+
+# === Optionnel : export / import Parquet et Arrow ===
+# pyarrow==14.0.1
+
+# === Optionnel : variantes réduites des miniatures ===
+# Pillow==10.1.0
+
+# === Optionnel : mode asynchrone (ASGI) ===
+# starlette==0.37.2
+# uvicorn[standard]==0.29.0
+# httpx[http2]==0.27.0
+# a2wsgi==1.10.4
+
 # === Sécurité ===
 cryptography==41.0.8
 
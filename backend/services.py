@@ -0,0 +1,290 @@
+"""
+Services de l'application - Initialisation paresseuse et sûre après fork
+Les services (base, flux de changements, client YouTube...) ne sont créés qu'au
+premier usage, dans le processus qui les utilise : un worker gunicorn issu d'un
+fork (preload) reconstruit les siens au lieu d'hériter de verrous du maître.
+
+Partitionnement par compte (ACCOUNT_SHARDS_DIR) : chaque compte a son propre
+fichier SQLite et ses propres services de données (base, flux de changements,
+index, planification...). Les conteneurs de comptes sont gardés dans un cache
+LRU borné (ACCOUNT_MAX_OPEN) ; les services sans état propre au compte (client
+YouTube, miniatures, limitations) restent partagés par le processus.
+"""
+
+import copy
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+import logging
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+# Services communs à tous les comptes (aucune donnée propre à un compte)
+SHARED_SERVICES = frozenset({'youtube_api', 'metadata', 'accounts', 'thumbnails', 'sync_flight', 'sync_gate', 'rate_limiter', 'profiler'})
+
+
+def shard_path(shards_dir: str, account_id: str) -> str:
+    """
+    Fichier SQLite d'un compte
+
+    Raises:
+        ValueError: Identifiant de compte invalide (utilisé comme nom de fichier)
+    """
+    if not ACCOUNT_ID_PATTERN.fullmatch(account_id or ''):
+        raise ValueError(f"Identifiant de compte invalide : {account_id!r}")
+    return os.path.join(shards_dir, f'{account_id}.db')
+
+
+class Services:
+    """Conteneur des services partagés par les requêtes d'un processus (ou d'un compte)"""
+
+    def __init__(self, config: Config, parent: Optional['Services'] = None, account_id: Optional[str] = None):
+        self.config = config
+        self.parent = parent
+        self.account_id = account_id
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        self._instances: Dict[str, object] = {}
+        self._accounts: 'OrderedDict[str, Services]' = OrderedDict()
+
+    def _check_fork(self):
+        # Après un fork, les instances (et leurs verrous) du parent sont abandonnées
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._lock = threading.RLock()
+            self._instances = {}
+            self._accounts = OrderedDict()
+
+    def _get(self, name: str, factory):
+        if self.parent is not None and name in SHARED_SERVICES:
+            return self.parent._get(name, factory)
+        self._check_fork()
+
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+                    logger.info(f"Service initialisé : {name} (pid {self._pid})")
+        return instance
+
+    @property
+    def partitioned(self) -> bool:
+        """Données séparées par compte (un fichier SQLite par compte)"""
+        return bool(self.config.ACCOUNT_SHARDS_DIR)
+
+    def for_account(self, account_id: Optional[str]) -> 'Services':
+        """
+        Services de données d'un compte
+
+        Sans partitionnement (ou sans compte), les services du processus eux-mêmes.
+        Le conteneur du compte le moins récemment utilisé est fermé au-delà de
+        ACCOUNT_MAX_OPEN comptes ouverts ; il sera recréé à sa prochaine requête.
+
+        Raises:
+            ValueError: Identifiant de compte invalide
+        """
+        if not self.partitioned or account_id is None:
+            return self
+        self._check_fork()
+
+        evicted = []
+        with self._lock:
+            account = self._accounts.get(account_id)
+            if account is not None:
+                self._accounts.move_to_end(account_id)
+                return account
+
+            account_config = copy.copy(self.config)
+            account_config.DATABASE_PATH = shard_path(self.config.ACCOUNT_SHARDS_DIR, account_id)
+            account = Services(account_config, parent=self, account_id=account_id)
+            self._accounts[account_id] = account
+            while len(self._accounts) > max(1, self.config.ACCOUNT_MAX_OPEN):
+                evicted.append(self._accounts.popitem(last=False)[1])
+
+        # Fermeture hors verrou : l'écriture des positions en attente peut prendre du temps
+        for old in evicted:
+            logger.info(f"Compte fermé (cache plein) : {old.account_id}")
+            old.close()
+        return account
+
+    def close(self):
+        """Écriture des données en attente des services ouverts (comptes compris)"""
+        with self._lock:
+            accounts, self._accounts = list(self._accounts.values()), OrderedDict()
+        for account in accounts:
+            account.close()
+
+        progress = self._instances.get('progress')
+        if progress is not None:
+            progress.close()
+        
+        # Thread d'apprentissage arrêté : il garderait le conteneur évincé (et sa base) en vie
+        categorizer = self._instances.get('categorizer')
+        if categorizer is not None:
+            categorizer.stop()
+
+        # Flux SSE terminés : les clients se reconnectent au conteneur qui remplacera celui-ci
+        change_feed = self._instances.get('change_feed')
+        if change_feed is not None:
+            change_feed.close()
+
+    @property
+    def change_feed(self):
+        from events import ChangeFeed
+        return self._get('change_feed', lambda: ChangeFeed(
+            lambda: self.db, self.config.CHANGE_FEED_MAX_EVENTS, self.config.CHANGE_FEED_POLL_INTERVAL
+        ))
+
+    @property
+    def db(self):
+        return self._get('db', self._create_database)
+
+    def _create_database(self):
+        from database import Database
+        if self.account_id is not None:
+            os.makedirs(os.path.dirname(self.config.DATABASE_PATH) or '.', exist_ok=True)
+        db = Database(
+            self.config.DATABASE_PATH,
+            change_feed=self.change_feed,
+            change_log_retention=self.config.CHANGE_LOG_RETENTION,
+            slow_query_threshold_ms=self.config.SLOW_QUERY_THRESHOLD_MS
+        )
+        # Création des tables idempotente : chaque processus s'assure du schéma
+        db.init_db()
+        return db
+
+    @property
+    def youtube_api(self):
+        # Import différé : la pile du client Google est coûteuse à charger
+        from metadata import DetailBatcher
+        from youtube_api import YouTubeAPI
+        return self._get('youtube_api', lambda: YouTubeAPI(self.config, details=DetailBatcher(self.metadata)))
+
+    @property
+    def metadata(self):
+        """Métadonnées des vidéos communes à tous les comptes (None si désactivées)"""
+        if self.config.METADATA_MAX_AGE_HOURS <= 0:
+            return None
+        return self._get('metadata', self._create_metadata_store)
+
+    def _create_metadata_store(self):
+        from metadata import MetadataStore
+        store = MetadataStore(self.config.METADATA_DATABASE_PATH, max_age=self.config.METADATA_MAX_AGE_HOURS * 3600)
+        store.init_db()
+        return store
+
+    @property
+    def accounts(self):
+        """Comptes enregistrés pour sync_cli.py (None si ACCOUNTS_FILE n'est pas configuré)"""
+        if not self.config.ACCOUNTS_FILE:
+            return None
+        from accounts import AccountStore
+        return self._get('accounts', lambda: AccountStore(self.config.ACCOUNTS_FILE))
+
+    @property
+    def thumbnails(self):
+        from thumbnails import ThumbnailCache
+        return self._get('thumbnails', lambda: ThumbnailCache(
+            self.config.THUMBNAIL_CACHE_DIR,
+            max_bytes=self.config.THUMBNAIL_CACHE_MAX_MB * 1024 * 1024,
+            prefetch_concurrency=self.config.THUMBNAIL_PREFETCH_CONCURRENCY
+        ))
+
+    @property
+    def similarity(self):
+        return self._get('similarity', self._create_similarity_index)
+
+    def _create_similarity_index(self):
+        from similarity import SimilarityIndex
+        index = SimilarityIndex(self.db)
+        index.init_schema()
+        # Vidéos antérieures à l'index : indexées en arrière-plan
+        index.start_backfill()
+        return index
+
+    @property
+    def categorizer(self):
+        from categorizer import AutoCategorizer
+        return self._get('categorizer', lambda: AutoCategorizer(
+            self.db,
+            min_labels=self.config.CATEGORIZER_MIN_LABELS,
+            min_confidence=self.config.CATEGORIZER_MIN_CONFIDENCE
+        ))
+
+    @property
+    def planner(self):
+        from planner import WatchPlanner, parse_category_weights
+        return self._get('planner', lambda: WatchPlanner(
+            self.db, parse_category_weights(self.config.PLAN_CATEGORY_WEIGHTS)
+        ))
+
+    @property
+    def facets(self):
+        from facets import FacetCounter
+        return self._get('facets', lambda: FacetCounter(self.db))
+
+    @property
+    def progress(self):
+        return self._get('progress', self._create_progress_buffer)
+
+    def _create_progress_buffer(self):
+        from progress import ProgressBuffer
+        buffer = ProgressBuffer(
+            self.db,
+            flush_interval=self.config.PROGRESS_FLUSH_INTERVAL,
+            watched_threshold=self.config.WATCHED_THRESHOLD
+        )
+        buffer.start()
+        return buffer
+
+    @property
+    def backups(self):
+        return self._get('backups', self._create_backup_manager)
+
+    def _create_backup_manager(self):
+        from backup import BackupManager
+        manager = BackupManager(
+            self.config.DATABASE_PATH,
+            self.config.BACKUP_DIR,
+            retention=self.config.BACKUP_RETENTION,
+            pages_per_step=self.config.BACKUP_PAGES_PER_STEP,
+            step_sleep=self.config.BACKUP_STEP_SLEEP_MS / 1000,
+            shards_dir=self.config.ACCOUNT_SHARDS_DIR or None
+        )
+        # Instantanés planifiés : chaque processus démarre la planification, un seul copie
+        manager.start_schedule(self.config.BACKUP_INTERVAL_HOURS * 3600)
+        return manager
+
+    @property
+    def sync_flight(self):
+        from throttling import SingleFlight
+        return self._get('sync_flight', SingleFlight)
+
+    @property
+    def sync_gate(self):
+        from throttling import MinIntervalGate
+        # État à côté de la base principale : commun aux workers de la machine
+        return self._get('sync_gate', lambda: MinIntervalGate(
+            self.config.SYNC_MIN_INTERVAL, state_dir=f'{self.config.DATABASE_PATH}.sync'
+        ))
+
+    @property
+    def rate_limiter(self):
+        from throttling import RateLimiter
+        return self._get('rate_limiter', lambda: RateLimiter(
+            self.config.RATE_LIMIT_REQUESTS, self.config.RATE_LIMIT_WINDOW
+        ))
+
+    @property
+    def profiler(self):
+        from profiling import RequestProfiler
+        return self._get('profiler', lambda: RequestProfiler(self.config.PROFILE_DIR))
@@ -0,0 +1,460 @@
+"""
+Index de similarité des vidéos (doublons, ré-uploads, miroirs, extraits)
+Chaque vidéo reçoit une signature MinHash de son titre et de sa description
+normalisés (PERMUTATIONS fonctions de hachage indépendantes (a·x + b) mod p,
+à graines fixes), indexée par LSH (bandes de la signature) dans SQLite : la
+recherche des vidéos proches ne parcourt que les vidéos partageant une bande,
+quelle que soit la taille de la bibliothèque.
+
+Deux vidéos au texte proche et de durée voisine (même tranche logarithmique,
+à une tranche près) sont des doublons et partagent un groupe (cluster_id) ;
+un texte proche avec une durée différente signale plutôt un extrait.
+L'index est mis à jour à chaque lot synchronisé ; une vidéo supprimée ou
+archivée (retirée de ses playlists) en est retirée et son groupe recalculé
+(elle reliait peut-être seule ses doublons), une vidéo réapparue y revient.
+"""
+
+import hashlib
+import re
+import struct
+import threading
+import unicodedata
+from math import log
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Taille des signatures (par champ : titre, description) et découpage en bandes
+PERMUTATIONS = 32
+ROWS_PER_BAND = 4
+BANDS = PERMUTATIONS // ROWS_PER_BAND
+
+# Valeur d'une signature vide (champ sans contenu exploitable)
+EMPTY = (1 << 64) - 1
+
+# Fonctions de hachage (a·x + b) mod p, une par composante, coefficients tirés de graines fixes
+# (p premier de Mersenne 2^61 - 1 : les valeurs restent distinctes de EMPTY)
+_PRIME = (1 << 61) - 1
+_COEFFICIENTS = [
+    (int.from_bytes(hashlib.blake2b(f'minhash-a-{i}'.encode(), digest_size=8).digest(), 'little') % (_PRIME - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f'minhash-b-{i}'.encode(), digest_size=8).digest(), 'little') % _PRIME)
+    for i in range(PERMUTATIONS)
+]
+
+# Version du calcul des signatures : les signatures d'une autre version sont recalculées
+SIGNATURE_VERSION = 2
+
+# Tranches de durée : facteur 1.15 entre deux tranches
+DURATION_BASE = 1.15
+
+# Seuils de similarité (estimation de Jaccard pondérée titre / description)
+DUPLICATE_THRESHOLD = 0.5
+SIMILAR_THRESHOLD = 0.3
+TITLE_WEIGHT = 0.6
+
+# Longueur de description prise en compte
+DESCRIPTION_CHARS = 1000
+
+# Mots sans valeur pour reconnaître un même contenu
+NOISE_WORDS = {
+    'official', 'officiel', 'video', 'vidéo', 'hd', '4k', '1080p', '720p', 'full', 'complete',
+    'reupload', 're', 'upload', 'mirror', 'new', 'nouveau', 'the', 'a', 'an', 'of', 'le', 'la',
+    'les', 'de', 'des', 'du', 'et', 'and', 'en', 'in', 'on', 'to'
+}
+
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+TIMESTAMP_PATTERN = re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?\b')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+DURATION_PATTERN = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+
+def normalize_words(text: str) -> List[str]:
+    """Mots normalisés : minuscules, sans accents, liens, horodatages ni mots de bruit"""
+    text = URL_PATTERN.sub(' ', text or '')
+    text = TIMESTAMP_PATTERN.sub(' ', text)
+    text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+    return [word for word in WORD_PATTERN.findall(text) if word not in NOISE_WORDS]
+
+
+def title_shingles(title: str) -> set:
+    words = normalize_words(title)
+    return set(words) | {f'{a} {b}' for a, b in zip(words, words[1:])}
+
+
+def description_shingles(description: str) -> set:
+    words = normalize_words((description or '')[:DESCRIPTION_CHARS])
+    return {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def minhash(shingles: set) -> List[int]:
+    """Signature MinHash (EMPTY pour un ensemble vide)"""
+    if not shingles:
+        return [EMPTY] * PERMUTATIONS
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'little') for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _COEFFICIENTS]
+
+
+def band_keys(signature: List[int]) -> List[Tuple[int, int]]:
+    """(numéro de bande, empreinte de la bande) pour les deux champs de la signature"""
+    keys = []
+    for field in range(2):
+        part = signature[field * PERMUTATIONS:(field + 1) * PERMUTATIONS]
+        if part[0] == EMPTY:
+            continue
+        for band in range(BANDS):
+            rows = part[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            digest = hashlib.blake2b(struct.pack(f'<{ROWS_PER_BAND}Q', *rows), digest_size=8).digest()
+            keys.append((field * BANDS + band, int.from_bytes(digest, 'little', signed=True)))
+    return keys
+
+
+def duration_bucket(duration: Optional[str]) -> Optional[int]:
+    """Tranche logarithmique d'une durée ISO 8601 (None si inconnue)"""
+    match = DURATION_PATTERN.fullmatch(duration or '')
+    if not match:
+        return None
+    hours, minutes, seconds = (int(value or 0) for value in match.groups())
+    total = hours * 3600 + minutes * 60 + seconds
+    return int(log(total, DURATION_BASE)) if total > 0 else None
+
+
+def similarity(a: List[int], b: List[int]) -> Tuple[float, float]:
+    """(score pondéré, similarité des titres) estimés à partir de deux signatures"""
+    def estimate(field: int) -> Optional[float]:
+        x = a[field * PERMUTATIONS:(field + 1) * PERMUTATIONS]
+        y = b[field * PERMUTATIONS:(field + 1) * PERMUTATIONS]
+        if x[0] == EMPTY or y[0] == EMPTY:
+            return None
+        return sum(1 for u, v in zip(x, y) if u == v) / PERMUTATIONS
+
+    title, description = estimate(0), estimate(1)
+    if title is None:
+        return description or 0.0, 0.0
+    if description is None:
+        return title, title
+    return TITLE_WEIGHT * title + (1 - TITLE_WEIGHT) * description, title
+
+
+def same_duration(a: Optional[int], b: Optional[int]) -> bool:
+    return a is not None and b is not None and abs(a - b) <= 1
+
+
+class SimilarityIndex:
+    """Index MinHash/LSH des vidéos, stocké dans la base principale"""
+
+    def __init__(self, db):
+        """
+        Args:
+            db: Base de données (Database)
+        """
+        self.db = db
+        self._lock = threading.Lock()  # Une mise à jour de l'index à la fois (fusions de groupes)
+
+    def init_schema(self):
+        with self.db.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS video_signatures (
+                    video_id TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    duration_bucket INTEGER,
+                    text_hash TEXT NOT NULL,
+                    cluster_id TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS video_lsh (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    video_id TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, video_id)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_video_lsh_video ON video_lsh(video_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_video_signatures_cluster ON video_signatures(cluster_id)')
+            conn.execute('CREATE TABLE IF NOT EXISTS similarity_meta (key TEXT PRIMARY KEY, value TEXT)')
+
+            # Signatures d'un autre calcul : incomparables, l'index est reconstruit (start_backfill)
+            row = conn.execute("SELECT value FROM similarity_meta WHERE key = 'signature_version'").fetchone()
+            if row is None or row['value'] != str(SIGNATURE_VERSION):
+                conn.execute('DELETE FROM video_signatures')
+                conn.execute('DELETE FROM video_lsh')
+                conn.execute("INSERT OR REPLACE INTO similarity_meta (key, value) VALUES ('signature_version', ?)",
+                             (str(SIGNATURE_VERSION),))
+
+    @staticmethod
+    def _text_hash(video: Dict) -> str:
+        content = f"{video.get('title') or ''}\0{(video.get('description') or '')[:DESCRIPTION_CHARS]}\0{video.get('duration') or ''}"
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _signature(video: Dict) -> List[int]:
+        return minhash(title_shingles(video.get('title'))) + minhash(description_shingles(video.get('description')))
+
+    def _candidates(self, conn, video_id: str, keys: List[Tuple[int, int]]) -> List:
+        """Vidéos partageant au moins une bande (accès par l'index de video_lsh)"""
+        if not keys:
+            return []
+        values = ','.join('(?, ?)' for _ in keys)
+        params = [value for key in keys for value in key]
+        # CROSS JOIN : les bandes de la vidéo pilotent la recherche dans la clé primaire de video_lsh
+        return conn.execute(f'''
+            WITH keys(band, bucket) AS (VALUES {values})
+            SELECT s.video_id, s.signature, s.duration_bucket, s.cluster_id
+            FROM video_signatures s
+            WHERE s.video_id IN (
+                SELECT l.video_id FROM keys k CROSS JOIN video_lsh l
+                WHERE l.band = k.band AND l.bucket = k.bucket
+            ) AND s.video_id != ?
+        ''', params + [video_id]).fetchall()
+
+    def index_videos(self, videos: Iterable[Dict]) -> int:
+        """
+        Mise à jour incrémentale de l'index pour un lot de vidéos
+
+        Seules les vidéos nouvelles ou dont le titre, la description ou la durée
+        ont changé sont recalculées ; les vidéos archivées (removed_at) sont ignorées.
+
+        Returns:
+            int: Nombre de vidéos (ré)indexées
+        """
+        videos = {video['id']: video for video in videos if not video.get('removed_at')}
+        if not videos:
+            return 0
+
+        try:
+            with self._lock:
+                with self.db.get_connection() as conn:
+                    ids = list(videos)
+                    known = {}
+                    for i in range(0, len(ids), 500):
+                        batch = ids[i:i + 500]
+                        placeholders = ','.join('?' * len(batch))
+                        known.update(conn.execute(
+                            f'SELECT video_id, text_hash FROM video_signatures WHERE video_id IN ({placeholders})', batch
+                        ).fetchall())
+
+                # Signatures calculées hors transaction : le verrou d'écriture n'est tenu que pour les mises à jour
+                changed = []
+                for video in videos.values():
+                    text_hash = self._text_hash(video)
+                    if known.get(video['id']) != text_hash:
+                        changed.append((video, text_hash, self._signature(video)))
+
+                with self.db.get_connection() as conn:
+                    for video, text_hash, signature in changed:
+                        self._index_one(conn, video, text_hash, signature)
+
+            return len(changed)
+
+        except Exception as e:
+            logger.error(f"Erreur lors de l'indexation de similarité de {len(videos)} vidéos: {e}")
+            return 0
+
+    def _index_one(self, conn, video: Dict, text_hash: str, signature: List[int]):
+        video_id = video['id']
+        bucket = duration_bucket(video.get('duration'))
+        keys = band_keys(signature)
+
+        # Doublons parmi les candidats LSH : fusion des groupes (identifiant le plus petit)
+        clusters = {video_id}
+        for row in self._candidates(conn, video_id, keys):
+            score, _ = similarity(signature, list(struct.unpack(f'<{2 * PERMUTATIONS}Q', row['signature'])))
+            if score >= DUPLICATE_THRESHOLD and same_duration(bucket, row['duration_bucket']):
+                clusters.add(row['cluster_id'])
+        cluster_id = min(clusters)
+
+        conn.execute('DELETE FROM video_lsh WHERE video_id = ?', (video_id,))
+        conn.executemany('INSERT OR IGNORE INTO video_lsh (band, bucket, video_id) VALUES (?, ?, ?)',
+                         [(band, band_hash, video_id) for band, band_hash in keys])
+        conn.execute('''
+            INSERT OR REPLACE INTO video_signatures (video_id, signature, duration_bucket, text_hash, cluster_id)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (video_id, struct.pack(f'<{2 * PERMUTATIONS}Q', *signature), bucket, text_hash, cluster_id))
+
+        merged = clusters - {cluster_id}
+        if merged:
+            placeholders = ','.join('?' * len(merged))
+            conn.execute(f'UPDATE video_signatures SET cluster_id = ? WHERE cluster_id IN ({placeholders})',
+                         [cluster_id, *merged])
+
+    def update_archived(self, archived: List[str], restored: List[str]):
+        """Vidéos archivées retirées de l'index, vidéos redevenues actives indexées à nouveau"""
+        for video_id in archived:
+            self.remove(video_id)
+        if restored:
+            self.index_videos(self.db.get_videos_by_ids(restored))
+
+    def remove(self, video_id: str) -> bool:
+        """
+        Retrait d'une vidéo de l'index et recalcul de son groupe de doublons
+
+        Les autres vidéos du groupe sont regroupées à nouveau selon leurs seules
+        similarités mutuelles : un groupe relié par la vidéo retirée se scinde.
+
+        Returns:
+            bool: True si la vidéo était indexée
+        """
+        try:
+            with self._lock:
+                with self.db.get_connection() as conn:
+                    row = conn.execute('SELECT cluster_id FROM video_signatures WHERE video_id = ?',
+                                       (video_id,)).fetchone()
+                    conn.execute('DELETE FROM video_lsh WHERE video_id = ?', (video_id,))
+                    conn.execute('DELETE FROM video_signatures WHERE video_id = ?', (video_id,))
+                    if row is None:
+                        return False
+                    self._recluster(conn, row['cluster_id'])
+            return True
+
+        except Exception as e:
+            logger.error(f"Erreur lors du retrait de la vidéo {video_id} de l'index de similarité: {e}")
+            return False
+
+    def _recluster(self, conn, cluster_id: str):
+        """Groupes recalculés (composantes connexes des doublons) parmi les membres d'un groupe"""
+        members = [(row['video_id'], list(struct.unpack(f'<{2 * PERMUTATIONS}Q', row['signature'])),
+                    row['duration_bucket'])
+                   for row in conn.execute('SELECT video_id, signature, duration_bucket FROM video_signatures '
+                                           'WHERE cluster_id = ?', (cluster_id,))]
+
+        # Union-find sur les paires de doublons (groupes de quelques vidéos)
+        parent = {member[0]: member[0] for member in members}
+
+        def find(video_id: str) -> str:
+            while parent[video_id] != video_id:
+                parent[video_id] = parent[parent[video_id]]
+                video_id = parent[video_id]
+            return video_id
+
+        for i, (a_id, a_signature, a_bucket) in enumerate(members):
+            for b_id, b_signature, b_bucket in members[i + 1:]:
+                score, _ = similarity(a_signature, b_signature)
+                if score >= DUPLICATE_THRESHOLD and same_duration(a_bucket, b_bucket):
+                    a_root, b_root = find(a_id), find(b_id)
+                    # Racine = identifiant le plus petit, comme lors des fusions de _index_one
+                    parent[max(a_root, b_root)] = min(a_root, b_root)
+
+        conn.executemany('UPDATE video_signatures SET cluster_id = ? WHERE video_id = ?',
+                         [(find(member_id), member_id) for member_id in parent])
+
+    def backfill(self, batch_size: int = 200) -> int:
+        """
+        Indexation des vidéos actives absentes de l'index (bases antérieures à l'index
+        ou à SIGNATURE_VERSION), retrait des vidéos archivées ou supprimées encore indexées
+        """
+        with self.db.get_connection() as conn:
+            stale = [row[0] for row in conn.execute('''
+                SELECT s.video_id FROM video_signatures s
+                LEFT JOIN videos v ON v.id = s.video_id
+                WHERE v.id IS NULL OR v.removed_at IS NOT NULL
+            ''')]
+        for video_id in stale:
+            self.remove(video_id)
+
+        total = 0
+        while True:
+            with self.db.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT v.id, v.title, v.description, v.duration
+                    FROM videos v
+                    LEFT JOIN video_signatures s ON s.video_id = v.id
+                    WHERE s.video_id IS NULL AND v.removed_at IS NULL
+                    LIMIT ?
+                ''', (batch_size,)).fetchall()
+            if not rows:
+                break
+            indexed = self.index_videos(dict(row) for row in rows)
+            if not indexed:
+                break
+            total += indexed
+
+        if total:
+            logger.info(f"Index de similarité : {total} vidéos existantes indexées")
+        return total
+
+    def start_backfill(self):
+        threading.Thread(target=self.backfill, name='similarity-backfill', daemon=True).start()
+
+    def similar(self, video_id: str, limit: int = 20) -> Optional[List[Dict]]:
+        """
+        Vidéos proches d'une vidéo, de la plus similaire à la moins similaire
+
+        Returns:
+            List[Dict]: Vidéos avec score, similarité des titres et indicateur de doublon,
+            ou None si la vidéo n'est pas indexée
+        """
+        try:
+            with self.db.get_connection() as conn:
+                row = conn.execute('SELECT signature, duration_bucket FROM video_signatures WHERE video_id = ?',
+                                   (video_id,)).fetchone()
+                if row is None:
+                    return None
+
+                signature = list(struct.unpack(f'<{2 * PERMUTATIONS}Q', row['signature']))
+                bucket = row['duration_bucket']
+
+                scored = []
+                for candidate in self._candidates(conn, video_id, band_keys(signature)):
+                    other = list(struct.unpack(f'<{2 * PERMUTATIONS}Q', candidate['signature']))
+                    score, title_score = similarity(signature, other)
+                    if score >= SIMILAR_THRESHOLD:
+                        duration_match = same_duration(bucket, candidate['duration_bucket'])
+                        scored.append((candidate['video_id'], score, title_score, duration_match))
+
+                scored.sort(key=lambda item: item[1], reverse=True)
+                scored = scored[:limit]
+                if not scored:
+                    return []
+
+                placeholders = ','.join('?' * len(scored))
+                videos = {row['id']: dict(row) for row in conn.execute(f'''
+                    SELECT id, title, channel_title, channel_id, duration, thumbnail_url, category, watched
+                    FROM videos WHERE id IN ({placeholders}) AND removed_at IS NULL
+                ''', [item[0] for item in scored])}
+
+            results = []
+            for other_id, score, title_score, duration_match in scored:
+                video = videos.get(other_id)
+                if video is None:  # Vidéo supprimée ou archivée depuis son indexation
+                    continue
+                video.update({
+                    'score': round(score, 3),
+                    'title_similarity': round(title_score, 3),
+                    'same_duration': duration_match,
+                    'duplicate': duration_match and score >= DUPLICATE_THRESHOLD
+                })
+                results.append(video)
+            return results
+
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche des vidéos similaires à {video_id}: {e}")
+            return []
+
+    def collapse(self, videos: List[Dict]) -> List[Dict]:
+        """
+        Regroupement des doublons d'une liste de vidéos : seule la première vidéo
+        de chaque groupe est conservée, avec le nombre de doublons masqués
+        """
+        with self.db.get_connection() as conn:
+            # Seuls les groupes de plusieurs vidéos sont chargés
+            clusters = dict(conn.execute('''
+                SELECT video_id, cluster_id FROM video_signatures
+                WHERE cluster_id IN (
+                    SELECT cluster_id FROM video_signatures GROUP BY cluster_id HAVING COUNT(*) > 1
+                )
+            ''').fetchall())
+
+        kept: Dict[str, Dict] = {}
+        result = []
+        for video in videos:
+            cluster_id = clusters.get(video['id'])
+            if cluster_id is None:
+                result.append(video)
+            elif cluster_id in kept:
+                kept[cluster_id]['duplicate_count'] += 1
+            else:
+                video = dict(video, duplicate_count=0)
+                kept[cluster_id] = video
+                result.append(video)
+        return result
@@ -0,0 +1,93 @@
+"""
+Synchronisation d'un compte (mode threads), indépendante de Flask
+Utilisée par l'application (route /videos/sync) et par la synchronisation
+sans navigateur (sync_cli.py) : récupération des playlists, enregistrement
+par lots, appartenances et retraits, catégorisation puis miniatures.
+
+Chaque synchronisation est tracée (pages, lots de détails, transactions) ;
+son temps par étape est enregistré dans sync_history.
+"""
+
+from typing import Dict, List
+import logging
+
+from events import SYNC_PROGRESS
+import metrics
+from tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Taille des lots enregistrés pendant la synchronisation (une progression publiée par lot)
+SYNC_SAVE_BATCH = 500
+
+
+def run_sync(account, access_token: str, playlist_ids: List[str]) -> Dict:
+    """
+    Synchronisation des playlists d'un compte
+
+    Args:
+        account: Services du compte (Services.for_account)
+        access_token: Jeton OAuth valide du compte
+        playlist_ids: Playlists à synchroniser
+    """
+    with TRACER.trace('sync', playlists=','.join(playlist_ids)) as trace:
+        try:
+            result = sync_stages(account, access_token, playlist_ids)
+        except Exception as e:
+            account.db.log_sync(0, 0, str(e), trace.duration_ms, trace.stage_timings())
+            raise
+        account.db.log_sync(result['total_videos'], result['new_videos'], None,
+                            trace.duration_ms, trace.stage_timings())
+        trace.set_attribute('videos', result['total_videos'])
+    return result
+
+
+def sync_stages(account, access_token: str, playlist_ids: List[str]) -> Dict:
+    """Étapes de la synchronisation, chacune dans son span"""
+    change_feed = account.change_feed
+    db = account.db
+    change_feed.publish(SYNC_PROGRESS, {'stage': 'started', 'playlists': playlist_ids})
+
+    # Récupération des vidéos des playlists (détails demandés une fois par vidéo)
+    with TRACER.span('youtube.fetch'):
+        videos, playlists = account.youtube_api.get_playlist_videos(access_token, playlist_ids)
+    change_feed.publish(SYNC_PROGRESS, {'stage': 'fetched', 'total': len(videos)})
+
+    # Sauvegarde en base de données, par lots (une transaction par lot)
+    saved_count = 0
+    for start in range(0, len(videos), SYNC_SAVE_BATCH):
+        batch = videos[start:start + SYNC_SAVE_BATCH]
+        saved_count += db.save_videos(batch)
+        with TRACER.span('similarity.index', videos=len(batch)):
+            account.similarity.index_videos(batch)
+        change_feed.publish(SYNC_PROGRESS, {
+            'stage': 'saving', 'processed': start + len(batch), 'total': len(videos)
+        })
+
+    # Appartenances aux playlists et archivage des vidéos retirées
+    reconciliation = db.save_playlist_contents(playlists, account.config.SYNC_REMOVAL_MAX_FRACTION)
+    account.similarity.update_archived(reconciliation['archived_ids'], reconciliation['restored_ids'])
+
+    logger.info(f"Synchronisation terminée: {saved_count} nouvelles vidéos")
+
+    # Suggestions de catégorie calculées en arrière-plan, sans retarder la réponse
+    account.categorizer.categorize(videos)
+
+    # Miniatures téléchargées en arrière-plan, sans retarder la réponse
+    account.thumbnails.prefetch(videos)
+
+    metrics.SYNC_VIDEOS.observe(len(videos))
+    metrics.SYNC_NEW_VIDEOS.inc(saved_count)
+    change_feed.publish(SYNC_PROGRESS, {
+        'stage': 'completed',
+        'total': len(videos),
+        'new_videos': saved_count
+    })
+
+    return {
+        'message': 'Synchronisation réussie',
+        'total_videos': len(videos),
+        'new_videos': saved_count,
+        'removed_videos': reconciliation['archived'],
+        'playlists': {playlist.playlist_id: len(playlist.entries) for playlist in playlists}
+    }
@@ -0,0 +1,285 @@
+"""
+Synchronisation sans navigateur des comptes enregistrés (cron, traitements par lots)
+Les comptes sont ceux d'ACCOUNTS_FILE, enregistrés à la connexion ou avec
+la commande add. Chaque compte est synchronisé dans un processus du pool
+(base du compte, erreurs isolées) ; le plafond de
+quota est commun à tous les processus : un compte qui le dépasse échoue et
+les suivants ne sont pas lancés. Sans partitionnement (ACCOUNT_SHARDS_DIR),
+un seul compte peut être synchronisé : la base unique serait partagée.
+
+Le rapport d'exécution (JSON) est écrit sur la sortie standard ou dans
+--report ; le code de sortie vaut 0 si tous les comptes ont été
+synchronisés, 1 sinon (échec partiel), 2 en cas d'erreur d'utilisation.
+
+    python sync_cli.py list
+    python sync_cli.py run
+    python sync_cli.py run --accounts UCaaa,UCbbb --workers 4 --quota-cap 5000 --report run.json
+    python sync_cli.py add UCaaa --refresh-token 1//0g... --playlists WL,PLxxxx
+    python sync_cli.py remove UCaaa
+
+Seuls des modules légers sont importés au démarrage : la pile du client
+Google, SQLite et l'indexation ne sont chargés que par les processus de
+synchronisation.
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+from accounts import AccountStore
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# État propre à chaque processus du pool (initialisé par _init_worker)
+_quota_used = None
+_quota_cap = 0
+_services = None
+
+
+def _init_worker(quota_used, quota_cap: int):
+    global _quota_used, _quota_cap
+    _quota_used = quota_used
+    _quota_cap = quota_cap
+
+
+def _consume_quota(cost: int):
+    """Décompte d'un appel sur le plafond commun (lève QuotaExceeded au-delà)"""
+    from youtube_api import QuotaExceeded
+    with _quota_used.get_lock():
+        if _quota_used.value + cost > _quota_cap:
+            raise QuotaExceeded(f"Plafond de quota atteint ({_quota_cap} unités)")
+        _quota_used.value += cost
+
+
+def refresh_access_token(config: Config, refresh_token: str) -> str:
+    """Jeton d'accès obtenu depuis le refresh token enregistré"""
+    import requests
+    response = requests.post(config.GOOGLE_TOKEN_URL, data=config.get_refresh_token_params(refresh_token), timeout=30)
+    response.raise_for_status()
+    return response.json()['access_token']
+
+
+def sync_account(account_id: str, account: Dict, playlists: Optional[str]) -> Dict:
+    """
+    Synchronisation d'un compte, exécutée dans un processus du pool
+
+    Returns:
+        Dict: Entrée du rapport (status : ok, failed, quota_exceeded ou skipped)
+    """
+    global _services
+    start = time.perf_counter()
+    report = {'account_id': account_id, 'status': 'failed', 'quota_used': 0}
+    quota_used = 0
+
+    def consume(cost: int):
+        nonlocal quota_used
+        _consume_quota(cost)
+        quota_used += cost
+
+    try:
+        if _quota_used.value >= _quota_cap:
+            report['status'] = 'skipped'
+            report['error'] = 'Plafond de quota atteint avant le début de la synchronisation'
+            return report
+
+        from models import parse_playlist_ids
+        from services import Services
+        import sync
+        import tracing
+
+        if _services is None:
+            config = Config()
+            tracing.configure(config.TRACE_FILE, config.TRACE_FORMAT)
+            _services = Services(config)
+        config = _services.config
+
+        playlist_ids = parse_playlist_ids(playlists or ','.join(account.get('playlists') or []) or config.SYNC_PLAYLISTS)
+        access_token = refresh_access_token(config, account['refresh_token'])
+
+        account_services = _services.for_account(account_id)
+        account_services.youtube_api.quota = consume
+        try:
+            result = sync.run_sync(account_services, access_token, playlist_ids)
+        finally:
+            account_services.youtube_api.quota = None
+            account_services.close()
+            # Miniatures préchargées avant que le processus ne passe au compte suivant
+            account_services.thumbnails.wait(timeout=60)
+
+        report.update(
+            status='ok',
+            total_videos=result['total_videos'],
+            new_videos=result['new_videos'],
+            removed_videos=result['removed_videos'],
+            playlists=result['playlists']
+        )
+
+    except Exception as e:
+        # youtube_api n'est peut-être pas importé (erreur antérieure au premier appel)
+        quota_exceeded = getattr(sys.modules.get('youtube_api'), 'QuotaExceeded', ())
+        report['status'] = 'quota_exceeded' if isinstance(e, quota_exceeded) else 'failed'
+        report['error'] = f"{type(e).__name__}: {e}"
+        logger.error(f"Erreur lors de la synchronisation du compte {account_id}: {e}")
+
+    finally:
+        report['quota_used'] = quota_used
+        report['duration_s'] = round(time.perf_counter() - start, 3)
+
+    return report
+
+
+def run(accounts: Dict[str, Dict], workers: int, quota_cap: int, playlists: Optional[str] = None,
+        partitioned: bool = False) -> Dict:
+    """
+    Synchronisation des comptes dans un pool de processus
+
+    Args:
+        partitioned: Une base par compte (ACCOUNT_SHARDS_DIR configuré)
+
+    Returns:
+        Dict: Rapport d'exécution (une entrée par compte, dans l'ordre demandé)
+
+    Raises:
+        ValueError: Plusieurs comptes sans partitionnement (base unique partagée : les
+            playlists lues d'un compte archiveraient les vidéos des autres)
+    """
+    if len(accounts) > 1 and not partitioned:
+        raise ValueError(f"{len(accounts)} comptes à synchroniser : ACCOUNT_SHARDS_DIR doit être configuré "
+                         "(une base par compte) pour en synchroniser plus d'un")
+
+    started_at = datetime.now().isoformat()
+    start = time.perf_counter()
+    quota_used = multiprocessing.Value('l', 0)
+    reports: Dict[str, Dict] = {}
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(accounts) or 1)),
+                             initializer=_init_worker, initargs=(quota_used, quota_cap)) as executor:
+        futures = {
+            account_id: executor.submit(sync_account, account_id, account, playlists)
+            for account_id, account in accounts.items()
+        }
+        for account_id, future in futures.items():
+            try:
+                reports[account_id] = future.result()
+            except BrokenProcessPool as e:
+                # Processus arrêté brutalement : les comptes concernés sont en échec, pas les autres rapports
+                reports[account_id] = {'account_id': account_id, 'status': 'failed', 'error': f"BrokenProcessPool: {e}"}
+
+    entries = [reports[account_id] for account_id in accounts]
+    statuses = [entry['status'] for entry in entries]
+    return {
+        'started_at': started_at,
+        'finished_at': datetime.now().isoformat(),
+        'duration_s': round(time.perf_counter() - start, 3),
+        'workers': workers,
+        'quota_cap': quota_cap,
+        'quota_used': quota_used.value,
+        'accounts': entries,
+        'summary': {status: statuses.count(status) for status in sorted(set(statuses))},
+        'success': all(status == 'ok' for status in statuses)
+    }
+
+
+def select_accounts(stored: Dict[str, Dict], requested: Optional[str]) -> Dict[str, Dict]:
+    """
+    Comptes à synchroniser (tous par défaut)
+
+    Raises:
+        ValueError: Compte demandé non enregistré
+    """
+    if not requested:
+        return stored
+    account_ids: List[str] = list(dict.fromkeys(part.strip() for part in requested.split(',') if part.strip()))
+    unknown = [account_id for account_id in account_ids if account_id not in stored]
+    if unknown:
+        raise ValueError(f"Comptes non enregistrés : {', '.join(unknown)}")
+    return {account_id: stored[account_id] for account_id in account_ids}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synchronisation sans navigateur des comptes enregistrés')
+    parser.add_argument('--accounts-file', help='Fichier des comptes (ACCOUNTS_FILE par défaut)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Synchronise les comptes enregistrés')
+    run_parser.add_argument('--accounts', help='Comptes à synchroniser, séparés par des virgules (tous par défaut)')
+    run_parser.add_argument('--playlists', help='Playlists à synchroniser (celles du compte, SYNC_PLAYLISTS à défaut)')
+    run_parser.add_argument('--workers', type=int, help='Processus en parallèle (SYNC_CLI_WORKERS par défaut)')
+    run_parser.add_argument('--quota-cap', type=int, help='Plafond de quota de l\'exécution (SYNC_QUOTA_CAP par défaut)')
+    run_parser.add_argument('--report', help='Fichier du rapport JSON (sortie standard par défaut)')
+
+    subparsers.add_parser('list', help='Liste les comptes enregistrés')
+    add_parser = subparsers.add_parser('add', help='Enregistre un compte')
+    add_parser.add_argument('account_id')
+    add_parser.add_argument('--refresh-token', required=True)
+    add_parser.add_argument('--playlists', help='Playlists du compte, séparées par des virgules')
+    remove_parser = subparsers.add_parser('remove', help='Supprime un compte enregistré')
+    remove_parser.add_argument('account_id')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    config = Config()
+    accounts_file = args.accounts_file or config.ACCOUNTS_FILE
+    if not accounts_file:
+        parser.error('ACCOUNTS_FILE non configuré (ou --accounts-file)')
+    store = AccountStore(accounts_file)
+
+    if args.command == 'list':
+        for account_id, account in store.load().items():
+            print(f"{account_id}  {','.join(account.get('playlists') or []) or '-':30s}  {account.get('updated_at', '')}")
+        raise SystemExit(0)
+
+    if args.command == 'add':
+        from models import parse_playlist_ids
+        from services import ACCOUNT_ID_PATTERN
+        if not ACCOUNT_ID_PATTERN.fullmatch(args.account_id):
+            parser.error(f"Identifiant de compte invalide : {args.account_id}")
+        try:
+            playlists = parse_playlist_ids(args.playlists) if args.playlists else None
+        except ValueError as e:
+            parser.error(str(e))
+        store.remember(args.account_id, args.refresh_token, playlists)
+        raise SystemExit(0)
+
+    if args.command == 'remove':
+        raise SystemExit(0 if store.forget(args.account_id) else 1)
+
+    try:
+        accounts = select_accounts(store.load(), args.accounts)
+    except ValueError as e:
+        parser.error(str(e))
+    if not accounts:
+        parser.error(f"Aucun compte enregistré dans {accounts_file}")
+
+    try:
+        report = run(
+            accounts,
+            workers=args.workers or config.SYNC_CLI_WORKERS,
+            quota_cap=args.quota_cap if args.quota_cap is not None else config.SYNC_QUOTA_CAP,
+            playlists=args.playlists,
+            partitioned=bool(config.ACCOUNT_SHARDS_DIR)
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    raise SystemExit(0 if report['success'] else 1)
+
+
+if __name__ == '__main__':
+    main()
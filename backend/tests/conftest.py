@@ -0,0 +1,39 @@
+"""
+Configuration commune des tests : modules du backend importables et base
+SQLite temporaire
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config exige des identifiants OAuth, sans usage dans les tests
+os.environ.setdefault('GOOGLE_CLIENT_ID', 'test-client-id')
+os.environ.setdefault('GOOGLE_CLIENT_SECRET', 'test-client-secret')
+
+from database import Database  # noqa: E402
+
+
+def make_video(index: int, **fields) -> dict:
+    """Vidéo minimale de la playlist (champs surchargeables)"""
+    video = {
+        'id': f'vid{index:05d}',
+        'title': f'Vidéo numéro {index}',
+        'channel_title': 'Chaîne',
+        'channel_id': 'UC_test',
+        'duration': 'PT10M',
+        'published_at': '2024-01-01T00:00:00Z',
+        'added_to_playlist_at': '2024-01-02T00:00:00Z',
+    }
+    video.update(fields)
+    return video
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(str(tmp_path / 'test.db'))
+    database.init_db()
+    return database
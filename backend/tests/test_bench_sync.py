@@ -0,0 +1,56 @@
+"""Benchmark de synchronisation : transport rejoué et scénario de bout en bout"""
+
+import json
+import logging
+
+import pytest
+
+from benchmarks.bench_sync import FakeYouTubeServer, available_modes, percentile, run_scenario, synthetic_fixtures
+
+
+@pytest.fixture
+def scenario_env(tmp_path, monkeypatch):
+    # run_scenario modifie l'environnement et les journaux du processus : rétablis après le test
+    for name in ('DATABASE_PATH', 'THUMBNAIL_CACHE_DIR', 'METADATA_DATABASE_PATH'):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_fake_server_paginates_playlist_items():
+    server = FakeYouTubeServer(synthetic_fixtures(120), latency=0)
+
+    status, body = server.respond('https://www.googleapis.com/youtube/v3/playlistItems?maxResults=50')
+    first = json.loads(body)
+    assert status == 200 and len(first['items']) == 50 and first['nextPageToken'] == '50'
+
+    _, body = server.respond('https://www.googleapis.com/youtube/v3/playlistItems?maxResults=50&pageToken=100')
+    last = json.loads(body)
+    assert len(last['items']) == 20 and 'nextPageToken' not in last
+    assert server.calls == {'playlistItems': 2}
+
+
+def test_fake_server_returns_only_known_videos():
+    fixtures = synthetic_fixtures(3)
+    server = FakeYouTubeServer(fixtures, latency=0)
+    known = fixtures['videos'][0]['id']
+
+    _, body = server.respond(f'https://www.googleapis.com/youtube/v3/videos?id={known},inconnue')
+    assert [video['id'] for video in json.loads(body)['items']] == [known]
+    assert server.respond('https://www.googleapis.com/youtube/v3/channels')[0] == 404
+
+
+def test_percentile_bounds():
+    values = [3.0, 1.0, 2.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 0.5) in (2.0, 3.0)
+    assert percentile(values, 0.99) == 4.0
+
+
+@pytest.mark.parametrize('mode', available_modes(['threaded', 'async']))
+def test_scenario_batches_api_calls(mode, scenario_env):
+    result = run_scenario(mode, 120, latency_ms=0, runs=1, fixtures_path=None)
+
+    # 50 éléments par page de playlistItems, 50 IDs par appel à videos.list
+    assert result['videos'] == 120
+    assert result['api_calls_by_resource'] == {'playlistItems': 3.0, 'videos': 3.0}
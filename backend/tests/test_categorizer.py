@@ -0,0 +1,71 @@
+"""Catégorisation automatique : suggestions, réécritures évitées et réévaluation ciblée"""
+
+import pytest
+
+from categorizer import CONFIDENCE_TOLERANCE, AutoCategorizer, video_document
+from conftest import make_video
+
+
+def test_video_document_repeats_title_and_tags_channel():
+    document = video_document({'title': 'Cours Python', 'tags': ['data science'], 'channel_id': 'UC1'})
+    assert document.count('Cours Python') == 2
+    assert 'data_science' in document and 'chaine_UC1' in document
+
+
+@pytest.mark.parametrize('video, category, confidence, expected', [
+    # Vidéo synchronisée : suggestion précédente inconnue
+    ({'id': 'a'}, 'tech', 0.8, True),
+    ({'suggested_category': 'tech', 'suggestion_confidence': 0.8}, 'tech', 0.8 + CONFIDENCE_TOLERANCE / 2, False),
+    ({'suggested_category': 'tech', 'suggestion_confidence': 0.8}, 'tech', 0.8 + CONFIDENCE_TOLERANCE, True),
+    ({'suggested_category': 'tech', 'suggestion_confidence': 0.8}, 'food', 0.8, True),
+    ({'suggested_category': None, 'suggestion_confidence': None}, None, None, False),
+    ({'suggested_category': 'tech', 'suggestion_confidence': 0.8}, None, None, True),
+])
+def test_changed_skips_equivalent_suggestions(video, category, confidence, expected):
+    assert AutoCategorizer._changed(video, category, confidence) is expected
+
+
+@pytest.fixture
+def labelled_db(db):
+    pytest.importorskip('sklearn')
+    videos = []
+    for i in range(12):
+        videos.append(make_video(i, title=f'Tutoriel python programmation {i}', channel_id='UC_code'))
+        videos.append(make_video(100 + i, title=f'Recette cuisine gâteau {i}', channel_id='UC_food'))
+    videos.append(make_video(500, title='Tutoriel python avancé', channel_id='UC_code'))
+    videos.append(make_video(501, title='Recette cuisine tarte', channel_id='UC_food'))
+    db.save_videos(videos)
+    for i in range(12):
+        db.update_video_category(f'vid{i:05d}', 'tech')
+        db.update_video_category(f'vid{100 + i:05d}', 'food')
+    return db
+
+
+def test_retrain_waits_for_enough_labels(db):
+    pytest.importorskip('sklearn')
+    db.save_videos([make_video(1)])
+    db.update_video_category('vid00001', 'tech')
+    assert AutoCategorizer(db, min_labels=20).retrain() is False
+
+
+def test_suggestions_are_written_once(labelled_db):
+    categorizer = AutoCategorizer(labelled_db, min_labels=10, min_confidence=0.5)
+    assert categorizer.retrain()
+
+    assert categorizer.suggest_uncategorized() == 2
+    assert labelled_db.get_video_by_id('vid00500')['suggested_category'] == 'tech'
+    assert labelled_db.get_video_by_id('vid00501')['suggested_category'] == 'food'
+
+    # Réévaluation sans changement du modèle : aucune écriture, journal inchangé
+    version = labelled_db.get_data_version()
+    assert categorizer.suggest_uncategorized() == 0
+    assert labelled_db.get_data_version() == version
+
+
+def test_partial_fit_rescores_only_related_videos(labelled_db):
+    categorizer = AutoCategorizer(labelled_db, min_labels=10)
+    assert categorizer.retrain()
+    labelled_db.save_videos([make_video(600, title='Documentaire montagne', channel_id='UC_other')])
+
+    related = categorizer._related_uncategorized([labelled_db.get_video_by_id('vid00000')])
+    assert {video['id'] for video in related} == {'vid00500'}
@@ -0,0 +1,59 @@
+"""Ingestion groupée et journal des changements (/videos/changes)"""
+
+from conftest import make_video
+
+
+def test_save_videos_counts_new_and_journals_each_video(db):
+    assert db.save_videos([make_video(i) for i in range(3)]) == 3
+    assert db.save_videos([make_video(1, title='Renommée'), make_video(3)]) == 1
+
+    changes = db.get_changes(0)
+    assert not changes['full_resync']
+    assert [change['id'] for change in changes['changes']] == ['vid00000', 'vid00002', 'vid00001', 'vid00003']
+    assert changes['next_since'] == 5
+    assert db.get_video_by_id('vid00001')['title'] == 'Renommée'
+
+
+def test_save_videos_duplicate_in_batch_updates_inserted_row(db):
+    assert db.save_videos([make_video(1), make_video(1, title='Doublon')]) == 1
+    assert db.get_video_by_id('vid00001')['title'] == 'Doublon'
+
+
+def test_get_changes_reports_deletions_as_tombstones(db):
+    db.save_videos([make_video(1), make_video(2)])
+    since = db.get_data_version()
+    db.delete_video('vid00001')
+
+    changes = db.get_changes(since)
+    assert changes['changes'] == [{'id': 'vid00001', 'deleted': True}]
+
+
+def test_get_changes_paginates_with_has_more(db):
+    db.save_videos([make_video(i) for i in range(5)])
+
+    first = db.get_changes(0, limit=2)
+    assert first['has_more'] and first['next_since'] == 2
+    rest = db.get_changes(first['next_since'], limit=10)
+    assert not rest['has_more'] and len(rest['changes']) == 3
+
+
+def test_get_changes_full_resync_boundaries(tmp_path):
+    from database import Database
+
+    db = Database(str(tmp_path / 'retention.db'), change_log_retention=10)
+    db.init_db()
+    # La purge a lieu tous les 500 numéros : seules les entrées 491 à 500 restent
+    db.save_videos([make_video(i) for i in range(500)])
+    last_seq = db.get_data_version()
+    assert last_seq == 500
+
+    # Curseur juste au bord du journal conservé : reprise possible
+    assert not db.get_changes(490)['full_resync']
+    # Une entrée manquante : resynchronisation complète
+    below = db.get_changes(489)
+    assert below['full_resync'] and below['next_since'] == last_seq
+    # Curseur à jour : rien à envoyer
+    current = db.get_changes(last_seq)
+    assert not current['full_resync'] and current['changes'] == []
+    # Curseur d'une autre base (postérieur au dernier numéro)
+    assert db.get_changes(last_seq + 1)['full_resync']
@@ -0,0 +1,104 @@
+"""Comptes par facette : calcul en un passage et cache par version des données"""
+
+import pytest
+
+from conftest import make_video
+from facets import FacetCounter, count_facets, duration_bucket, parse_filters
+from models import PlaylistContents
+
+
+def group(category, watched, channel, duration, count):
+    return {'category': category, 'watched': watched, 'channel_id': channel, 'channel_title': channel.upper(),
+            'duration_bucket': duration, 'count': count}
+
+
+GROUPS = [
+    group('dev', False, 'c1', 'short', 3),
+    group('dev', True, 'c1', 'long', 2),
+    group('music', False, 'c2', 'short', 4),
+    group('music', True, 'c2', 'medium', 1),
+]
+
+
+def facet(result, name):
+    return {entry['value']: entry['count'] for entry in result['facets'][name]}
+
+
+def test_duration_bucket_bounds():
+    assert duration_bucket('PT3M59S') == 'short'
+    assert duration_bucket('PT4M') == 'medium'
+    assert duration_bucket('PT20M') == 'long'
+    assert duration_bucket('PT0S') == 'unknown'
+
+
+def test_parse_filters_validates_values():
+    filters = parse_filters({'category': 'all', 'watched': 'false', 'duration': 'short'})
+    assert filters['category'] is None and filters['watched'] is False and filters['duration'] == 'short'
+    with pytest.raises(ValueError):
+        parse_filters({'watched': 'oui'})
+    with pytest.raises(ValueError):
+        parse_filters({'duration': 'epic'})
+
+
+def test_counts_without_filters():
+    result = count_facets(GROUPS, parse_filters({}))
+    assert result['total'] == 10
+    assert facet(result, 'category') == {'music': 5, 'dev': 5}
+    assert facet(result, 'watched') == {False: 7, True: 3}
+    assert facet(result, 'duration') == {'short': 7, 'medium': 1, 'long': 2, 'unknown': 0}
+    assert result['facets']['channel'][0]['label'] in ('C1', 'C2')
+
+
+def test_own_filter_is_not_applied_to_its_facet():
+    result = count_facets(GROUPS, parse_filters({'category': 'dev', 'watched': 'false'}))
+
+    assert result['total'] == 3
+    # Catégorie : filtrée par watched seulement ; watched : filtrée par catégorie seulement
+    assert facet(result, 'category') == {'dev': 3, 'music': 4}
+    assert facet(result, 'watched') == {False: 3, True: 2}
+    assert facet(result, 'channel') == {'c1': 3}
+    assert facet(result, 'duration')['short'] == 3
+
+
+def test_channel_limit_keeps_most_represented():
+    groups = GROUPS + [group('music', False, 'c2', 'long', 1), group('music', False, 'c3', 'short', 1)]
+    result = count_facets(groups, parse_filters({}), channel_limit=2)
+    assert [entry['value'] for entry in result['facets']['channel']] == ['c2', 'c1']
+
+
+def test_counter_follows_data_changes(db):
+    db.save_videos([make_video(i, duration='PT2M') for i in range(3)])
+    db.save_playlist_contents([PlaylistContents('WL', [('vid00000', None)], complete=True)])
+    counter = FacetCounter(db)
+    in_playlist = parse_filters({'playlist': 'PL_music'})
+
+    assert counter.counts(parse_filters({}))['total'] == 3
+    assert counter.counts(in_playlist)['total'] == 0
+
+    db.update_video_watched('vid00001', True)
+    assert facet(counter.counts(parse_filters({})), 'watched') == {False: 2, True: 1}
+
+    # Ajout à une playlist sans modifier la vidéo : la version change quand même
+    db.save_playlist_contents([PlaylistContents('PL_music', [('vid00002', None)], complete=True)])
+    assert counter.counts(in_playlist)['total'] == 1
+
+
+def test_counter_reuses_cached_result_for_same_version(db, monkeypatch):
+    db.save_videos([make_video(1)])
+    counter = FacetCounter(db)
+    first = counter.counts(parse_filters({}))
+
+    monkeypatch.setattr(db, 'get_facet_groups', lambda *args: pytest.fail('groupes relus'))
+    assert counter.counts(parse_filters({})) is first
+
+
+def test_failed_read_raises_and_is_not_cached(db, monkeypatch):
+    db.save_videos([make_video(1)])
+    counter = FacetCounter(db)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(db, 'get_facet_groups', lambda *args: None)
+        with pytest.raises(RuntimeError):
+            counter.counts(parse_filters({}))
+
+    assert counter.counts(parse_filters({}))['total'] == 1
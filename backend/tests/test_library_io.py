@@ -0,0 +1,75 @@
+"""Export et import de la bibliothèque : aller-retour sans perte, par formats"""
+
+import io
+
+import pytest
+
+import library_io
+from conftest import make_video
+from database import Database
+from models import PlaylistContents
+
+FORMATS = ['ndjson'] + (['parquet', 'arrow'] if library_io.arrow_available() else [])
+
+# Colonnes restituées par un aller-retour (les suggestions sont recalculées après import)
+USER_COLUMNS = ('id', 'title', 'duration', 'tags', 'channel_id', 'category', 'watched', 'watch_time', 'removed_at')
+
+
+def snapshot(db):
+    with db.get_connection() as conn:
+        videos = [tuple(row) for row in conn.execute(f"SELECT {', '.join(USER_COLUMNS)} FROM videos ORDER BY id")]
+        memberships = [tuple(row) for row in conn.execute(
+            'SELECT playlist_id, video_id, position, added_at FROM video_playlists ORDER BY playlist_id, video_id'
+        )]
+    return videos, memberships
+
+
+@pytest.fixture
+def library(db):
+    db.save_videos([make_video(i, tags=['tag a', f'tag {i}']) for i in range(7)])
+    db.save_playlist_contents([
+        PlaylistContents('WL', [(f'vid{i:05d}', f'2024-03-0{i + 1}T00:00:00Z') for i in range(5)], complete=True),
+        PlaylistContents('PL_music', [('vid00001', None), ('vid00005', '2024-04-01T00:00:00Z')], complete=True),
+    ])
+    db.update_video_category('vid00002', 'tech')
+    db.update_video_watched('vid00003', True)
+    db.save_watch_progress({'vid00004': 120}, watched_threshold=0.9)
+    with db.get_connection() as conn:
+        conn.execute("UPDATE videos SET removed_at = '2024-05-01T00:00:00' WHERE id = 'vid00006'")
+    return db
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_round_trip_restores_library(library, tmp_path, fmt):
+    exported = b''.join(library_io.export_chunks(library, fmt, chunk_size=3))
+
+    target = Database(str(tmp_path / 'import.db'))
+    target.init_db()
+    result = library_io.import_batches(target, library_io.read_batches(io.BytesIO(exported), fmt, batch_size=4))
+
+    assert result == {'total_videos': 7, 'saved_videos': 7, 'new_videos': 7}
+    assert snapshot(target) == snapshot(library)
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_reimport_replaces_memberships_and_keeps_archive(library, fmt):
+    exported = b''.join(library_io.export_chunks(library, fmt))
+    before = snapshot(library)
+    library.save_playlist_contents([PlaylistContents('PL_other', [('vid00000', None)], complete=True)])
+
+    result = library_io.import_batches(library, library_io.read_batches(io.BytesIO(exported), fmt))
+
+    assert result['new_videos'] == 0 and result['saved_videos'] == 7
+    assert snapshot(library) == before
+
+
+def test_import_reports_rows_without_id_and_legacy_exports(db):
+    batches = [[make_video(1, category='tech'), {'title': 'sans identifiant'}]]
+    assert library_io.import_batches(db, batches) == {'total_videos': 1, 'saved_videos': 1, 'new_videos': 1}
+    assert db.get_video_by_id('vid00001')['category'] == 'tech'
+
+
+def test_detect_format_from_extension():
+    assert library_io.detect_format('export.PARQUET') == 'parquet'
+    assert library_io.detect_format('export.arrows') == 'arrow'
+    assert library_io.detect_format('export.txt') == 'ndjson'
@@ -0,0 +1,115 @@
+"""Planification du visionnage : respect du budget et optimalité du sac à dos"""
+
+import itertools
+import random
+
+import pytest
+
+from planner import WatchPlanner, parse_category_weights, parse_iso_duration
+
+
+class FakeDatabase:
+    """Candidates fixes, version des données contrôlée par le test"""
+
+    def __init__(self, videos):
+        self.videos = videos
+        self.version = 1
+        self.reads = 0
+
+    def get_data_version(self):
+        return self.version
+
+    def get_plan_candidates(self):
+        self.reads += 1
+        return self.videos
+
+
+def candidate(index, seconds, category='uncategorized', watched=False, channel='UC1',
+              added='2024-01-01T00:00:00Z'):
+    minutes, rest = divmod(seconds, 60)
+    return {'id': f'v{index}', 'duration': f'PT{minutes}M{rest}S', 'category': category, 'watched': watched,
+            'channel_id': channel, 'added_to_playlist_at': added}
+
+
+def random_videos(count, seed, max_seconds=3600):
+    rng = random.Random(seed)
+    return [
+        candidate(i, rng.randint(30, max_seconds), category=rng.choice(['tech', 'food', 'music']),
+                  channel=f'UC{rng.randint(1, 5)}', added=f'2024-{rng.randint(1, 12):02d}-01T00:00:00Z')
+        for i in range(count)
+    ]
+
+
+def test_parse_helpers():
+    assert parse_iso_duration('PT1H2M3S') == 3723
+    assert parse_iso_duration('P1D') == 0
+    assert parse_category_weights('tech:2, food:0.5,bad') == {'tech': 2.0, 'food': 0.5}
+
+
+@pytest.mark.parametrize('minutes', [1, 7, 45, 480, 1000, 1440])
+def test_plan_never_exceeds_budget(minutes):
+    planner = WatchPlanner(FakeDatabase(random_videos(400, seed=minutes)))
+    plan = planner.plan(minutes)
+
+    assert plan['total_seconds'] <= minutes * 60
+    assert plan['total_seconds'] == sum(video['duration_seconds'] for video in plan['videos'])
+    assert len({video['id'] for video in plan['videos']}) == len(plan['videos'])
+
+
+def test_plan_matches_brute_force_on_small_library():
+    videos = random_videos(12, seed=7, max_seconds=1200)
+    planner = WatchPlanner(FakeDatabase(videos))
+    plan = planner.plan(40)
+
+    # Le sac à dos est exact sur les durées arrondies à la minute supérieure, le temps
+    # laissé libre par l'arrondi est comblé ensuite : entre ces deux optimums
+    candidates = planner._get_snapshot().candidates
+    rounded_best = exact_best = 0.0
+    for size in range(len(candidates) + 1):
+        for subset in itertools.combinations(candidates, size):
+            priority = sum(priority for _, _, _, priority in subset)
+            if sum(-(-seconds // 60) for _, seconds, _, _ in subset) <= 40:
+                rounded_best = max(rounded_best, priority)
+            if sum(seconds for _, seconds, _, _ in subset) <= 40 * 60:
+                exact_best = max(exact_best, priority)
+    assert rounded_best - 1e-3 <= plan['total_priority'] <= exact_best + 1e-3
+
+
+def test_large_budget_fills_time_left_by_rounding():
+    # Unité de 3 minutes pour 1000 minutes : 95 s comptent pour 3 minutes dans le sac à dos
+    videos = [candidate(i, 95) for i in range(700)]
+    plan = WatchPlanner(FakeDatabase(videos)).plan(1000)
+
+    assert len(plan['videos']) == 1000 * 60 // 95
+    assert 1000 * 60 - plan['total_seconds'] < 95
+
+
+def test_watched_zero_weight_and_oversized_videos_are_skipped():
+    videos = [
+        candidate(1, 600, watched=True),
+        candidate(2, 600, category='food'),
+        candidate(3, 7200),
+        candidate(4, 600, category='tech'),
+    ]
+    plan = WatchPlanner(FakeDatabase(videos), category_weights={'food': 0}).plan(60)
+    assert [video['id'] for video in plan['videos']] == ['v4']
+    assert plan['candidates'] == 3
+
+
+def test_category_weight_changes_choice():
+    videos = [candidate(1, 1800, category='tech'), candidate(2, 1800, category='food')]
+    planner = WatchPlanner(FakeDatabase(videos))
+    assert [video['id'] for video in planner.plan(30, {'food': 3})['videos']] == ['v2']
+    assert [video['id'] for video in planner.plan(30, {'tech': 3})['videos']] == ['v1']
+
+
+def test_candidates_are_rebuilt_only_for_a_new_data_version():
+    db = FakeDatabase(random_videos(20, seed=1))
+    planner = WatchPlanner(db)
+    planner.plan(60)
+    planner.plan(90)
+    assert db.reads == 1
+
+    db.version += 1
+    planner.plan(60)
+    assert db.reads == 2
@@ -0,0 +1,94 @@
+"""Détection des vidéos retirées des playlists et garde-fous contre les retraits massifs"""
+
+import pytest
+
+from conftest import make_video
+from database import REMOVAL_ALWAYS_ALLOWED
+from models import PlaylistContents
+
+
+def ids(count, start=0):
+    return [f'vid{i:05d}' for i in range(start, start + count)]
+
+
+def playlist(video_ids, playlist_id='WL', complete=True):
+    return PlaylistContents(playlist_id, [(video_id, None) for video_id in video_ids], complete)
+
+
+@pytest.fixture
+def synced(db):
+    """Playlist WL de 100 vidéos déjà synchronisée"""
+    db.save_videos([make_video(i) for i in range(100)])
+    db.save_playlist_contents([playlist(ids(100))])
+    return db
+
+
+def active_ids(db, **filters):
+    return {video['id'] for video in db.get_videos(**filters)}
+
+
+def test_removed_video_is_archived_not_deleted(synced):
+    result = synced.save_playlist_contents([playlist(ids(99, start=1))])
+
+    assert result['archived'] == 1 and result['archived_ids'] == ['vid00000']
+    assert 'vid00000' not in active_ids(synced)
+    assert active_ids(synced, removed=True) == {'vid00000'}
+    assert synced.get_video_by_id('vid00000')['removed_at']
+
+
+def test_archived_video_comes_back_when_it_reappears(synced):
+    synced.save_playlist_contents([playlist(ids(99, start=1))])
+    result = synced.save_playlist_contents([playlist(ids(100))])
+
+    assert result['restored_ids'] == ['vid00000'] and result['archived'] == 0
+    assert active_ids(synced, removed=True) == set()
+
+
+def test_incomplete_read_removes_nothing(synced):
+    result = synced.save_playlist_contents([playlist(ids(50), complete=False)])
+    assert result['archived'] == 0 and result['skipped_playlists'] == []
+    assert len(active_ids(synced)) == 100
+
+
+def test_empty_read_is_never_reconciled(synced):
+    result = synced.save_playlist_contents([playlist([])])
+    assert result['skipped_playlists'] == ['WL'] and result['archived'] == 0
+
+
+@pytest.mark.parametrize('removed, fraction, skipped', [
+    (50, 0.5, False),   # Exactement la moitié : autorisé
+    (51, 0.5, True),    # Au-delà de la moitié : ignoré
+    (51, 0.6, False),
+])
+def test_removal_fraction_threshold(synced, removed, fraction, skipped):
+    result = synced.save_playlist_contents([playlist(ids(100 - removed, start=removed))],
+                                           max_removal_fraction=fraction)
+    assert (result['skipped_playlists'] == ['WL']) is skipped
+    assert result['archived'] == (0 if skipped else removed)
+
+
+def test_small_playlists_always_allow_a_few_removals(db):
+    db.save_videos([make_video(i) for i in range(30)])
+    db.save_playlist_contents([playlist(ids(30))])
+
+    # 20 retraits sur 30 dépassent la moitié mais restent sous REMOVAL_ALWAYS_ALLOWED
+    result = db.save_playlist_contents([playlist(ids(30 - REMOVAL_ALWAYS_ALLOWED, start=REMOVAL_ALWAYS_ALLOWED))])
+    assert result['archived'] == REMOVAL_ALWAYS_ALLOWED
+
+
+def test_video_kept_by_another_playlist_stays_active(synced):
+    synced.save_playlist_contents([playlist(['vid00000'], playlist_id='PL_music')])
+    result = synced.save_playlist_contents([playlist(ids(99, start=1))])
+
+    assert result['archived'] == 0
+    assert 'vid00000' in active_ids(synced)
+    assert {video['id'] for video in synced.get_videos(playlist='WL')} == set(ids(99, start=1))
+
+
+def test_membership_changes_are_journaled(synced):
+    version = synced.get_data_version()
+    synced.save_playlist_contents([playlist(ids(100))])
+    assert synced.get_data_version() == version  # Rien n'a changé
+
+    synced.save_playlist_contents([playlist(['vid00001'], playlist_id='PL_music')])
+    assert synced.get_data_version() == version + 1
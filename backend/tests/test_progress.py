@@ -0,0 +1,78 @@
+"""Positions de lecture : tampon, bornes et passage à "vue" journalisé"""
+
+import sqlite3
+
+from conftest import make_video
+from progress import ProgressBuffer
+
+
+def test_record_clamps_to_duration_and_rejects_unknown_videos(db):
+    db.save_videos([make_video(1, duration='PT10M')])
+    buffer = ProgressBuffer(db)
+
+    assert buffer.record('vid00001', 9999) == 600
+    assert buffer.record('inconnue', 10) is None
+    assert buffer.pending('vid00001') == 600
+    assert buffer.pending('inconnue') is None
+
+
+def test_flush_writes_last_position_in_one_batch(db):
+    db.save_videos([make_video(1), make_video(2)])
+    buffer = ProgressBuffer(db, watched_threshold=0.9)
+    buffer.record('vid00001', 30)
+    buffer.record('vid00001', 45)
+    buffer.record('vid00002', 60)
+
+    assert buffer.flush() == 2
+    assert buffer.pending('vid00001') is None
+    assert db.get_video_by_id('vid00001')['watch_time'] == 45
+    assert buffer.flush() == 0
+
+
+def test_only_watched_transition_is_journaled(db):
+    db.save_videos([make_video(1, duration='PT10M')])
+    buffer = ProgressBuffer(db, watched_threshold=0.9)
+    version = db.get_data_version()
+
+    buffer.record('vid00001', 100)
+    buffer.flush()
+    assert db.get_data_version() == version
+    assert not db.get_video_by_id('vid00001')['watched']
+
+    buffer.record('vid00001', 550)
+    buffer.flush()
+    assert db.get_data_version() == version + 1
+    assert db.get_video_by_id('vid00001')['watched']
+
+    # Revoir le début ne remet pas la vidéo à voir
+    buffer.record('vid00001', 10)
+    buffer.flush()
+    assert db.get_video_by_id('vid00001')['watched']
+    assert db.get_data_version() == version + 1
+
+
+def test_failed_flush_keeps_positions_for_next_batch(db, monkeypatch):
+    db.save_videos([make_video(1)])
+    buffer = ProgressBuffer(db)
+    buffer.record('vid00001', 42)
+
+    def locked(*args):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(db, 'save_watch_progress', locked)
+    assert buffer.flush() == 0
+    assert buffer.pending('vid00001') == 42
+
+    monkeypatch.undo()
+    assert buffer.flush() == 1
+    assert db.get_video_by_id('vid00001')['watch_time'] == 42
+
+
+def test_closed_buffer_writes_immediately(db):
+    db.save_videos([make_video(1)])
+    buffer = ProgressBuffer(db)
+    buffer.close()
+
+    buffer.record('vid00001', 12)
+    assert buffer.pending('vid00001') is None
+    assert db.get_video_by_id('vid00001')['watch_time'] == 12
@@ -0,0 +1,93 @@
+"""Index de similarité : estimation MinHash, rappel LSH et tenue de l'index"""
+
+import statistics
+
+import pytest
+
+from conftest import make_video
+from similarity import EMPTY, PERMUTATIONS, SimilarityIndex, band_keys, minhash, normalize_words, similarity
+
+
+def pair_with_jaccard(pair: int, common: int, own: int):
+    """Deux ensembles de similarité de Jaccard common / (common + 2 * own)"""
+    shared = {f'p{pair}-c{i}' for i in range(common)}
+    return shared | {f'p{pair}-a{i}' for i in range(own)}, shared | {f'p{pair}-b{i}' for i in range(own)}
+
+
+def title_signature(shingles: set):
+    return minhash(shingles) + [EMPTY] * PERMUTATIONS
+
+
+def test_normalize_words_drops_noise_links_and_accents():
+    assert normalize_words('Vidéo OFFICIELLE 4K - Été https://x.y/z 12:34') == ['officielle', 'ete']
+
+
+def test_minhash_of_empty_set_is_empty():
+    assert minhash(set()) == [EMPTY] * PERMUTATIONS
+    assert band_keys([EMPTY] * (2 * PERMUTATIONS)) == []
+
+
+@pytest.mark.parametrize('common, own, expected', [(80, 10, 0.8), (50, 25, 0.5), (20, 40, 0.2)])
+def test_minhash_estimates_jaccard_without_bias(common, own, expected):
+    estimates = []
+    for pair in range(60):
+        a, b = pair_with_jaccard(pair, common, own)
+        score, _ = similarity(title_signature(a), title_signature(b))
+        estimates.append(score)
+
+    # Écart type d'une estimation ≈ 0.07 à 0.09 : la moyenne de 60 paires reste à ±0.04
+    assert statistics.mean(estimates) == pytest.approx(expected, abs=0.04)
+
+
+def test_lsh_bands_find_near_duplicates_and_ignore_distant_pairs():
+    def collides(a, b):
+        return bool(set(band_keys(title_signature(a))) & set(band_keys(title_signature(b))))
+
+    close = sum(collides(*pair_with_jaccard(pair, 80, 10)) for pair in range(100))
+    distant = sum(collides(*pair_with_jaccard(pair, 20, 40)) for pair in range(100))
+
+    # 8 bandes de 4 lignes : probabilité de collision ≈ 0.98 pour J = 0.8, ≈ 0.01 pour J = 0.2
+    assert close >= 90
+    assert distant <= 10
+
+
+@pytest.fixture
+def index(db):
+    similarity_index = SimilarityIndex(db)
+    similarity_index.init_schema()
+    title = 'Conférence complète sur les bases de données relationnelles et les index'
+    description = 'Dans cette conférence nous étudions les arbres B, les plans de requête et les jointures'
+    db.save_videos([
+        make_video(1, title=title, description=description, duration='PT45M'),
+        make_video(2, title=f'{title} (reupload)', description=description, duration='PT45M10S'),
+        make_video(3, title='Recette du pain au levain maison', description='Farine, eau et sel', duration='PT8M'),
+    ])
+    similarity_index.index_videos(db.get_videos_by_ids(['vid00001', 'vid00002', 'vid00003']))
+    return similarity_index
+
+
+def test_reupload_is_reported_as_duplicate(index):
+    similar = index.similar('vid00001')
+    assert [video['id'] for video in similar] == ['vid00002']
+    assert similar[0]['duplicate']
+
+    collapsed = index.collapse([{'id': 'vid00001'}, {'id': 'vid00002'}, {'id': 'vid00003'}])
+    assert [(video['id'], video.get('duplicate_count')) for video in collapsed] == [
+        ('vid00001', 1), ('vid00003', None)
+    ]
+
+
+def test_archived_video_leaves_index_until_restored(index):
+    index.update_archived(['vid00002'], [])
+    assert index.similar('vid00001') == []
+    assert index.similar('vid00002') is None
+
+    index.update_archived([], ['vid00002'])
+    assert [video['id'] for video in index.similar('vid00001')] == ['vid00002']
+
+
+def test_removal_splits_cluster_linked_by_removed_video(index):
+    assert index.remove('vid00001')
+    assert not index.remove('vid00001')
+    # vid00002 reste seul de son groupe : plus rien à regrouper
+    assert index.collapse([{'id': 'vid00002'}, {'id': 'vid00003'}]) == [{'id': 'vid00002'}, {'id': 'vid00003'}]
@@ -0,0 +1,250 @@
+"""
+Limitation des opérations coûteuses
+- SingleFlight : les appels concurrents pour une même clé partagent un seul
+  calcul en cours (le premier arrivé l'exécute, les suivants attendent son résultat)
+- MinIntervalGate : intervalle minimal entre deux exécutions pour une même clé,
+  et exécution exclusive de la clé (partagés entre processus avec state_dir)
+- RateLimiter : seau à jetons par clé (session, endpoint)
+
+SingleFlight et RateLimiter sont en mémoire, propres à chaque processus : avec
+plusieurs workers, la limite d'une session vaut limit × workers. MinIntervalGate
+peut garder son état dans des fichiers verrouillés (state_dir), communs aux
+workers d'une même machine.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows : un seul processus (waitress), état en mémoire
+    fcntl = None
+
+# Délai proposé quand la clé est déjà en cours d'exécution dans un autre processus (secondes)
+BUSY_RETRY_AFTER = 5
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Déduplication des appels concurrents par clé (threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Exécute fn une seule fois pour tous les appels concurrents de même clé
+
+        Returns:
+            Tuple[Any, bool]: (résultat, True si le résultat vient d'un autre appel)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """Déduplication des appels concurrents par clé (coroutines, même boucle d'événements)"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        future = self._calls.get(key)
+        if future is not None:
+            # shield : l'annulation d'un suiveur ne doit pas annuler le meneur
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            # Exception récupérée ici pour éviter l'avertissement si aucun suiveur n'attend
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+
+class Throttled(Exception):
+    """Exécution refusée : à retenter dans retry_after secondes"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Réessayer dans {retry_after} s")
+        self.retry_after = retry_after
+
+
+class MinIntervalGate:
+    """
+    Intervalle minimal entre deux exécutions pour une même clé
+
+    Avec state_dir, l'heure de la dernière exécution est écrite dans un fichier
+    par clé, verrouillé (flock) pendant l'exécution : deux workers ne
+    synchronisent jamais le même compte en même temps, et l'intervalle vaut
+    pour tous les processus. Sans state_dir (ou sans fcntl), l'état est en mémoire.
+    """
+
+    def __init__(self, min_interval: float, state_dir: Optional[str] = None):
+        """
+        Args:
+            min_interval: Intervalle minimal entre deux exécutions (secondes)
+            state_dir: Dossier des fichiers d'état partagés entre processus
+        """
+        self.min_interval = min_interval
+        self.state_dir = state_dir if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._last_run: Dict[Hashable, float] = {}
+        self._running: Set[Hashable] = set()
+
+        if self.state_dir:
+            os.makedirs(self.state_dir, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        return os.path.join(self.state_dir, hashlib.sha1(repr(key).encode('utf-8')).hexdigest())
+
+    def _last(self, key: Hashable) -> Optional[float]:
+        if not self.state_dir:
+            return self._last_run.get(key)
+        try:
+            with open(self._path(key)) as f:
+                content = f.read().strip()
+            return float(content) if content else None
+        except (OSError, ValueError):
+            return None
+
+    def retry_after(self, key: Hashable) -> int:
+        """Secondes à attendre avant la prochaine exécution autorisée (0 si autorisée)"""
+        last_run = self._last(key)
+        if last_run is None:
+            return 0
+        now = time.time() if self.state_dir else time.monotonic()
+        remaining = self.min_interval - (now - last_run)
+        return math.ceil(remaining) if remaining > 0 else 0
+
+    def mark(self, key: Hashable):
+        """Enregistre une exécution pour la clé"""
+        if self.state_dir:
+            with open(self._path(key), 'a+') as f:
+                f.seek(0)
+                f.truncate()
+                f.write(repr(time.time()))
+            return
+        with self._lock:
+            self._last_run[key] = time.monotonic()
+
+    @contextmanager
+    def run(self, key: Hashable) -> Iterator[None]:
+        """
+        Section critique d'une exécution : vérification de l'intervalle, exécution
+        exclusive de la clé, puis enregistrement (seulement si l'exécution réussit)
+
+        Raises:
+            Throttled: Clé en cours d'exécution ailleurs, ou intervalle minimal non écoulé
+        """
+        lock_file = None
+        if self.state_dir:
+            lock_file = open(self._path(key), 'a+')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise Throttled(BUSY_RETRY_AFTER)
+        else:
+            with self._lock:
+                if key in self._running:
+                    raise Throttled(BUSY_RETRY_AFTER)
+                self._running.add(key)
+
+        try:
+            retry_after = self.retry_after(key)
+            if retry_after:
+                raise Throttled(retry_after)
+            yield
+            self.mark(key)
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # Libère le verrou
+            else:
+                with self._lock:
+                    self._running.discard(key)
+
+
+class RateLimiter:
+    """Seau à jetons par clé : limit requêtes par fenêtre de window secondes, en rafale possible"""
+
+    def __init__(self, limit: int, window: float, max_keys: int = 10000):
+        self.capacity = float(limit)
+        self.refill_rate = limit / window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}  # clé -> (jetons, horodatage)
+
+    def acquire(self, key: Hashable) -> int:
+        """
+        Consomme un jeton pour la clé
+
+        Returns:
+            int: 0 si la requête est autorisée, sinon le nombre de secondes à attendre
+        """
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0
+
+            self._buckets[key] = (tokens, now)
+            return math.ceil((1 - tokens) / self.refill_rate)
+
+    def _prune(self, now: float):
+        """Oubli des seaux redevenus pleins (sessions inactives)"""
+        full_after = self.capacity / self.refill_rate
+        self._buckets = {
+            key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+            if now - updated < full_after
+        }
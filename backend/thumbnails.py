@@ -0,0 +1,345 @@
+"""
+Cache local des miniatures
+Les miniatures sont téléchargées en arrière-plan pendant la synchronisation
+(concurrence bornée), stockées sur disque par empreinte de contenu (SHA-256)
+et évincées par ordre d'accès (LRU) au-delà d'une taille maximale.
+
+Les vidéos renvoyées par l'API portent l'URL versionnée de leur miniature
+(/thumbs/<id>?v=<empreinte de l'original>, voir with_urls) : le navigateur la
+garde sans limite de durée et change d'URL quand la miniature change.
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+import requests
+
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Largeurs proposées pour les variantes réduites (borne le nombre de fichiers)
+VARIANT_WIDTHS = (120, 160, 240, 320)
+
+# Miniature publique de YouTube, utilisée quand l'URL n'est pas connue
+FALLBACK_URL = 'https://i.ytimg.com/vi/{video_id}/mqdefault.jpg'
+
+# Intervalle minimal entre deux mises à jour de la date d'accès d'un fichier
+ACCESS_UPDATE_INTERVAL = 3600
+
+# Route servant les miniatures (app.get_thumbnail)
+THUMBNAIL_ROUTE = '/thumbs/{video_id}'
+
+
+class ThumbnailCache:
+    """Cache disque des miniatures, adressé par contenu, avec éviction LRU"""
+
+    def __init__(self, cache_dir: str = 'thumbnails', max_bytes: int = 500 * 1024 * 1024,
+                 prefetch_concurrency: int = 8, timeout: float = 10.0):
+        """
+        Args:
+            cache_dir: Dossier des fichiers et de l'index
+            max_bytes: Taille maximale du cache sur disque
+            prefetch_concurrency: Téléchargements simultanés pendant la synchronisation
+            timeout: Délai maximal d'un téléchargement en secondes
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_concurrency, thread_name_prefix='thumbs')
+        self._http = requests.Session()
+        self._lock = threading.Lock()
+        self._pending = set()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, 'index.db')
+        self._init_index()
+        self._total_bytes = self._compute_total_bytes()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_index(self):
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS thumbnails (
+                    video_id TEXT NOT NULL,
+                    width INTEGER NOT NULL DEFAULT 0,  -- 0 = original
+                    digest TEXT NOT NULL,
+                    source_url TEXT,
+                    PRIMARY KEY (video_id, width)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs(last_access)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_thumbnails_digest ON thumbnails(digest)')
+
+    def _compute_total_bytes(self) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f'{digest}.jpg')
+
+    def _store(self, video_id: str, width: int, content: bytes, source_url: Optional[str]) -> str:
+        """Écriture d'un contenu (une seule copie par empreinte) et association à la vidéo"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)  # Écriture atomique
+
+            with self._connect() as conn:
+                inserted = conn.execute('''
+                    INSERT OR IGNORE INTO blobs (digest, size, last_access) VALUES (?, ?, ?)
+                ''', (digest, len(content), time.time())).rowcount
+                if width == 0:
+                    # Nouvel original : les variantes réduites de l'ancien sont obsolètes
+                    conn.execute('DELETE FROM thumbnails WHERE video_id = ? AND width != 0', (video_id,))
+                conn.execute('''
+                    INSERT OR REPLACE INTO thumbnails (video_id, width, digest, source_url)
+                    VALUES (?, ?, ?, ?)
+                ''', (video_id, width, digest, source_url))
+
+            if inserted:
+                self._total_bytes += len(content)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+
+        return digest
+
+    def _evict(self):
+        """Suppression des contenus les moins récemment servis jusqu'à 90 % de la taille maximale"""
+        target = int(self.max_bytes * 0.9)
+        with self._connect() as conn:
+            # Total relu en base : l'index est partagé par tous les workers
+            self._total_bytes = conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            rows = conn.execute('SELECT digest, size FROM blobs ORDER BY last_access').fetchall()
+            evicted = []
+            for row in rows:
+                if self._total_bytes <= target:
+                    break
+                evicted.append(row['digest'])
+                self._total_bytes -= row['size']
+
+            conn.executemany('DELETE FROM blobs WHERE digest = ?', [(d,) for d in evicted])
+            conn.executemany('DELETE FROM thumbnails WHERE digest = ?', [(d,) for d in evicted])
+
+        for digest in evicted:
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+
+        logger.info(f"Cache des miniatures : {len(evicted)} fichiers évincés")
+
+    def _lookup(self, video_id: str, width: int) -> Optional[Tuple[str, Optional[str]]]:
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT t.digest, t.source_url, b.last_access
+                FROM thumbnails t JOIN blobs b ON b.digest = t.digest
+                WHERE t.video_id = ? AND t.width = ?
+            ''', (video_id, width)).fetchone()
+
+            if row is None:
+                return None
+
+            now = time.time()
+            if now - row['last_access'] > ACCESS_UPDATE_INTERVAL:
+                conn.execute('UPDATE blobs SET last_access = ? WHERE digest = ?', (now, row['digest']))
+
+        return row['digest'], row['source_url']
+
+    def _forget(self, digest: str):
+        """Retrait de l'index d'un contenu dont le fichier a disparu (évincé par un autre processus)"""
+        with self._lock:
+            with self._connect() as conn:
+                row = conn.execute('SELECT size FROM blobs WHERE digest = ?', (digest,)).fetchone()
+                conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+                conn.execute('DELETE FROM thumbnails WHERE digest = ?', (digest,))
+            if row is not None:
+                self._total_bytes -= row['size']
+
+    def versions(self, video_ids: List[str]) -> Dict[str, str]:
+        """Empreinte de l'original en cache, par ID de vidéo (vidéos sans miniature en cache absentes)"""
+        versions = {}
+        with self._connect() as conn:
+            for i in range(0, len(video_ids), 500):
+                batch = video_ids[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                versions.update(conn.execute(
+                    f'SELECT video_id, digest FROM thumbnails WHERE width = 0 AND video_id IN ({placeholders})', batch
+                ).fetchall())
+        return versions
+
+    def with_urls(self, videos: List[Dict]) -> List[Dict]:
+        """
+        Ajout de thumbnail_src aux vidéos : URL versionnée (?v=) si la miniature
+        est en cache, sinon URL simple (revalidée, la miniature sera téléchargée)
+        """
+        versions = self.versions([video['id'] for video in videos])
+        for video in videos:
+            url = THUMBNAIL_ROUTE.format(video_id=video['id'])
+            version = versions.get(video['id'])
+            video['thumbnail_src'] = f'{url}?v={version}' if version else url
+        return videos
+
+    def _download(self, video_id: str, url: Optional[str]) -> Optional[str]:
+        """Téléchargement et stockage de la miniature originale"""
+        url = url or FALLBACK_URL.format(video_id=video_id)
+        try:
+            response = self._http.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"Impossible de télécharger la miniature de {video_id} : {e}")
+            return None
+        return self._store(video_id, 0, response.content, url)
+
+    def prefetch(self, videos: Iterable[Dict]):
+        """
+        Téléchargement en arrière-plan des miniatures absentes du cache
+
+        Args:
+            videos: Vidéos synchronisées (Video ou lignes de la base)
+        """
+        for video in videos:
+            video_id = video['id']
+            url = video.get('thumbnail_url')
+
+            with self._lock:
+                if video_id in self._pending:
+                    continue
+                self._pending.add(video_id)
+
+            self._executor.submit(self._prefetch_one, video_id, url)
+
+    def _prefetch_one(self, video_id: str, url: Optional[str]):
+        try:
+            cached = self._lookup(video_id, 0)
+            # Nouveau téléchargement seulement si l'URL source a changé
+            if cached is None or (url and cached[1] != url):
+                self._download(video_id, url)
+        except Exception as e:
+            logger.error(f"Erreur lors du préchargement de la miniature {video_id} : {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(video_id)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attente de la fin des préchargements en cours (processus sur le point de s'arrêter)
+
+        Returns:
+            bool: False si des téléchargements sont encore en cours après timeout secondes
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def get(self, video_id: str, width: Optional[int] = None,
+            resolve: Optional[Callable[[str], Optional[Dict]]] = None) -> Optional[Tuple[str, str, str]]:
+        """
+        Chemin de la miniature d'une vidéo (téléchargée à la demande si absente)
+
+        Le fichier peut être évincé avant d'être lu : pour le servir, utiliser get_file.
+
+        Args:
+            video_id: ID de la vidéo
+            width: Largeur d'une variante réduite (parmi VARIANT_WIDTHS), None pour l'original
+            resolve: Vidéo enregistrée par ID (None si inconnue), appelée seulement si l'original
+                doit être téléchargé : aucun téléchargement pour un ID inconnu ou sans resolve
+
+        Returns:
+            Tuple[str, str, str]: (chemin du fichier, empreinte, version = empreinte de
+            l'original) ou None si indisponible
+        """
+        width = width if width in VARIANT_WIDTHS else 0
+
+        cached = self._lookup(video_id, width)
+        CACHE_REQUESTS.labels(cache='thumbnails', result='hit' if cached else 'miss').inc()
+        if cached and not width:
+            return self._blob_path(cached[0]), cached[0], cached[0]
+
+        original = self._lookup(video_id, 0)
+        if cached and original:
+            return self._blob_path(cached[0]), cached[0], original[0]
+        if original:
+            digest = original[0]
+        else:
+            # Le serveur ne télécharge pas d'URL pour des IDs arbitraires
+            video = resolve(video_id) if resolve else None
+            if video is None:
+                return None
+            digest = self._download(video_id, video.get('thumbnail_url'))
+        if digest is None:
+            return None
+
+        version = digest
+        if width:
+            digest = self._make_variant(video_id, digest, width) or digest
+
+        return self._blob_path(digest), digest, version
+
+    def get_file(self, video_id: str, width: Optional[int] = None,
+                 resolve: Optional[Callable[[str], Optional[Dict]]] = None) -> Optional[Tuple[BinaryIO, str, str]]:
+        """
+        Miniature ouverte en lecture (voir get) : un fichier évincé entre la lecture
+        de l'index et l'ouverture est retiré de l'index puis téléchargé à nouveau
+
+        Returns:
+            Tuple[BinaryIO, str, str]: (fichier ouvert, empreinte, version) ou None si indisponible
+        """
+        for _ in range(2):
+            result = self.get(video_id, width, resolve)
+            if result is None:
+                return None
+            path, digest, version = result
+            try:
+                return open(path, 'rb'), digest, version
+            except FileNotFoundError:
+                self._forget(digest)
+        return None
+
+    def _make_variant(self, video_id: str, digest: str, width: int) -> Optional[str]:
+        """Création d'une variante réduite (nécessite Pillow, sinon l'original est servi)"""
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+
+        try:
+            with Image.open(self._blob_path(digest)) as image:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.convert('RGB').resize((width, height), Image.LANCZOS)
+                buffer = io.BytesIO()
+                resized.save(buffer, format='JPEG', quality=85, optimize=True)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Impossible de réduire la miniature de {video_id} : {e}")
+            return None
+
+        return self._store(video_id, width, buffer.getvalue(), None)
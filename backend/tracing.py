@@ -0,0 +1,275 @@
+"""
+Traces de la synchronisation - Spans imbriqués et export local
+Une synchronisation ouvre une trace (span racine) ; chaque page de
+playlistItems.list, chaque lot de videos.list, la conversion en Video et
+chaque transaction SQLite y ajoutent un span avec ses attributs (nombre
+d'éléments, coût en quota...).
+
+Hors d'une trace, tracer.span() ne crée rien : les requêtes ordinaires ne
+paient pas l'instrumentation. À la fin d'une trace, ses spans sont confiés à
+l'exportateur configuré (TRACE_FILE) et résumés par étape pour sync_history.
+
+Implémentation minimale sans dépendance : le fichier au format OTLP/JSON
+(une trace par ligne) est lisible par le récepteur « otlpjson » du collecteur
+OpenTelemetry.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'youtube-organizer'
+
+# Coût en quota YouTube Data v3 d'un appel de lecture (list)
+LIST_QUOTA_COST = 1
+
+
+class _Trace:
+    """Spans terminés d'une même trace"""
+
+    __slots__ = ('trace_id', 'spans', 'lock')
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List['Span'] = []
+        self.lock = threading.Lock()
+
+
+class Span:
+    """Opération mesurée d'une trace"""
+
+    __slots__ = ('name', 'span_id', 'parent', 'trace', 'attributes', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, name: str, trace: _Trace, parent: Optional['Span'], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent = parent
+        self.trace = trace
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def stage_timings(self) -> Dict[str, Dict]:
+        """Résumé par nom de span (nombre et durée cumulée) des spans terminés de la trace, hors celui-ci"""
+        stages: Dict[str, Dict] = {}
+        with self.trace.lock:
+            spans = [span for span in self.trace.spans if span is not self]
+        for span in spans:
+            stage = stages.setdefault(span.name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stage['count'] += 1
+            stage['total_ms'] += span.duration_ms
+            stage['max_ms'] = max(stage['max_ms'], span.duration_ms)
+        for stage in stages.values():
+            stage['total_ms'] = round(stage['total_ms'], 2)
+            stage['max_ms'] = round(stage['max_ms'], 2)
+        return stages
+
+
+class _NoopSpan:
+    """Span hors trace : attributs ignorés"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+
+class JsonLinesExporter:
+    """Une ligne JSON par span terminé (format simple, lisible avec jq)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def format(self, spans: List[Span]) -> List[Dict]:
+        return [{
+            'trace_id': span.trace.trace_id,
+            'span_id': span.span_id,
+            'parent_id': span.parent.span_id if span.parent else None,
+            'name': span.name,
+            'start': span.start_ns / 1e9,
+            'duration_ms': round(span.duration_ms, 3),
+            'attributes': span.attributes,
+            'error': span.error
+        } for span in spans]
+
+    def export(self, spans: List[Span]):
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in self.format(spans))
+        with self._lock, open(self.path, 'a') as f:
+            f.write(lines)
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [_otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+class OtlpJsonExporter(JsonLinesExporter):
+    """Une ligne OTLP/JSON (ExportTraceServiceRequest) par trace"""
+
+    def format(self, spans: List[Span]) -> List[Dict]:
+        return [{'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [{
+                    'traceId': span.trace.trace_id,
+                    'spanId': span.span_id,
+                    'parentSpanId': span.parent.span_id if span.parent else '',
+                    'name': span.name,
+                    'kind': 1,
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.end_ns),
+                    'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()],
+                    'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+                } for span in spans]
+            }]
+        }]}]
+
+
+EXPORTERS = {'otlp': OtlpJsonExporter, 'jsonl': JsonLinesExporter}
+
+
+class Tracer:
+    """Création des spans et export des traces terminées"""
+
+    def __init__(self, exporter=None):
+        """
+        Args:
+            exporter: Objet exposant export(spans) appelé à la fin de chaque trace (aucun export si absent)
+        """
+        self.exporter = exporter
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Span]:
+        """Span racine d'une nouvelle trace (exportée à sa sortie)"""
+        span = Span(name, _Trace(), None, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+            self._export(span.trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Any]:
+        """Span enfant du span courant (aucun hors trace)"""
+        parent = _current.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+
+        span = Span(name, parent.trace, parent, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(span)
+
+    @staticmethod
+    def _finish(span: Span):
+        span.end_ns = time.time_ns()
+        with span.trace.lock:
+            span.trace.spans.append(span)
+
+    def _export(self, trace: _Trace):
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(trace.spans)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export de la trace {trace.trace_id}: {e}")
+
+
+def current_span():
+    """Span courant (span inerte hors trace)"""
+    return _current.get() or NOOP_SPAN
+
+
+def traced(name: str) -> Callable:
+    """Décorateur ouvrant un span (dans une trace en cours) autour de la fonction"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with TRACER.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    fn exécutée sous le span courant, depuis un autre thread (pool de threads)
+
+    Les contextvars ne suivent pas les tâches d'un ThreadPoolExecutor : le
+    span parent est capturé ici et rétabli dans le thread d'exécution.
+    """
+    parent = _current.get()
+    if parent is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+
+def configure(trace_file: Optional[str], trace_format: str = 'otlp'):
+    """Exportateur du traceur global (aucun si trace_file est vide)"""
+    if not trace_file:
+        TRACER.exporter = None
+        return
+    exporter_class = EXPORTERS.get(trace_format)
+    if exporter_class is None:
+        raise ValueError(f"Format de trace inconnu : {trace_format} ({', '.join(EXPORTERS)})")
+    TRACER.exporter = exporter_class(trace_file)
+
+
+TRACER = Tracer()
@@ -0,0 +1,26 @@
+"""
+Point d'entrée WSGI de production
+
+    gunicorn -c gunicorn.conf.py wsgi:app     # Linux / macOS
+    python wsgi.py                            # waitress (Windows ou sans gunicorn)
+
+Voir DEPLOYMENT.md pour le dimensionnement des workers et des threads.
+"""
+
+import os
+
+from app import create_app
+
+app = create_app()
+
+if __name__ == '__main__':
+    from waitress import serve
+
+    serve(
+        app,
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', 5000)),
+        threads=int(os.environ.get('WAITRESS_THREADS', 16)),
+        channel_timeout=120,
+        connection_limit=int(os.environ.get('WAITRESS_CONNECTION_LIMIT', 200))
+    )
@@ -1,20 +1,24 @@
 """
 YouTube API Manager - Gestion de la connexion et récupération des données YouTube
-Gère l'authentification OAuth 2.0 et la récupération de la playlist "À regarder plus tard"
+Gère l'authentification OAuth 2.0 et la récupération des playlists ("À regarder plus tard" et playlists suivies)
 """
 
 import os
 import json
-from datetime import datetime, timezone
-from typing import List, Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import logging
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+# Le client Google (discovery, oauth) est importé à l'usage : son chargement
+# coûte plusieurs centaines de millisecondes au démarrage d'un worker
 from googleapiclient.errors import HttpError
 
+from metadata import DetailBatcher
+from metrics import YOUTUBE_API_CALLS, YOUTUBE_API_DURATION
+from models import PlaylistContents, Video
+from tracing import LIST_QUOTA_COST, TRACER, bind
+
 # Configuration des scopes YouTube
 SCOPES = ['https://www.googleapis.com/auth/youtube.readonly']
 
@@ -22,21 +26,64 @@ SCOPES = ['https://www.googleapis.com/auth/youtube.readonly']
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Playlists parcourues en parallèle lors d'une synchronisation
+PLAYLIST_CONCURRENCY = 4
+
+# Coût en quota d'une recherche (search.list)
+SEARCH_QUOTA_COST = 100
+
+class QuotaExceeded(Exception):
+    """Plafond de quota de l'API atteint (synchronisation sans navigateur)"""
+
+def unique_video_ids(pages: Iterable[List[Dict]]) -> List[str]:
+    """IDs distincts des éléments de playlists, dans l'ordre de première apparition"""
+    video_ids = {}
+    for items in pages:
+        for item in items:
+            video_ids.setdefault(item['snippet']['resourceId']['videoId'], None)
+    return list(video_ids)
+
+def merge_playlists(playlists: List[Tuple[str, List[Dict], bool]],
+                    details: Dict[str, Dict]) -> Tuple[List[Video], List[PlaylistContents]]:
+    """
+    Vidéos distinctes (première occurrence) et contenu de chaque playlist
+    
+    Args:
+        playlists: (ID de playlist, éléments de playlistItems.list, lue jusqu'au bout)
+        details: Réponses videos.list par ID de vidéo
+    """
+    videos, seen, contents = [], set(), []
+    for playlist_id, items, complete in playlists:
+        entries = []
+        for item in items:
+            video_id = item['snippet']['resourceId']['videoId']
+            entries.append((video_id, item['snippet'].get('publishedAt')))
+            if video_id not in seen:
+                seen.add(video_id)
+                videos.append(Video.from_api(item, details.get(video_id, {})))
+        contents.append(PlaylistContents(playlist_id, entries, complete))
+    return videos, contents
+
 class YouTubeAPI:
     """Gestionnaire principal pour l'API YouTube"""
     
-    def __init__(self, credentials_file: str = 'credentials.json', token_file: str = 'token.json'):
+    def __init__(self, credentials_file: str = 'credentials.json', token_file: str = 'token.json',
+                 details: Optional[DetailBatcher] = None):
         """
         Initialise le gestionnaire YouTube API
         
         Args:
             credentials_file: Chemin vers le fichier credentials.json de Google
             token_file: Chemin vers le fichier de stockage du token d'accès
+            details: File des demandes de détails partagée entre comptes (propre à l'instance sinon)
         """
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.service = None
         self.credentials = None
+        self.details = details or DetailBatcher()
+        # Appelée avec le coût de chaque appel avant son exécution (peut lever QuotaExceeded)
+        self.quota: Optional[Callable[[int], None]] = None
         
     def authenticate(self) -> bool:
         """
@@ -45,6 +92,11 @@ class YouTubeAPI:
         Returns:
             bool: True si l'authentification réussit, False sinon
         """
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+        
         try:
             # Charge les credentials existants
             if os.path.exists(self.token_file):
@@ -83,6 +135,77 @@ class YouTubeAPI:
             logger.error(f"Erreur d'authentification : {e}")
             return False
     
+    def _execute(self, request, method: str, http=None, cost: int = LIST_QUOTA_COST) -> Dict:
+        """
+        Exécute une requête de l'API en mesurant latence et code de retour
+        
+        Args:
+            request: Requête googleapiclient à exécuter
+            method: Méthode de YouTubeAPI à l'origine de l'appel (label des métriques)
+            http: Connexion à utiliser à la place de celle du service (appels concurrents)
+            cost: Coût de l'appel en unités de quota
+        """
+        if self.quota is not None:
+            self.quota(cost)
+        
+        start = time.perf_counter()
+        status = '200'
+        try:
+            return request.execute(http=http)
+        except HttpError as e:
+            status = str(e.resp.status)
+            raise
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            YOUTUBE_API_DURATION.labels(method=method).observe(time.perf_counter() - start)
+            YOUTUBE_API_CALLS.labels(method=method, status=status).inc()
+    
+    def _get_service(self):
+        """Service de l'API (construit sans identifiants si authenticate n'a pas été appelé : jeton fourni par appel)"""
+        if self.service is None:
+            import httplib2
+            from googleapiclient.discovery import build
+            self.service = build('youtube', 'v3', http=httplib2.Http(), static_discovery=True)
+        return self.service
+    
+    def _new_http(self, access_token: Optional[str] = None):
+        """
+        Connexion propre à une tâche : httplib2 n'est pas thread-safe
+        
+        Args:
+            access_token: Jeton OAuth de l'utilisateur (identifiants d'authenticate sinon)
+        """
+        if access_token:
+            from google.oauth2.credentials import Credentials
+            credentials = Credentials(token=access_token)
+        else:
+            credentials = self.credentials
+        if credentials is None:
+            return None  # Connexion du service (transport fourni à build)
+        
+        import google_auth_httplib2
+        import httplib2
+        return google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+    
+    def get_account_id(self, access_token: Optional[str] = None) -> Optional[str]:
+        """
+        Identifiant stable du compte connecté (ID de sa chaîne YouTube)
+        
+        Returns:
+            str: ID de la chaîne ou None si erreur
+        """
+        try:
+            request = self._get_service().channels().list(part="id", mine=True)
+            response = self._execute(request, 'get_account_id', http=self._new_http(access_token))
+            items = response.get('items', [])
+            return items[0]['id'] if items else None
+            
+        except HttpError as e:
+            logger.error(f"Erreur lors de la récupération du compte : {e}")
+            return None
+    
     def get_watch_later_playlist_id(self) -> Optional[str]:
         """
         Récupère l'ID de la playlist "À regarder plus tard"
@@ -91,18 +214,25 @@ class YouTubeAPI:
             str: ID de la playlist ou None si erreur
         """
         try:
-            # Récupère les playlists de l'utilisateur
-            request = self.service.playlists().list(
-                part="id,snippet",
-                mine=True,
-                maxResults=50
-            )
-            response = request.execute()
-            
-            # Cherche la playlist "Watch Later"
-            for playlist in response.get('items', []):
-                if playlist['snippet']['title'] == 'Watch Later':
-                    return playlist['id']
+            # Parcours de toutes les pages de playlists de l'utilisateur
+            next_page_token = None
+            while True:
+                request = self._get_service().playlists().list(
+                    part="id,snippet",
+                    mine=True,
+                    maxResults=50,
+                    pageToken=next_page_token
+                )
+                response = self._execute(request, 'get_watch_later_playlist_id')
+                
+                # Cherche la playlist "Watch Later"
+                for playlist in response.get('items', []):
+                    if playlist['snippet']['title'] == 'Watch Later':
+                        return playlist['id']
+                
+                next_page_token = response.get('nextPageToken')
+                if not next_page_token:
+                    break
             
             # Si pas trouvée dans les playlists custom, utilise l'ID spécial
             # "WL" est l'ID spécial pour "Watch Later" de YouTube
@@ -112,123 +242,143 @@ class YouTubeAPI:
             logger.error(f"Erreur lors de la récupération de la playlist : {e}")
             return None
     
-    def get_watch_later_videos(self, max_results: int = 50) -> List[Dict]:
+    def get_watch_later_videos(self, access_token: Optional[str] = None, max_results: int = 5000) -> List[Video]:
         """
         Récupère les vidéos de la playlist "À regarder plus tard"
         
         Args:
+            access_token: Jeton OAuth de l'utilisateur (identifiants d'authenticate si absent)
             max_results: Nombre maximum de vidéos à récupérer
             
         Returns:
-            List[Dict]: Liste des vidéos avec leurs métadonnées
+            List[Video]: Liste des vidéos avec leurs métadonnées
         """
-        if not self.service:
-            logger.error("Service YouTube non initialisé. Authentifiez-vous d'abord.")
-            return []
+        videos, _ = self.get_playlist_videos(access_token, ['WL'], max_results)
+        return videos
+    
+    def get_playlist_videos(self, access_token: Optional[str], playlist_ids: List[str],
+                            max_results: int = 5000) -> Tuple[List[Video], List[PlaylistContents]]:
+        """
+        Récupère les vidéos de plusieurs playlists
         
-        try:
-            videos = []
-            next_page_token = None
+        Les playlists sont parcourues en parallèle, puis les détails (videos.list)
+        sont demandés une seule fois par vidéo, même présente dans plusieurs playlists
+        ou dans la synchronisation concurrente d'un autre compte (DetailBatcher).
+        
+        Args:
+            access_token: Jeton OAuth de l'utilisateur (identifiants d'authenticate si absent)
+            playlist_ids: Playlists à synchroniser
+            max_results: Nombre maximum de vidéos par playlist
             
-            while len(videos) < max_results:
-                # Calcule le nombre de résultats pour cette requête
-                page_size = min(50, max_results - len(videos))
-                
-                # Requête pour récupérer les éléments de la playlist
-                request = self.service.playlistItems().list(
-                    part="snippet,contentDetails",
-                    playlistId="WL",  # Watch Later playlist ID
-                    maxResults=page_size,
-                    pageToken=next_page_token
-                )
-                response = request.execute()
-                
-                if not response.get('items'):
-                    break
-                
-                # Extrait les IDs des vidéos
-                video_ids = [item['snippet']['resourceId']['videoId'] for item in response['items']]
-                
-                # Récupère les détails des vidéos (durée, statistiques, etc.)
-                video_details = self._get_video_details(video_ids)
-                
-                # Combine les données
-                for item in response['items']:
-                    video_id = item['snippet']['resourceId']['videoId']
-                    video_detail = video_details.get(video_id, {})
-                    
-                    video_data = {
-                        'id': video_id,
-                        'title': item['snippet']['title'],
-                        'description': item['snippet']['description'],
-                        'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-                        'channel_name': item['snippet']['channelTitle'],
-                        'channel_id': item['snippet']['channelId'],
-                        'published_at': item['snippet']['publishedAt'],
-                        'added_to_playlist_at': item['snippet']['publishedAt'],
-                        'duration': video_detail.get('duration', 'PT0S'),
-                        'view_count': int(video_detail.get('view_count', 0)),
-                        'like_count': int(video_detail.get('like_count', 0)),
-                        'tags': video_detail.get('tags', []),
-                        'category_id': video_detail.get('category_id', ''),
-                        'watched': False,  # Par défaut, non vue
-                        'created_at': datetime.now(timezone.utc).isoformat()
-                    }
-                    
-                    videos.append(video_data)
+        Returns:
+            Tuple: Vidéos distinctes et contenu de chaque playlist
+        """
+        if not playlist_ids:
+            return [], []
+        
+        workers = min(PLAYLIST_CONCURRENCY, max(len(playlist_ids), 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # bind : les spans des threads du pool restent rattachés à la trace de la synchronisation
+            playlists = list(executor.map(
+                bind(lambda playlist_id: self._get_playlist_items(playlist_id, max_results, access_token)),
+                playlist_ids
+            ))
+            
+            # Une seule demande de détails par vidéo, par lots de 50 en parallèle
+            # (métadonnées partagées réutilisées, lots mis en commun avec les autres comptes)
+            video_ids = unique_video_ids(items for _, items, _ in playlists)
+            details = {}
+            try:
+                for batch_details in executor.map(
+                    bind(lambda batch: self.details.fetch(batch, self._detail_fetcher(access_token))),
+                    [video_ids[i:i + 50] for i in range(0, len(video_ids), 50)]
+                ):
+                    details.update(batch_details)
+            except HttpError as e:
+                # Comme le client asynchrone : rien n'est enregistré plutôt que des vidéos sans détails
+                logger.error(f"Erreur lors de la récupération des détails : {e}")
+                return [], []
+        
+        with TRACER.span('youtube.convert') as span:
+            videos, contents = merge_playlists(playlists, details)
+            span.set_attribute('videos', len(videos))
+        logger.info(f"Récupéré {len(videos)} vidéos de {len(playlist_ids)} playlist(s)")
+        return videos, contents
+    
+    def _get_playlist_items(self, playlist_id: str, max_results: int,
+                            access_token: Optional[str] = None) -> Tuple[str, List[Dict], bool]:
+        """
+        Parcours des pages d'une playlist
+        
+        Returns:
+            Tuple: ID de la playlist, éléments lus, et True si la playlist a été lue jusqu'au bout
+        """
+        http = self._new_http(access_token)
+        items = []
+        next_page_token = None
+        
+        try:
+            while len(items) < max_results:
+                with TRACER.span('youtube.playlist_items', playlist_id=playlist_id,
+                                 page=len(items) // 50, quota_cost=LIST_QUOTA_COST) as span:
+                    request = self._get_service().playlistItems().list(
+                        part="snippet,contentDetails",
+                        playlistId=playlist_id,
+                        maxResults=min(50, max_results - len(items)),
+                        pageToken=next_page_token
+                    )
+                    response = self._execute(request, 'get_playlist_items', http)
+                    span.set_attribute('items', len(response.get('items', [])))
+                items.extend(response.get('items', []))
                 
                 # Vérifie s'il y a une page suivante
                 next_page_token = response.get('nextPageToken')
-                if not next_page_token:
-                    break
+                if not next_page_token or not response.get('items'):
+                    return playlist_id, items, True
             
-            logger.info(f"Récupéré {len(videos)} vidéos de la playlist 'À regarder plus tard'")
-            return videos
+            return playlist_id, items, False
             
         except HttpError as e:
-            logger.error(f"Erreur lors de la récupération des vidéos : {e}")
-            return []
+            logger.error(f"Erreur lors de la récupération de la playlist {playlist_id} : {e}")
+            return playlist_id, items, False
     
-    def _get_video_details(self, video_ids: List[str]) -> Dict[str, Dict]:
+    def _detail_fetcher(self, access_token: Optional[str]):
+        """Appel de videos.list sur une connexion propre au thread appelant"""
+        return lambda batch_ids: self._get_video_details(batch_ids, self._new_http(access_token))
+    
+    def _get_video_details(self, video_ids: List[str], http=None) -> Dict[str, Dict]:
         """
         Récupère les détails complets des vidéos
         
         Args:
             video_ids: Liste des IDs de vidéos
+            http: Connexion à utiliser (appels concurrents)
             
         Returns:
-            Dict: Dictionnaire avec les détails de chaque vidéo
+            Dict: Réponse videos.list de chaque vidéo, par ID
+            
+        Raises:
+            HttpError: Erreur de l'API (jeton révoqué, quota...) : une réponse vide
+                ferait enregistrer des vidéos sans durée ni statistiques
         """
-        try:
-            # YouTube API limite à 50 IDs par requête
-            details = {}
+        # YouTube API limite à 50 IDs par requête
+        details = {}
+        
+        for i in range(0, len(video_ids), 50):
+            batch_ids = video_ids[i:i+50]
             
-            for i in range(0, len(video_ids), 50):
-                batch_ids = video_ids[i:i+50]
-                
-                request = self.service.videos().list(
+            with TRACER.span('youtube.videos_list', ids=len(batch_ids), quota_cost=LIST_QUOTA_COST) as span:
+                request = self._get_service().videos().list(
                     part="contentDetails,statistics,snippet",
                     id=','.join(batch_ids)
                 )
-                response = request.execute()
-                
-                for video in response.get('items', []):
-                    video_id = video['id']
-                    details[video_id] = {
-                        'duration': video['contentDetails'].get('duration', 'PT0S'),
-                        'view_count': video['statistics'].get('viewCount', '0'),
-                        'like_count': video['statistics'].get('likeCount', '0'),
-                        'tags': video['snippet'].get('tags', []),
-                        'category_id': video['snippet'].get('categoryId', ''),
-                        'default_language': video['snippet'].get('defaultLanguage', ''),
-                        'default_audio_language': video['snippet'].get('defaultAudioLanguage', '')
-                    }
-            
-            return details
+                response = self._execute(request, '_get_video_details', http)
+                span.set_attribute('items', len(response.get('items', [])))
             
-        except HttpError as e:
-            logger.error(f"Erreur lors de la récupération des détails : {e}")
-            return {}
+            for video in response.get('items', []):
+                details[video['id']] = video
+        
+        return details
     
     def parse_duration(self, duration: str) -> int:
         """
@@ -305,7 +455,7 @@ class YouTubeAPI:
                 part="snippet,statistics",
                 id=channel_id
             )
-            response = request.execute()
+            response = self._execute(request, 'get_channel_info')
             
             if response.get('items'):
                 channel = response['items'][0]
@@ -342,7 +492,7 @@ class YouTubeAPI:
                 maxResults=max_results,
                 order="relevance"
             )
-            response = request.execute()
+            response = self._execute(request, 'search_videos', cost=SEARCH_QUOTA_COST)
             
             videos = []
             for item in response.get('items', []):
@@ -350,8 +500,8 @@ class YouTubeAPI:
                     'id': item['id']['videoId'],
                     'title': item['snippet']['title'],
                     'description': item['snippet']['description'],
-                    'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
-                    'channel_name': item['snippet']['channelTitle'],
+                    'thumbnail_url': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
+                    'channel_title': item['snippet']['channelTitle'],
                     'published_at': item['snippet']['publishedAt']
                 })
             
@@ -0,0 +1,212 @@
+"""
+Client asynchrone de l'API YouTube Data v3
+Appels REST directs via httpx (connexions HTTP/2 mutualisées), utilisé par le
+mode de service ASGI : une synchronisation n'occupe aucun thread pendant
+l'attente des réponses de Google.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+import httpx
+
+from metadata import AsyncDetailBatcher
+from metrics import YOUTUBE_API_CALLS, YOUTUBE_API_DURATION
+from models import PlaylistContents, Video
+from tracing import LIST_QUOTA_COST, TRACER
+from youtube_api import merge_playlists
+
+logger = logging.getLogger(__name__)
+
+
+class YouTubeAPIError(Exception):
+    """Erreur renvoyée par l'API YouTube"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class AsyncYouTubeAPI:
+    """Gestionnaire asynchrone de l'API YouTube (jeton d'accès OAuth fourni par appel)"""
+
+    def __init__(self, base_url: str = 'https://www.googleapis.com/youtube/v3',
+                 max_connections: int = 100, timeout: float = 30.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 details: Optional[AsyncDetailBatcher] = None):
+        """
+        Args:
+            base_url: URL de base de l'API YouTube Data v3
+            max_connections: Taille du pool de connexions partagé
+            timeout: Délai maximal d'un appel en secondes
+            transport: Transport httpx à utiliser à la place du réseau (benchmarks)
+            details: File des demandes de détails partagée entre comptes (propre à l'instance sinon)
+        """
+        self.base_url = base_url
+        self.details = details or AsyncDetailBatcher()
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+
+    async def aclose(self):
+        """Fermeture du pool de connexions"""
+        await self.client.aclose()
+
+    async def _get(self, resource: str, params: Dict, access_token: str, method: str) -> Dict:
+        """
+        Requête GET sur une ressource de l'API, avec métriques
+
+        Args:
+            resource: Ressource REST (playlistItems, videos...)
+            params: Paramètres de la requête
+            access_token: Jeton OAuth de l'utilisateur
+            method: Méthode à l'origine de l'appel (label des métriques)
+        """
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            response = await self.client.get(
+                f'{self.base_url}/{resource}',
+                params=params,
+                headers={'Authorization': f'Bearer {access_token}'}
+            )
+            status = str(response.status_code)
+            if response.status_code >= 400:
+                raise YouTubeAPIError(response.status_code, response.text[:200])
+            return response.json()
+        finally:
+            YOUTUBE_API_DURATION.labels(method=method).observe(time.perf_counter() - start)
+            YOUTUBE_API_CALLS.labels(method=method, status=status).inc()
+
+    async def get_watch_later_videos(self, access_token: str, max_results: int = 5000) -> List[Video]:
+        """
+        Récupère les vidéos de la playlist "À regarder plus tard"
+
+        Args:
+            access_token: Jeton OAuth de l'utilisateur
+            max_results: Nombre maximum de vidéos à récupérer
+
+        Returns:
+            List[Video]: Vidéos au même format que YouTubeAPI.get_watch_later_videos
+        """
+        videos, _ = await self.get_playlist_videos(access_token, ['WL'], max_results)
+        return videos
+
+    async def get_playlist_videos(self, access_token: str, playlist_ids: List[str],
+                                  max_results: int = 5000) -> Tuple[List[Video], List[PlaylistContents]]:
+        """
+        Récupère les vidéos de plusieurs playlists, parcourues en parallèle
+
+        Les détails de chaque page sont demandés pendant la récupération de la
+        page suivante, une seule fois par vidéo même si elle apparaît dans
+        plusieurs playlists : le temps total tend vers celui du parcours de la
+        plus longue playlist. Les lots de détails sont mis en commun avec les
+        synchronisations concurrentes des autres comptes (AsyncDetailBatcher).
+
+        Args:
+            access_token: Jeton OAuth de l'utilisateur
+            playlist_ids: Playlists à synchroniser
+            max_results: Nombre maximum de vidéos par playlist
+
+        Returns:
+            Tuple: Vidéos distinctes et contenu de chaque playlist (mêmes formats que YouTubeAPI)
+        """
+        requested = set()
+        detail_tasks = []
+
+        def request_details(items: List[Dict]):
+            # Boucle d'événements unique : pas de concurrence sur requested
+            video_ids = []
+            for item in items:
+                video_id = item['snippet']['resourceId']['videoId']
+                if video_id not in requested:
+                    requested.add(video_id)
+                    video_ids.append(video_id)
+            if video_ids:
+                detail_tasks.append(asyncio.create_task(self.details.fetch(
+                    video_ids, lambda batch: self._get_video_details(batch, access_token)
+                )))
+
+        try:
+            playlists = await asyncio.gather(*(
+                self._get_playlist_items(playlist_id, max_results, access_token, request_details)
+                for playlist_id in playlist_ids
+            ))
+            details = {}
+            for batch_details in await asyncio.gather(*detail_tasks):
+                details.update(batch_details)
+
+        except (YouTubeAPIError, httpx.HTTPError) as e:
+            for task in detail_tasks:
+                task.cancel()
+            logger.error(f"Erreur lors de la récupération des vidéos : {e}")
+            return [], []
+
+        with TRACER.span('youtube.convert') as span:
+            videos, contents = merge_playlists(playlists, details)
+            span.set_attribute('videos', len(videos))
+        logger.info(f"Récupéré {len(videos)} vidéos de {len(playlist_ids)} playlist(s)")
+        return videos, contents
+
+    async def _get_playlist_items(self, playlist_id: str, max_results: int, access_token: str,
+                                  on_page: Callable[[List[Dict]], None]) -> Tuple[str, List[Dict], bool]:
+        """
+        Parcours des pages d'une playlist (on_page appelé pour chaque page lue)
+
+        Returns:
+            Tuple: ID de la playlist, éléments lus, et True si la playlist a été lue jusqu'au bout
+        """
+        items = []
+        next_page_token: Optional[str] = None
+
+        try:
+            while len(items) < max_results:
+                params = {
+                    'part': 'snippet,contentDetails',
+                    'playlistId': playlist_id,
+                    'maxResults': min(50, max_results - len(items))
+                }
+                if next_page_token:
+                    params['pageToken'] = next_page_token
+
+                with TRACER.span('youtube.playlist_items', playlist_id=playlist_id,
+                                 page=len(items) // 50, quota_cost=LIST_QUOTA_COST) as span:
+                    response = await self._get('playlistItems', params, access_token, 'get_playlist_items')
+                    page = response.get('items', [])
+                    span.set_attribute('items', len(page))
+                items.extend(page)
+                on_page(page)
+
+                next_page_token = response.get('nextPageToken')
+                if not next_page_token or not page:
+                    return playlist_id, items, True
+
+            return playlist_id, items, False
+
+        except (YouTubeAPIError, httpx.HTTPError) as e:
+            logger.error(f"Erreur lors de la récupération de la playlist {playlist_id} : {e}")
+            return playlist_id, items, False
+
+    async def _get_video_details(self, video_ids: List[str], access_token: str) -> Dict[str, Dict]:
+        """Détails des vidéos, par lots de 50 IDs demandés en parallèle"""
+        batches = [video_ids[i:i + 50] for i in range(0, len(video_ids), 50)]
+        responses = await asyncio.gather(*(self._get_video_batch(batch, access_token) for batch in batches))
+
+        details = {}
+        for response in responses:
+            for video in response.get('items', []):
+                details[video['id']] = video
+        return details
+
+    async def _get_video_batch(self, batch: List[str], access_token: str) -> Dict:
+        """Appel de videos.list pour au plus 50 IDs"""
+        with TRACER.span('youtube.videos_list', ids=len(batch), quota_cost=LIST_QUOTA_COST) as span:
+            response = await self._get('videos', {'part': 'contentDetails,statistics,snippet', 'id': ','.join(batch)},
+                                       access_token, '_get_video_details')
+            span.set_attribute('items', len(response.get('items', [])))
+            return response